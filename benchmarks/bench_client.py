@@ -0,0 +1,117 @@
+"""
+Client throughput against a local uvicorn instance of src/api/app.py: the
+naive `requests.post` loop of streamlit_app.py (a new connection per
+prediction) against LoanVetClient and AsyncLoanVetClient with pooled
+keep-alive connections, concurrent /predict requests, and predict_many
+batching records into /predict/batch. Reports predictions/sec per mode.
+
+The server runs with the prediction cache disabled, so every record is
+scored. Start it yourself and pass --url to benchmark another deployment.
+
+Run from the repository root (needs uvicorn, requests and httpx):
+    python -m benchmarks.bench_client --records 2000
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from tests.synthetic import make_raw_credit_frame, to_api_records
+from src.client import AsyncLoanVetClient, LoanVetClient
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, LOANVET_CACHE_SIZE="0", LOANVET_LOG_SAMPLE_RATE="0")
+    command = [sys.executable, "-m", "uvicorn", "src.api.app:app", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    return subprocess.Popen(command, env=env)
+
+def wait_ready(url: str, timeout: float = 60.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/readyz").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"API at {url} did not become ready within {timeout:.0f}s")
+
+def naive_loop(url: str, records: list) -> list:
+    import requests
+
+    return [requests.post(f"{url}/predict", json=r).json()["prediction"] for r in records]
+
+def pooled_loop(url: str, records: list) -> list:
+    with LoanVetClient(url) as client:
+        return [client.predict(r) for r in records]
+
+def async_concurrent(url: str, records: list, concurrency: int) -> list:
+    async def run():
+        async with AsyncLoanVetClient(url, max_connections=concurrency) as client:
+            return await asyncio.gather(*(client.predict(r) for r in records))
+    return asyncio.run(run())
+
+def sync_batched(url: str, records: list, batch_size: int) -> list:
+    with LoanVetClient(url) as client:
+        return client.predict_many(records, batch_size=batch_size)
+
+def async_batched(url: str, records: list, batch_size: int) -> list:
+    async def run():
+        async with AsyncLoanVetClient(url) as client:
+            return await client.predict_many(records, batch_size=batch_size)
+    return asyncio.run(run())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2_000, help="records per per-request mode")
+    parser.add_argument("--batch-records", type=int, default=100_000, help="records per batched mode")
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--server-workers", type=int, default=1)
+    parser.add_argument("--url", default=None, help="benchmark a running API instead of starting one")
+    args = parser.parse_args()
+
+    records = to_api_records(make_raw_credit_frame(max(args.records, args.batch_records), seed=1, duplicate_rate=0))
+    single, batch = records[:args.records], records[:args.batch_records]
+
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = start_server(port, args.server_workers)
+    try:
+        wait_ready(url)
+        modes = [
+            ("requests.post loop", lambda: naive_loop(url, single), len(single)),
+            ("LoanVetClient loop", lambda: pooled_loop(url, single), len(single)),
+            (f"AsyncLoanVetClient x{args.concurrency}", lambda: async_concurrent(url, single, args.concurrency),
+             len(single)),
+            (f"predict_many (batch {args.batch_size})", lambda: sync_batched(url, batch, args.batch_size), len(batch)),
+            (f"async predict_many (batch {args.batch_size})", lambda: async_batched(url, batch, args.batch_size),
+             len(batch)),
+        ]
+        baseline = None
+        print(f"{'mode':<36} {'predictions':>12} {'seconds':>9} {'pred/sec':>10} {'speedup':>8}")
+        for name, run, n in modes:
+            start = time.perf_counter()
+            results = run()
+            elapsed = time.perf_counter() - start
+            assert len(results) == n
+            rate = n / elapsed
+            baseline = baseline or rate
+            print(f"{name:<36} {n:>12,} {elapsed:>9.2f} {rate:>10,.0f} {rate / baseline:>7.1f}x")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
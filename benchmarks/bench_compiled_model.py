@@ -0,0 +1,45 @@
+"""
+Load time and batch throughput of the compiled NumPy model versus the
+joblib-unpickled XGBClassifier.
+
+Export the model first, then run from the repository root:
+    python -m src.api.compiled_model
+    python -m benchmarks.bench_compiled_model --rows 200000
+"""
+import argparse
+import json
+import time
+
+import joblib
+
+from tests.synthetic import make_raw_columns
+from src.api.compiled_model import COMPILED_MODEL_PATH, load_compiled_model
+from src.api.utils import preprocess_columnar
+
+MODEL_PATH = "models/final/xgb_final_model.joblib"
+METADATA_PATH = "models/final/xgb_final_metadata.json"
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with open(METADATA_PATH, "r") as f:
+        feature_list = json.load(f)["features"]
+    X = preprocess_columnar(make_raw_columns(args.rows), feature_list)
+
+    model, joblib_load = timed(lambda: joblib.load(MODEL_PATH))
+    compiled, compiled_load = timed(lambda: load_compiled_model(COMPILED_MODEL_PATH))
+    print(f"Load   joblib XGBClassifier: {joblib_load * 1e3:>9.2f} ms")
+    print(f"Load   compiled .npz (mmap): {compiled_load * 1e3:>9.2f} ms")
+
+    expected, xgb_time = timed(lambda: model.predict_proba(X)[:, 1])
+    actual, compiled_time = timed(lambda: compiled.predict_proba(X)[:, 1])
+    print(f"Score  XGBClassifier:        {args.rows / xgb_time:>12,.0f} rows/sec")
+    print(f"Score  CompiledModel:        {args.rows / compiled_time:>12,.0f} rows/sec")
+    print(f"Max abs difference: {abs(expected - actual).max():.2e}")
@@ -0,0 +1,100 @@
+"""
+Explanation cost for the final model: p50/p99 latency of a single-row
+explanation (pred_contribs on one row, and a cache hit) next to plain
+SinglePredictor scoring, batch explanation rows/sec by batch size, and
+top-k reason selection (one argsort per matrix) against argpartition
+followed by sorting the selected k.
+
+Contributions are checked to add up to the booster's margin first.
+
+Run from the repository root:
+    python -m benchmarks.bench_explain --iterations 2000 --rows 50000
+"""
+import argparse
+import json
+import time
+
+import joblib
+import numpy as np
+
+from benchmarks.bench_predict_single import latencies_us, report
+from tests.synthetic import make_raw_credit_frame, to_api_records
+from src.api.cache import PredictionCache, LocalLRUBackend, feature_key
+from src.api.explain import DEFAULT_TOP_K, Explainer, top_reasons
+from src.api.utils import SinglePredictor, preprocess, preprocess_batch
+
+MODEL_PATH = "models/final/xgb_final_model.joblib"
+METADATA_PATH = "models/final/xgb_final_metadata.json"
+
+def partition_reasons(features: np.ndarray, labels: np.ndarray, k: int) -> np.ndarray:
+    signed = np.where(labels[:, None], features, -features)
+    top = np.argpartition(-signed, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(signed, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2_000, help="single-row explanations timed")
+    parser.add_argument("--rows", type=int, default=50_000, help="rows explained per batch run")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+    args = parser.parse_args()
+
+    model = joblib.load(MODEL_PATH)
+    with open(METADATA_PATH, "r") as f:
+        metadata = json.load(f)
+    feature_list = metadata["features"]
+    threshold = metadata.get("threshold", 0.5)
+    predictor = SinglePredictor(model, feature_list, threshold)
+    explainer = Explainer(model.get_booster(), feature_list, threshold, predictor.predict_matrix)
+
+    raw = make_raw_credit_frame(max(args.iterations, args.rows), seed=7, duplicate_rate=0)
+    records = [preprocess(r) for r in to_api_records(raw.head(args.iterations))]
+    matrix = preprocess_batch(raw.head(args.rows), feature_list).to_numpy(np.float32)
+
+    # Contributions plus the bias must reproduce the margin before timing them
+    _, contributions = explainer.compute(matrix[:1000])
+    margin = model.get_booster().inplace_predict(matrix[:1000], predict_type="margin")
+    assert np.allclose(contributions.sum(axis=1), margin, atol=1e-4)
+
+    def explain_one(record):
+        return explainer.explain(predictor.vector(record)[None, :], args.top_k)
+
+    cache = PredictionCache(LocalLRUBackend(len(records)))
+    for record in records:
+        proba, contribs = explainer.compute(predictor.vector(record)[None, :])
+        cache.set("bench", feature_key(record, feature_list),
+                  {"probability": float(proba[0]), "contributions": contribs[0].tolist()})
+
+    def explain_cached(record):
+        vector = predictor.vector(record)[None, :]
+        cached = cache.get("bench", feature_key(record, feature_list))
+        contribs = np.array([cached["contributions"]], dtype=np.float32)
+        return explainer.explanations(vector, np.array([cached["probability"]]), contribs, args.top_k)
+
+    predict_p50, _ = report("predict", latencies_us(predictor.predict, records))
+    explain_p50, _ = report("explain", latencies_us(explain_one, records))
+    cached_p50, _ = report("explain (cache hit)", latencies_us(explain_cached, records))
+    print(f"Explain costs {explain_p50 / predict_p50:.1f}x a prediction; a cache hit {cached_p50 / predict_p50:.1f}x")
+    print()
+
+    print(f"{'batch size':>10} {'rows':>10} {'seconds':>9} {'rows/sec':>10}")
+    for batch_size in (1, 64, 1_000, 10_000):
+        n = min(args.rows, batch_size * 200)
+        start = time.perf_counter()
+        for offset in range(0, n, batch_size):
+            explainer.explain(matrix[offset:offset + batch_size], args.top_k)
+        elapsed = time.perf_counter() - start
+        print(f"{batch_size:>10,} {n:>10,} {elapsed:>9.3f} {n / elapsed:>10,.0f}")
+    print()
+
+    _, contributions = explainer.compute(matrix)
+    features = contributions[:, :-1]
+    labels = explainer.predict_matrix(matrix) >= threshold
+    top, _ = top_reasons(features, labels, args.top_k)
+    assert np.array_equal(np.sort(top, axis=1), np.sort(partition_reasons(features, labels, args.top_k), axis=1))
+    for name, select in (("argsort", lambda: top_reasons(features, labels, args.top_k)),
+                         ("argpartition", lambda: partition_reasons(features, labels, args.top_k))):
+        start = time.perf_counter()
+        for _ in range(5):
+            select()
+        print(f"top-{args.top_k} {name:<14} {(time.perf_counter() - start) / 5 * 1e3:>8.2f} ms for {len(matrix):,} rows")
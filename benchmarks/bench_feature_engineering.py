@@ -0,0 +1,80 @@
+"""
+Parity check, time and peak memory of the training-side feature pipeline:
+reference_preprocess() (the hand-written chain of DataFrame transforms)
+versus fused_preprocess() (only the features in the final model's feature
+list), plus a skew check of the feature registry's scalar/batch modes and
+the API's serving path against the training pipeline.
+
+Run from the repository root:
+    python -m benchmarks.bench_feature_engineering --rows 1000000
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# The pipeline scripts import their siblings as top-level modules (run as `python src/...`)
+sys.path.insert(0, "src")
+from feature_engineering import full_preprocess, fused_preprocess, reference_preprocess  # noqa: E402
+from feature_registry import compile_features, parity_report  # noqa: E402
+from src.api.utils import RAW_INPUT_COLUMNS, preprocess_columnar  # noqa: E402
+from tests.synthetic import make_cleaned_frame  # noqa: E402
+
+METADATA_PATH = "models/final/xgb_final_metadata.json"
+
+def serving_skew(df: pd.DataFrame, feature_list: list) -> dict:
+    """
+    Feeds the cleaned rows through the API's raw-input path and reports the
+    features whose float32 values differ from the training pipeline's.
+    """
+    complete = df[(df["MonthlyIncome_missing_flag"] == 0) & (df["NumberOfDependents_missing_flag"] == 0)]
+    engineered = full_preprocess(complete)
+    raw = {key: engineered[column].to_numpy(dtype=np.float64) for key, column in RAW_INPUT_COLUMNS.items()}
+    served = preprocess_columnar(raw, feature_list)
+    trained = engineered[feature_list].to_numpy(dtype=np.float32)
+    mismatch = served.view(np.uint32) != trained.view(np.uint32)
+    return {name: int(n) for name, n in zip(feature_list, mismatch.sum(axis=0)) if n}
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with open(METADATA_PATH, "r") as f:
+        feature_list = json.load(f)["features"]
+    df = make_cleaned_frame(args.rows)
+
+    # reference_preprocess adds columns to the frame it is given, so it gets its own copy
+    expected, full_time, full_peak = measure(lambda: reference_preprocess(df.copy())[feature_list])
+    actual, fused_time, fused_peak = measure(lambda: fused_preprocess(df, feature_list))
+
+    # Flags and passed-through columns keep narrow dtypes, so values are compared, not dtypes
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True, check_dtype=False)
+    print(f"✅ Parity: {args.rows} rows x {len(feature_list)} features identical.")
+
+    # Skew checks on a sample: registry scalar vs batch modes vs the reference chain, and serving vs training
+    sample = df.head(5_000)
+    report = parity_report(compile_features(feature_list, sample.columns), sample, reference_preprocess(sample.copy()))
+    skew = serving_skew(sample, feature_list)
+    if report or skew:
+        raise SystemExit(f"❌ Feature skew detected: registry {report}, serving vs training {skew}")
+    print("✅ No skew between registry modes, the reference chain and the serving path.")
+    print(f"reference chain:  {full_time:>8.3f} s   peak {full_peak:>9.1f} MiB (includes a copy of the input)")
+    print(f"fused_preprocess: {fused_time:>8.3f} s   peak {fused_peak:>9.1f} MiB")
+    ratio, direction = (full_peak / fused_peak, "lower") if fused_peak <= full_peak else (fused_peak / full_peak, "higher")
+    print(f"Speed-up {full_time / fused_time:.1f}x, peak memory {ratio:.1f}x {direction}")
+    if fused_peak > full_peak:
+        raise SystemExit("❌ fused_preprocess used more memory than the reference chain")
@@ -0,0 +1,57 @@
+"""
+Latency micro-benchmark for single-record scoring: predict_single (one-row
+DataFrame + XGBClassifier.predict_proba) versus SinglePredictor (reusable
+float32 buffer + booster.inplace_predict).
+
+Run from the repository root:
+    python -m benchmarks.bench_predict_single --iterations 5000
+"""
+import argparse
+import json
+import time
+
+import joblib
+import numpy as np
+
+from tests.synthetic import make_raw_columns, to_records
+from src.api.utils import SinglePredictor, predict_single, preprocess
+
+MODEL_PATH = "models/final/xgb_final_model.joblib"
+METADATA_PATH = "models/final/xgb_final_metadata.json"
+
+def latencies_us(fn, records: list) -> np.ndarray:
+    timings = np.empty(len(records))
+    for i, record in enumerate(records):
+        start = time.perf_counter()
+        fn(record)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+def report(name: str, timings: np.ndarray):
+    p50, p99 = np.percentile(timings, [50, 99])
+    print(f"{name:<22} p50 {p50:>9.1f} µs   p99 {p99:>9.1f} µs")
+    return p50, p99
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5_000)
+    args = parser.parse_args()
+
+    model = joblib.load(MODEL_PATH)
+    with open(METADATA_PATH, "r") as f:
+        metadata = json.load(f)
+    feature_list = metadata["features"]
+    threshold = metadata.get("threshold", 0.5)
+    predictor = SinglePredictor(model, feature_list, threshold)
+
+    records = [preprocess(r) for r in to_records(make_raw_columns(args.iterations))]
+
+    # Both paths must agree before timing them
+    for record in records[:500]:
+        slow = predict_single(record, model, feature_list, threshold)
+        fast = predictor.predict(record)
+        assert slow["label"] == fast["label"] and abs(float(slow["probability"]) - fast["probability"]) < 1e-6
+
+    slow_p50, slow_p99 = report("predict_single", latencies_us(lambda r: predict_single(r, model, feature_list, threshold), records))
+    fast_p50, fast_p99 = report("SinglePredictor", latencies_us(predictor.predict, records))
+    print(f"Speed-up: p50 {slow_p50 / fast_p50:.1f}x, p99 {slow_p99 / fast_p99:.1f}x")
@@ -0,0 +1,62 @@
+"""
+Parity check and throughput benchmark for the scalar preprocess() and the
+columnar preprocess_columnar() paths.
+
+Run from the repository root:
+    python -m benchmarks.bench_preprocess --rows 100000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from src.api.utils import RAW_DEFAULTS, preprocess, preprocess_columnar
+from tests.synthetic import EDGE_CASES, make_raw_columns, to_records
+
+METADATA_PATH = "models/final/xgb_final_metadata.json"
+
+def check_parity(records: list, feature_list: list):
+    expected = np.array(
+        [[preprocess(record)[name] for name in feature_list] for record in records], dtype=np.float32
+    )
+    columns = {name: np.array([r.get(name, np.nan) for r in records], dtype=np.float64) for name in RAW_DEFAULTS}
+    actual = preprocess_columnar(columns, feature_list)
+
+    mismatch = expected.view(np.uint32) != actual.view(np.uint32)
+    if mismatch.any():
+        row, col = np.argwhere(mismatch)[0]
+        raise AssertionError(
+            f"{mismatch.sum()} mismatching cells, first at row {row} ({records[row]}) "
+            f"feature {feature_list[col]}: scalar={expected[row, col]!r} columnar={actual[row, col]!r}"
+        )
+    print(f"✅ Parity: {len(records)} rows x {len(feature_list)} features bit-for-bit identical.")
+
+def benchmark(rows: int, feature_list: list):
+    columns = make_raw_columns(rows, seed=1)
+    records = to_records(columns)
+
+    start = time.perf_counter()
+    for record in records:
+        preprocess(record)
+    scalar_rate = rows / (time.perf_counter() - start)
+
+    out = np.empty((rows, len(feature_list)), dtype=np.float32)
+    start = time.perf_counter()
+    preprocess_columnar(columns, feature_list, out=out)
+    columnar_rate = rows / (time.perf_counter() - start)
+
+    print(f"preprocess (scalar):    {scalar_rate:>14,.0f} rows/sec")
+    print(f"preprocess_columnar:    {columnar_rate:>14,.0f} rows/sec ({columnar_rate / scalar_rate:.0f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--parity-rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with open(METADATA_PATH, "r") as f:
+        feature_list = json.load(f)["features"]
+
+    check_parity(EDGE_CASES + to_records(make_raw_columns(args.parity_rows)), feature_list)
+    benchmark(args.rows, feature_list)
@@ -0,0 +1,87 @@
+"""
+Per-request CPU time of /predict's validation, feature-set checks and
+response serialization: the previous path (json.loads, a RootModel[Dict]
+body, per-request set checks and the stdlib JSON encoder) against the
+typed request model validated from bytes, precomputed checks and
+FastJSONResponse, and against packed float64 input. Preprocessing and
+scoring are unchanged between the paths and are left out.
+
+Run from the repository root:
+    python -m benchmarks.bench_request_path --requests 50000
+"""
+import argparse
+import json
+import time
+from typing import Dict
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from pydantic import RootModel
+
+from tests.synthetic import make_raw_credit_frame, to_api_records
+from src.api.app import FastJSONResponse, orjson, parse_raw_input
+from src.api.utils import RAW_DEFAULTS, SERVING_FEATURES, feature_set_mismatch
+
+class DictInputRequest(RootModel[Dict[str, float]]):
+    pass
+
+RESULT = {"label": 0, "probability": 0.0734}
+FEATURE_LIST = list(SERVING_FEATURES)
+PROCESSED = dict.fromkeys(SERVING_FEATURES, 0.0)
+
+def previous_path(body: bytes):
+    raw = DictInputRequest.model_validate(json.loads(body)).root
+    missing = set(FEATURE_LIST) - set(PROCESSED.keys())
+    extra = set(PROCESSED.keys()) - set(FEATURE_LIST)
+    if missing or extra:
+        raise AssertionError
+    return raw, JSONResponse(content={"prediction": RESULT}).body
+
+MISSING, EXTRA = feature_set_mismatch(FEATURE_LIST)
+
+def json_path(body: bytes):
+    raw = parse_raw_input(body, "application/json")
+    if MISSING or EXTRA:
+        raise AssertionError
+    return raw, FastJSONResponse(content={"prediction": RESULT}).body
+
+def packed_path(body: bytes):
+    raw = parse_raw_input(body, "application/octet-stream")
+    if MISSING or EXTRA:
+        raise AssertionError
+    return raw, FastJSONResponse(content={"prediction": RESULT}).body
+
+def cpu_per_request(fn, bodies: list) -> float:
+    for body in bodies[:1000]:
+        fn(body)  # warm-up
+    start = time.process_time()
+    for body in bodies:
+        fn(body)
+    return (time.process_time() - start) / len(bodies)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-request CPU time of /predict validation and serialization.")
+    parser.add_argument("--requests", type=int, default=50_000)
+    args = parser.parse_args()
+
+    records = to_api_records(make_raw_credit_frame(args.requests))
+    json_bodies = [json.dumps(r).encode() for r in records]
+    packed_bodies = [
+        np.array([r.get(key, np.nan) for key in RAW_DEFAULTS], dtype="<f8").tobytes() for r in records
+    ]
+
+    # Both JSON paths must see the same inputs
+    for body in json_bodies[:1000]:
+        before, after = previous_path(body)[0], json_path(body)[0]
+        assert all(after[k] == v for k, v in before.items()), "JSON paths disagree"
+
+    baseline = cpu_per_request(previous_path, json_bodies)
+    print(f"JSON encoder for responses: {'orjson' if orjson is not None else 'stdlib json (orjson not installed)'}")
+    print(f"{'path':<28}{'CPU µs/request':>16}{'CPU saved':>13}")
+    for name, fn, bodies in (
+        ("previous (dict + sets)", previous_path, json_bodies),
+        ("typed JSON", json_path, json_bodies),
+        ("packed float64", packed_path, packed_bodies),
+    ):
+        seconds = baseline if fn is previous_path else cpu_per_request(fn, bodies)
+        print(f"{name:<28}{seconds * 1e6:>16.2f}{(1 - seconds / baseline):>12.0%}")
@@ -0,0 +1,78 @@
+"""
+Load times of the SQLite, Parquet and Arrow IPC storage backends for the
+typical pipeline reads: a full EDA read of the cleaned table, a training
+read (final feature list + target) of the engineered table, and a filtered
+projection (seniors only). Synthetic tables are written to a temporary
+directory, so the real database is not touched.
+
+Run from the repository root (needs pyarrow):
+    python -m benchmarks.bench_storage --rows 1000000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from tests.synthetic import make_cleaned_frame
+
+# The pipeline scripts import their siblings as top-level modules (run as `python src/...`)
+sys.path.insert(0, "src")
+from feature_engineering import full_preprocess  # noqa: E402
+from storage import load_table, save_table  # noqa: E402
+
+METADATA_PATH = "models/final/xgb_final_metadata.json"
+BACKENDS = ("sqlite", "parquet", "arrow")
+
+def best_of(fn, repeats: int = 3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with open(METADATA_PATH, "r") as f:
+        feature_list = json.load(f)["features"]
+    cleaned = make_cleaned_frame(args.rows)
+    engineered = full_preprocess(cleaned)
+
+    reads = {
+        "EDA: cleaned, all columns": lambda **kw: load_table("credit_risk_cleaned", **kw),
+        "Training: features + target": lambda **kw: load_table(
+            "credit_risk_engineered", columns=feature_list + ["SeriousDlqin2yrs"], **kw
+        ),
+        "Filtered: age >= 60, 3 columns": lambda **kw: load_table(
+            "credit_risk_cleaned", columns=["age", "MonthlyIncome", "SeriousDlqin2yrs"], filters=[("age", ">=", 60)], **kw
+        ),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        locations = {"db_path": os.path.join(tmp, "loanvet.db"), "root": os.path.join(tmp, "store")}
+        sqlite3.connect(locations["db_path"]).close()
+        for backend in BACKENDS:
+            save_table(cleaned, "credit_risk_cleaned", backend, **locations)
+            save_table(engineered, "credit_risk_engineered", backend, **locations)
+
+        print(f"{'read':<32}" + "".join(f"{backend:>12}" for backend in BACKENDS))
+        for name, read in reads.items():
+            results, timings = {}, {}
+            for backend in BACKENDS:
+                results[backend], timings[backend] = best_of(lambda: read(backend=backend, **locations))
+            # Every backend must return the same rows (multi-file datasets may interleave row order)
+            canonical = {
+                backend: df.astype("float64").sort_values(list(df.columns)).reset_index(drop=True)
+                for backend, df in results.items()
+            }
+            for backend in BACKENDS[1:]:
+                pd.testing.assert_frame_equal(canonical[backend], canonical["sqlite"])
+            print(f"{name:<32}" + "".join(f"{timings[backend] * 1e3:>10.1f}ms" for backend in BACKENDS))
@@ -0,0 +1,102 @@
+"""
+Closed-loop load test for /predict scoring: per-request scoring in a worker
+thread (micro-batching disabled) versus the MicroBatcher, at increasing
+numbers of concurrent clients. Reports requests/sec and p50/p99 latency per
+level and the first concurrency at which micro-batching is faster.
+
+Scoring is driven in-process on one event loop, as a single API worker runs
+it, so the numbers exclude HTTP parsing.
+
+Run from the repository root:
+    python -m benchmarks.load_test_predict --requests 4000 --max-wait-ms 2
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import joblib
+import numpy as np
+
+from tests.synthetic import make_raw_columns, to_records
+from src.api.batcher import MicroBatcher
+from src.api.utils import SinglePredictor, preprocess
+
+MODEL_PATH = "models/final/xgb_final_model.joblib"
+METADATA_PATH = "models/final/xgb_final_metadata.json"
+
+CONCURRENCY_LEVELS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+# Requests being scored, as the API's in-flight gauge counts /predict requests for the batcher
+in_flight = [0]
+
+async def run_clients(score, records: list, concurrency: int):
+    latencies = np.empty(len(records))
+    next_index = iter(range(len(records)))
+
+    async def client():
+        for i in next_index:
+            start = time.perf_counter()
+            in_flight[0] += 1
+            try:
+                await score(records[i])
+            finally:
+                in_flight[0] -= 1
+            latencies[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return len(records) / elapsed, latencies * 1e3
+
+async def load_test(predictor: SinglePredictor, records: list, max_batch_size: int, max_wait_ms: float):
+    batcher = MicroBatcher(max_batch_size, max_wait_ms, in_flight=lambda: in_flight[0])
+    batcher.start()
+
+    async def direct(record):
+        return await asyncio.to_thread(predictor.predict, record)
+
+    async def batched(record):
+        return await batcher.predict(predictor, record)
+
+    print(f"{'clients':>7} | {'direct req/s':>12} {'p50 ms':>8} {'p99 ms':>8} | {'batched req/s':>13} {'p50 ms':>8} {'p99 ms':>8}")
+    crossover = None
+    try:
+        for concurrency in CONCURRENCY_LEVELS:
+            direct_rps, direct_ms = await run_clients(direct, records, concurrency)
+            batched_rps, batched_ms = await run_clients(batched, records, concurrency)
+            d50, d99 = np.percentile(direct_ms, [50, 99])
+            b50, b99 = np.percentile(batched_ms, [50, 99])
+            print(f"{concurrency:>7} | {direct_rps:>12.0f} {d50:>8.2f} {d99:>8.2f} | {batched_rps:>13.0f} {b50:>8.2f} {b99:>8.2f}")
+            if crossover is None and batched_rps > direct_rps:
+                crossover = concurrency
+    finally:
+        await batcher.stop()
+
+    if crossover is None:
+        print("Micro-batching did not overtake per-request scoring at the tested concurrency levels.")
+    else:
+        print(f"Crossover: micro-batching is faster from {crossover} concurrent clients.")
+    print(f"Batcher stats: {batcher.stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=4_000, help="requests per concurrency level and mode")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    model = joblib.load(MODEL_PATH)
+    with open(METADATA_PATH, "r") as f:
+        metadata = json.load(f)
+    predictor = SinglePredictor(model, metadata["features"], metadata.get("threshold", 0.5))
+
+    records = [preprocess(r) for r in to_records(make_raw_columns(args.requests))]
+
+    # The batched path must agree with single-record scoring before timing it
+    matrix = np.stack([predictor.vector(r) for r in records[:500]])
+    batched = predictor.predict_matrix(matrix)
+    for record, proba in zip(records[:500], batched):
+        assert abs(predictor.predict(record)["probability"] - float(proba)) < 1e-6
+
+    asyncio.run(load_test(predictor, records, args.max_batch_size, args.max_wait_ms))
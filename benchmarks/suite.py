@@ -0,0 +1,219 @@
+"""
+Reproducible benchmark suite over synthetic Give Me Some Credit data.
+
+Cases: scalar preprocess, predict_single, predict_batch, POST /predict
+through an in-process ASGI client, full_preprocess,
+cap_outliers/impute_missing_values and the chunked SQLite import. Each case
+runs --repeats times on the same seeded data; the median, min and max wall
+time and rows/sec go to a JSON file together with the library versions.
+Cases that need the model are reported as skipped when it cannot be loaded.
+
+--compare flags regressions against a stored baseline: a case whose median
+time is more than --tolerance slower fails the run (exit status 1).
+
+Run from the repository root:
+    python -m benchmarks.suite --output benchmarks/results.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from importlib import metadata as importlib_metadata
+
+import numpy as np
+
+from tests.synthetic import make_raw_credit_frame, to_api_records, to_csv
+
+# The pipeline scripts import their siblings as top-level modules (run as `python src/...`)
+sys.path.insert(0, "src")
+
+MODEL_PATH = "models/final/xgb_final_model.joblib"
+METADATA_PATH = "models/final/xgb_final_metadata.json"
+PACKAGES = ("numpy", "pandas", "xgboost", "scikit-learn", "fastapi", "starlette", "pydantic", "httpx")
+
+class Skip(Exception):
+    pass
+
+def load_model():
+    try:
+        import joblib
+
+        model = joblib.load(MODEL_PATH)
+    except Exception as e:
+        raise Skip(f"model unavailable: {e}")
+    with open(METADATA_PATH, "r") as f:
+        metadata = json.load(f)
+    return model, metadata["features"], metadata.get("threshold", 0.5)
+
+# Each case builds its data for a row count and returns (function to time, rows processed per call)
+
+def case_preprocess(rows):
+    from src.api.utils import preprocess
+
+    records = to_api_records(make_raw_credit_frame(rows))
+    return lambda: [preprocess(r) for r in records], len(records)
+
+def case_predict_single(rows):
+    from src.api.utils import predict_single, preprocess
+
+    model, feature_list, threshold = load_model()
+    records = [preprocess(r) for r in to_api_records(make_raw_credit_frame(rows))]
+    return lambda: [predict_single(r, model, feature_list, threshold) for r in records], len(records)
+
+def case_predict_batch(rows):
+    from src.api.utils import predict_batch, preprocess_columnar
+    import pandas as pd
+
+    model, feature_list, threshold = load_model()
+    records = to_api_records(make_raw_credit_frame(rows))
+    features = pd.DataFrame(preprocess_columnar(pd.DataFrame.from_records(records), feature_list), columns=feature_list)
+    return lambda: predict_batch(features, model, feature_list, threshold), len(features)
+
+def case_predict_endpoint(rows):
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError as e:
+        raise Skip(f"ASGI test client unavailable: {e}")
+    load_model()
+    os.environ["LOANVET_BACKGROUND_WARMUP"] = "0"
+    # Every request must reach the model, so the prediction cache is turned off
+    os.environ["LOANVET_CACHE_SIZE"] = "0"
+    from src.api.app import app
+
+    records = to_api_records(make_raw_credit_frame(rows))
+    client = TestClient(app)
+    client.__enter__()
+
+    def run():
+        for record in records:
+            response = client.post("/predict", json=record)
+            response.raise_for_status()
+
+    return run, len(records)
+
+def case_full_preprocess(rows):
+    from data_cleaning import cap_outliers, create_missing_flags, custom_caps, impute_missing_values
+    from feature_engineering import full_preprocess
+
+    raw = make_raw_credit_frame(rows).iloc[:, 1:]
+    cleaned = cap_outliers(impute_missing_values(create_missing_flags(raw.copy())), custom_caps)
+    return lambda: full_preprocess(cleaned), len(cleaned)
+
+def case_clean(rows):
+    from data_cleaning import cap_outliers, create_missing_flags, custom_caps, impute_missing_values
+
+    raw = make_raw_credit_frame(rows).iloc[:, 1:]
+    return lambda: cap_outliers(impute_missing_values(create_missing_flags(raw.copy())), custom_caps), len(raw)
+
+def case_sqlite_import(rows):
+    from import_csv_to_sqlite import import_csv
+
+    tmp = tempfile.mkdtemp(prefix="loanvet-bench-")
+    csv_path = os.path.join(tmp, "credit_train.csv")
+    to_csv(make_raw_credit_frame(rows), csv_path)
+
+    def run():
+        import_csv(csv_path, os.path.join(tmp, "loanvet.db"), restart=True)
+
+    return run, rows
+
+# name -> (case, default rows)
+CASES = {
+    "preprocess": (case_preprocess, 20_000),
+    "predict_single": (case_predict_single, 2_000),
+    "predict_batch": (case_predict_batch, 200_000),
+    "predict_endpoint": (case_predict_endpoint, 1_000),
+    "full_preprocess": (case_full_preprocess, 200_000),
+    "cap_outliers_impute": (case_clean, 200_000),
+    "sqlite_import": (case_sqlite_import, 200_000),
+}
+
+def environment() -> dict:
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = importlib_metadata.version(package)
+        except importlib_metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": versions,
+    }
+
+def run_case(name: str, rows: int, repeats: int) -> dict:
+    case, _ = CASES[name]
+    try:
+        fn, processed = case(rows)
+    except Skip as e:
+        return {"skipped": str(e)}
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    median = float(np.median(timings))
+    return {
+        "rows": processed,
+        "repeats": repeats,
+        "median_seconds": median,
+        "min_seconds": float(np.min(timings)),
+        "max_seconds": float(np.max(timings)),
+        "rows_per_second": processed / median if median > 0 else None,
+    }
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Prints the median-time ratio per case and returns the names of regressed cases."""
+    regressions = []
+    print(f"\n{'case':<22}{'baseline':>12}{'current':>12}{'ratio':>9}")
+    for name, current in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before or "median_seconds" not in before or "median_seconds" not in current:
+            print(f"{name:<22}{'-':>12}{'-':>12}{'n/a':>9}")
+            continue
+        ratio = current["median_seconds"] / before["median_seconds"]
+        regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(name)
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<22}{before['median_seconds']:>11.4f}s{current['median_seconds']:>11.4f}s{ratio:>8.2f}x{flag}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="*", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier on every case's default row count")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before a case is flagged")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.cases:
+        rows = max(1, int(CASES[name][1] * args.scale))
+        results[name] = run_case(name, rows, args.repeats)
+        result = results[name]
+        if "skipped" in result:
+            print(f"{name:<22} skipped ({result['skipped']})")
+        else:
+            print(f"{name:<22} {result['median_seconds']:>9.4f}s median  {result['rows_per_second']:>14,.0f} rows/sec")
+
+    report = {"created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "environment": environment(), "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            sys.exit(f"❌ Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        print("✅ No regressions against the baseline.")
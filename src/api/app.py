@@ -1,14 +1,36 @@
-import json
+import asyncio
 import logging
-import joblib
-from fastapi import FastAPI, HTTPException
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import RootModel
-from typing import Dict
-from xgboost import XGBClassifier
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, RootModel, ValidationError
+from typing import Dict, List, Optional, Tuple
 import numpy as np
+import pandas as pd
 
-from src.api.utils import predict_single, preprocess
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from src.api.batcher import MicroBatcher
+from src.api.cache import build_cache, feature_key
+from src.api.compiled_model import COMPILED_MODEL_PATH
+from src.api.explain import DEFAULT_TOP_K
+from src.api.metrics import CONTENT_TYPE, MetricsMiddleware, MetricsRegistry, SampledLogger
+from src.api.registry import ModelRegistry, ModelVersion
+from src.api.shadow import ShadowScorer
+from src.api.utils import predict_batch, preprocess, preprocess_batch, unpack_raw
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,33 +39,184 @@ logging.basicConfig(level=logging.INFO)
 MODEL_PATH = "models/final/xgb_final_model.joblib"
 METADATA_PATH = "models/final/xgb_final_metadata.json"
 
+# LOANVET_MODEL_BACKEND=compiled serves the memory-mapped .npz export instead of the
+# joblib XGBClassifier, so forked workers share one read-only copy of the model.
+MODEL_BACKEND = os.getenv("LOANVET_MODEL_BACKEND", "joblib")
+
+# Rows scored per predict_batch call; bounds memory for batch and streaming uploads
+BATCH_CHUNK_SIZE = 10_000
+# Streaming uploads larger than this are spooled to a temporary file
+STREAM_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+# Load and warm the model in a background thread so workers bind immediately;
+# set LOANVET_BACKGROUND_WARMUP=0 to load before serving and fail startup on error.
+BACKGROUND_WARMUP = os.getenv("LOANVET_BACKGROUND_WARMUP", "1").lower() in ("1", "true", "yes")
+
+# Prediction cache in front of /predict; LOANVET_CACHE_SIZE=0 disables it.
+# LOANVET_CACHE_BACKEND=redis shares it between workers via LOANVET_REDIS_URL.
+CACHE_BACKEND = os.getenv("LOANVET_CACHE_BACKEND", "local")
+CACHE_SIZE = int(os.getenv("LOANVET_CACHE_SIZE", "10000"))
+CACHE_TTL_SECONDS = float(os.getenv("LOANVET_CACHE_TTL_SECONDS", "900"))
+# Contributions cached by /explain, on the same backend; LOANVET_EXPLAIN_CACHE_SIZE=0 disables it
+EXPLAIN_CACHE_SIZE = int(os.getenv("LOANVET_EXPLAIN_CACHE_SIZE", "10000"))
+
+# Concurrent /predict requests are coalesced into batches of up to MICROBATCH_MAX_SIZE rows,
+# waiting at most MICROBATCH_MAX_WAIT_MS for a batch to fill and not at all when no other /predict
+# request is in flight; LOANVET_MICROBATCH_MAX_SIZE=1 disables it.
+MICROBATCH_MAX_SIZE = int(os.getenv("LOANVET_MICROBATCH_MAX_SIZE", "64"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("LOANVET_MICROBATCH_MAX_WAIT_MS", "2"))
+
+# Fraction of /predict requests whose result is logged at INFO; logging every result costs time under load
+LOG_SAMPLE_RATE = float(os.getenv("LOANVET_LOG_SAMPLE_RATE", "0.01"))
+
+# The model and metadata files are polled every LOANVET_MODEL_POLL_SECONDS and a changed model is
+# loaded in the background and swapped in once warmed up; 0 disables reloading.
+MODEL_POLL_SECONDS = float(os.getenv("LOANVET_MODEL_POLL_SECONDS", "5"))
+
+# A candidate model served next to the active one: LOANVET_AB_MODE=split sends it a LOANVET_AB_SPLIT
+# fraction of requests, LOANVET_AB_MODE=shadow scores every /predict request with it in
+# LOANVET_SHADOW_WORKERS background threads and only reports the results.
+CANDIDATE_MODEL_PATH = os.getenv("LOANVET_CANDIDATE_MODEL_PATH")
+CANDIDATE_METADATA_PATH = os.getenv("LOANVET_CANDIDATE_METADATA_PATH")
+AB_MODE = os.getenv("LOANVET_AB_MODE", "split")
+AB_SPLIT = float(os.getenv("LOANVET_AB_SPLIT", "0.1"))
+SHADOW_WORKERS = int(os.getenv("LOANVET_SHADOW_WORKERS", "1"))
+SHADOW_MAX_PENDING = int(os.getenv("LOANVET_SHADOW_MAX_PENDING", "1000"))
+
 # WARNING: Consider saving/loading XGBoost model using Booster.save_model / load_model for compatibility.
 # Current loading via joblib may raise warnings if versions differ.
 
-# Load model
-try:
-    model: XGBClassifier = joblib.load(MODEL_PATH)
-    logging.info("✅ Model loaded successfully.")
-except Exception as e:
-    logging.error(f"❌ Failed to load model: {e}")
-    raise RuntimeError("Failed to load model.")
+def _record_reload(slot: str, version, seconds: float):
+    MODEL_RELOADS.inc(slot, "success" if version is not None else "failure")
+    if version is not None:
+        MODEL_RELOAD_LATENCY.observe(seconds, slot)
 
-# Load metadata (features and threshold)
-try:
-    with open(METADATA_PATH, "r") as f:
-        metadata = json.load(f)
-    threshold = metadata.get("threshold", 0.5)
-    feature_list = metadata.get("features", [])
-    logging.info(f"✅ Metadata loaded successfully with {len(feature_list)} features.")
-except Exception as e:
-    logging.error(f"❌ Failed to load metadata: {e}")
-    raise RuntimeError("Failed to load metadata.")
-
-# Pydantic model for validating raw input data (before preprocessing)
-class RawInputRequest(RootModel[Dict[str, float]]):
+def _record_shadow(version: ModelVersion, result: dict, served: dict, seconds: float):
+    MODEL_SCORES.observe(result["probability"], version.fingerprint, "shadow")
+    MODEL_PREDICT_LATENCY.observe(seconds, version.fingerprint, "shadow")
+    if result["label"] != served["label"]:
+        SHADOW_DISAGREEMENTS.inc(version.fingerprint)
+
+# The model is loaded by the app lifespan, not at import
+registry = ModelRegistry(
+    COMPILED_MODEL_PATH if MODEL_BACKEND == "compiled" else MODEL_PATH,
+    METADATA_PATH,
+    MODEL_BACKEND,
+    candidate_model_path=CANDIDATE_MODEL_PATH,
+    candidate_metadata_path=CANDIDATE_METADATA_PATH,
+    mode=AB_MODE,
+    split=AB_SPLIT,
+    on_reload=_record_reload,
+)
+shadow_scorer = ShadowScorer(SHADOW_WORKERS, SHADOW_MAX_PENDING, _record_shadow) if CANDIDATE_MODEL_PATH and AB_MODE == "shadow" else None
+prediction_cache = build_cache(CACHE_BACKEND, CACHE_SIZE, CACHE_TTL_SECONDS, os.getenv("LOANVET_REDIS_URL"))
+explanation_cache = build_cache(CACHE_BACKEND, EXPLAIN_CACHE_SIZE, CACHE_TTL_SECONDS, os.getenv("LOANVET_REDIS_URL"),
+                                prefix="loanvet:explanation:")
+# Only /predict uses the batcher, so its in-flight count bounds the requests that can join a batch
+batcher = MicroBatcher(MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_MS,
+                       in_flight=lambda: HTTP_IN_FLIGHT.value("/predict")) if MICROBATCH_MAX_SIZE > 1 else None
+prediction_log = SampledLogger(logging.getLogger(__name__), LOG_SAMPLE_RATE)
+
+# Prometheus metrics, exposed on /metrics
+metrics = MetricsRegistry()
+HTTP_REQUESTS = metrics.counter(
+    "loanvet_http_requests_total", "HTTP requests by method, route and status code.", ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = metrics.gauge("loanvet_http_requests_in_flight", "HTTP requests being served.", ("route",))
+HTTP_LATENCY = metrics.histogram(
+    "loanvet_http_request_duration_seconds", "End-to-end HTTP request latency.", ("route",)
+)
+PREDICT_STAGE_LATENCY = metrics.histogram(
+    "loanvet_predict_stage_duration_seconds",
+    "Latency of each /predict stage (validation, preprocess, feature_check, predict, serialization).",
+    ("stage",),
+)
+PREDICTIONS = metrics.counter(
+    "loanvet_predictions_total", "Single predictions served, from the model or the cache.", ("model_version", "source")
+)
+MODEL_INFO = metrics.gauge(
+    "loanvet_model_info",
+    "The served model versions (variant active, candidate or shadow); the value is 1 while loaded.",
+    ("model_version", "variant", "backend", "model_path"),
+)
+# Probability buckets for score distributions, 0.05 wide
+SCORE_BUCKETS = tuple(round(0.05 * i, 2) for i in range(1, 21))
+MODEL_SCORES = metrics.histogram(
+    "loanvet_model_score",
+    "Predicted probability of default by model version and variant (active, candidate or shadow).",
+    ("model_version", "variant"),
+    buckets=SCORE_BUCKETS,
+)
+MODEL_PREDICT_LATENCY = metrics.histogram(
+    "loanvet_model_predict_duration_seconds",
+    "Model scoring latency of /predict by model version and variant; cache hits are not included.",
+    ("model_version", "variant"),
+)
+SHADOW_DISAGREEMENTS = metrics.counter(
+    "loanvet_shadow_label_disagreements_total", "Shadow predictions whose label differs from the served one.",
+    ("model_version",),
+)
+MODEL_RELOADS = metrics.counter(
+    "loanvet_model_reloads_total", "Model reloads by slot (active or candidate) and result.", ("slot", "result")
+)
+MODEL_RELOAD_LATENCY = metrics.histogram(
+    "loanvet_model_reload_duration_seconds", "Time to load and warm up a reloaded model.", ("slot",)
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    registry.start(background=BACKGROUND_WARMUP)
+    registry.watch(MODEL_POLL_SECONDS)
+    if batcher is not None:
+        batcher.start()
+    yield
+    if batcher is not None:
+        await batcher.stop()
+    registry.stop_watching()
+    if shadow_scorer is not None:
+        shadow_scorer.shutdown()
+
+def require_feature_match(loaded: ModelVersion):
+    """
+    Rejects requests when preprocess() does not produce exactly the model's
+    features; preprocess() always produces the same features, so the sets
+    are computed once when the model is loaded.
+    """
+    if loaded.missing_features:
+        raise HTTPException(status_code=422, detail=f"Missing features after preprocessing: {loaded.missing_features}")
+    if loaded.extra_features:
+        raise HTTPException(status_code=422, detail=f"Unexpected features after preprocessing: {loaded.extra_features}")
+
+def require_model() -> Tuple[ModelVersion, str]:
+    """
+    The model version (and its variant) a request is scored with. The request
+    keeps it to the end, even if a reload swaps in another version meanwhile.
+    """
+    if not registry.loaded:
+        raise HTTPException(status_code=503, detail="Model is not loaded yet.")
+    return registry.select()
+
+# Pydantic model for validating raw input data (before preprocessing). Absent or null
+# inputs fall back to preprocess() defaults; unknown keys are ignored. Counts cannot be negative.
+class RawInputRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    age: Optional[float] = None
+    monthly_income: Optional[float] = None
+    number_of_dependents: Optional[float] = Field(None, ge=0)
+    number_of_open_credit_lines_and_loans: Optional[float] = Field(None, ge=0)
+    number_real_estate_loans_or_lines: Optional[float] = Field(None, ge=0)
+    debt_ratio: Optional[float] = None
+    revolving_utilization_of_unsecured_lines: Optional[float] = None
+    total_delinquencies: Optional[float] = Field(None, ge=0)
+    number_of_times_90_days_late: Optional[float] = Field(None, ge=0)
+
+# Pydantic model for a list of raw records scored by /predict/batch. Null values are
+# treated as missing, with the same preprocess() defaults as /predict.
+class BatchInputRequest(RootModel[List[Dict[str, Optional[float]]]]):
     pass
 
-app = FastAPI(title="LoanVet Credit Risk Model API")
+app = FastAPI(title="LoanVet Credit Risk Model API", lifespan=lifespan)
 
 # CORS settings for your frontend domain(s)
 origins = [
@@ -58,17 +231,87 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it is the outermost middleware and times the whole request
+app.add_middleware(MetricsMiddleware, requests=HTTP_REQUESTS, in_flight=HTTP_IN_FLIGHT, latency=HTTP_LATENCY)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed."""
+
+    def render(self, content) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content)
+
+# Request bodies accepted by /predict besides JSON
+PACKED_CONTENT_TYPE = "application/octet-stream"
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack")
+# The body is parsed by parse_raw_input, so its schema is declared for the docs
+RAW_INPUT_OPENAPI = {"requestBody": {"required": True, "content": {
+    "application/json": {"schema": RawInputRequest.model_json_schema()},
+    PACKED_CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}},
+    MSGPACK_CONTENT_TYPES[0]: {"schema": {"type": "string", "format": "binary"}},
+}}}
+
+def parse_raw_input(body: bytes, content_type: str) -> dict:
+    """
+    Raw inputs from a /predict body: JSON (validated by pydantic straight
+    from bytes), a packed float64 array (see utils.unpack_raw) or msgpack.
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type == PACKED_CONTENT_TYPE:
+        try:
+            return unpack_raw(body)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid packed input: {e}")
+    try:
+        if media_type in MSGPACK_CONTENT_TYPES:
+            if msgpack is None:
+                raise HTTPException(status_code=415, detail="msgpack input requires the 'msgpack' package.")
+            try:
+                payload = msgpack.unpackb(body)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Invalid msgpack body: {e}")
+            return RawInputRequest.model_validate(payload).model_dump()
+        return RawInputRequest.model_validate_json(body).model_dump()
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+
+def _observe_stage(stage: str, start: float) -> float:
+    now = time.perf_counter()
+    PREDICT_STAGE_LATENCY.observe(now - start, stage)
+    return now
+
 @app.get("/")
 async def root():
     return {"message": "LoanVet API is running."}
 
-@app.post("/predict")
-async def predict_endpoint(raw_input: RawInputRequest):
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the worker process is up and serving requests."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: the model is loaded and warmed up. Includes startup timings."""
+    status = registry.status()
+    return JSONResponse(status_code=200 if registry.ready else 503, content=status)
+
+@app.post(
+    "/predict",
+    response_class=FastJSONResponse,
+    openapi_extra=RAW_INPUT_OPENAPI,
+)
+async def predict_endpoint(request: Request):
     """
     Accepts raw input features, preprocesses them into engineered features,
     validates feature completeness, then predicts credit risk using the loaded model.
     """
-    raw_data = raw_input.root
+    # Validation is timed from the request's arrival, so it includes reading the body
+    request_start = request.scope.get("state", {}).get("request_start") or time.perf_counter()
+    raw_data = parse_raw_input(await request.body(), request.headers.get("content-type", ""))
+    stage_start = _observe_stage("validation", request_start)
+
+    loaded, variant = require_model()
 
     # Preprocess raw input to engineered features
     try:
@@ -76,26 +319,261 @@ async def predict_endpoint(raw_input: RawInputRequest):
     except Exception as e:
         logging.error(f"Error during preprocessing: {e}")
         raise HTTPException(status_code=400, detail=f"Preprocessing error: {e}")
+    stage_start = _observe_stage("preprocess", stage_start)
+
+    require_feature_match(loaded)
+    stage_start = _observe_stage("feature_check", stage_start)
+
+    # Repeat scores of an equivalent feature vector are served from the cache
+    source = "model"
+    result = None
+    if prediction_cache is not None:
+        cache_key = feature_key(processed_data, loaded.feature_list)
+        result = prediction_cache.get(loaded.fingerprint, cache_key)
+        if result is not None:
+            source = "cache"
+
+    if result is None:
+        # Predict using the processed input features; scoring runs off the event loop,
+        # coalesced with other in-flight requests when micro-batching is enabled
+        try:
+            if batcher is not None:
+                result = await batcher.predict(loaded.predictor, processed_data)
+            else:
+                result = await asyncio.to_thread(loaded.predictor.predict, processed_data)
+        except Exception as e:
+            logging.error(f"Prediction error: {e}")
+            raise HTTPException(status_code=500, detail="Prediction failed.")
+
+        if prediction_cache is not None:
+            prediction_cache.set(loaded.fingerprint, cache_key, result)
+        registry.record_prediction()
+        MODEL_PREDICT_LATENCY.observe(time.perf_counter() - stage_start, loaded.fingerprint, variant)
+    MODEL_SCORES.observe(result["probability"], loaded.fingerprint, variant)
+    stage_start = _observe_stage("predict", stage_start)
+
+    shadow = registry.shadow() if shadow_scorer is not None else None
+    if shadow is not None:
+        shadow_scorer.submit(shadow, processed_data, result)
+
+    response = FastJSONResponse(content={"prediction": result})
+    _observe_stage("serialization", stage_start)
+    PREDICTIONS.inc(loaded.fingerprint, source)
+    prediction_log.info("✅ Prediction made: %s", result)
+    return response
+
+def require_explainer(loaded: ModelVersion):
+    try:
+        return loaded.explainer()
+    except Exception as e:
+        logging.error(f"Explainer unavailable: {e}")
+        raise HTTPException(status_code=501, detail="Explanations are not available for this model.")
+
+@app.post("/explain", response_class=FastJSONResponse, openapi_extra=RAW_INPUT_OPENAPI)
+async def explain_endpoint(
+    request: Request,
+    top_k: int = Query(DEFAULT_TOP_K, ge=0, description="Reason codes to return."),
+    contributions: bool = Query(False, description="Also return every feature's contribution."),
+):
+    """
+    Scores one raw record like /predict and explains the score: the top_k
+    engineered features that pushed it towards its label, with their SHAP
+    contributions in log-odds.
+    """
+    raw_data = parse_raw_input(await request.body(), request.headers.get("content-type", ""))
+    loaded, _ = require_model()
+    explainer = require_explainer(loaded)
+
+    try:
+        processed_data = preprocess(raw_data)
+    except Exception as e:
+        logging.error(f"Error during preprocessing: {e}")
+        raise HTTPException(status_code=400, detail=f"Preprocessing error: {e}")
+    # Contributions are labelled by position, so a feature mismatch would mislabel the reasons
+    require_feature_match(loaded)
+
+    matrix = loaded.predictor.vector(processed_data)[None, :]
+    # Contributions only depend on the feature vector, so top_k and contributions are applied after the cache
+    cached = None
+    if explanation_cache is not None:
+        cache_key = feature_key(processed_data, loaded.feature_list)
+        cached = explanation_cache.get(loaded.fingerprint, cache_key)
+    if cached is not None:
+        proba = np.array([cached["probability"]])
+        contribs = np.array([cached["contributions"]], dtype=np.float32)
+    else:
+        try:
+            proba, contribs = await asyncio.to_thread(explainer.compute, matrix)
+        except Exception as e:
+            logging.error(f"Explanation error: {e}")
+            raise HTTPException(status_code=500, detail="Explanation failed.")
+        if explanation_cache is not None:
+            explanation_cache.set(loaded.fingerprint, cache_key,
+                                  {"probability": float(proba[0]), "contributions": contribs[0].tolist()})
 
-    # Check for missing or extra features after preprocessing
-    missing = set(feature_list) - set(processed_data.keys())
-    extra = set(processed_data.keys()) - set(feature_list)
+    explanation = explainer.explanations(matrix, proba, contribs, top_k, contributions)[0]
+    return FastJSONResponse(content={"explanation": explanation})
 
-    if missing:
-        raise HTTPException(status_code=422, detail=f"Missing features after preprocessing: {missing}")
-    if extra:
-        raise HTTPException(status_code=422, detail=f"Unexpected features after preprocessing: {extra}")
+@app.post("/explain/batch")
+def explain_batch_endpoint(
+    raw_input: BatchInputRequest,
+    response: Response,
+    top_k: int = Query(DEFAULT_TOP_K, ge=0, description="Reason codes to return per record."),
+    contributions: bool = Query(False, description="Also return every feature's contribution."),
+):
+    """
+    Accepts a JSON list of raw records and explains them in chunks of
+    BATCH_CHUNK_SIZE rows, each chunk with one contribution call.
+    Explanations are returned in input order.
+    """
+    records = raw_input.root
+    loaded, _ = require_model()
+    require_feature_match(loaded)
+    explainer = require_explainer(loaded)
+    start = time.perf_counter()
 
-    # Predict using the processed input features
+    explanations = []
     try:
-        result = predict_single(processed_data, model, feature_list, threshold)
+        for offset in range(0, len(records), BATCH_CHUNK_SIZE):
+            raw = pd.DataFrame.from_records(records[offset:offset + BATCH_CHUNK_SIZE])
+            matrix = preprocess_batch(raw, loaded.feature_list).to_numpy(np.float32)
+            explanations.extend(explainer.explain(matrix, top_k, contributions))
+    except Exception as e:
+        logging.error(f"Batch explanation error: {e}")
+        raise HTTPException(status_code=500, detail="Batch explanation failed.")
+
+    elapsed = time.perf_counter() - start
+    _throughput_headers(response, len(records), elapsed)
+    logging.info(f"✅ Batch explanation made for {len(records)} rows in {elapsed:.3f}s")
+    return {"explanations": explanations}
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Request, stage latency and model metrics in the Prometheus text format."""
+    # Rebuilt on every scrape, so versions that were swapped out disappear
+    MODEL_INFO.clear()
+    candidate_variant = "shadow" if registry.mode == "shadow" else "candidate"
+    for variant, version in (("active", registry.active), (candidate_variant, registry.candidate)):
+        if version is not None:
+            MODEL_INFO.set(version.fingerprint, variant, registry.backend, version.model_path, value=1)
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+@app.get("/models")
+async def models_status():
+    """Served model versions, A/B configuration, recent reloads and shadow scoring counters."""
+    status = registry.status()
+    status["shadow"] = shadow_scorer.stats() if shadow_scorer is not None else None
+    return status
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Prediction and explanation cache sizes, hit/miss and eviction counters."""
+    stats = {"enabled": False} if prediction_cache is None else {"enabled": True, **prediction_cache.stats()}
+    stats["explanations"] = {"enabled": False} if explanation_cache is None else {"enabled": True, **explanation_cache.stats()}
+    return stats
+
+@app.get("/batcher/stats")
+async def batcher_stats():
+    """Micro-batching configuration and batch size counters for /predict."""
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+def score_raw_frame(raw: pd.DataFrame, loaded: ModelVersion) -> pd.DataFrame:
+    """
+    Preprocesses a frame of raw records in one vectorized pass and scores it
+    with predict_batch, returning label/probability per row in input order.
+    """
+    features = preprocess_batch(raw, loaded.feature_list)
+    scored = predict_batch(features, loaded.model, loaded.feature_list, loaded.threshold)
+    return scored[["label", "probability"]]
+
+def _throughput_headers(response: Response, rows: int, elapsed: float):
+    response.headers["X-Rows"] = str(rows)
+    response.headers["X-Elapsed-Seconds"] = f"{elapsed:.6f}"
+    response.headers["X-Rows-Per-Second"] = f"{rows / elapsed:.1f}" if elapsed > 0 else "0"
 
-        # Convert numpy float (like numpy.float32) to native float for JSON serialization
-        if isinstance(result.get("probability"), (np.floating, np.float32, np.float64)):
-            result["probability"] = float(result["probability"])
+@app.post("/predict/batch")
+def predict_batch_endpoint(raw_input: BatchInputRequest, response: Response):
+    """
+    Accepts a JSON list of raw records and scores them in chunks of
+    BATCH_CHUNK_SIZE rows. Predictions are returned in input order.
+    """
+    records = raw_input.root
+    loaded, _ = require_model()
+    start = time.perf_counter()
+
+    predictions = []
+    try:
+        for offset in range(0, len(records), BATCH_CHUNK_SIZE):
+            raw = pd.DataFrame.from_records(records[offset:offset + BATCH_CHUNK_SIZE])
+            scored = score_raw_frame(raw, loaded)
+            predictions.extend(
+                {"label": label, "probability": proba}
+                for label, proba in zip(scored["label"].tolist(), scored["probability"].tolist())
+            )
     except Exception as e:
-        logging.error(f"Prediction error: {e}")
-        raise HTTPException(status_code=500, detail="Prediction failed.")
+        logging.error(f"Batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail="Batch prediction failed.")
+
+    elapsed = time.perf_counter() - start
+    registry.record_prediction()
+    _throughput_headers(response, len(records), elapsed)
+    logging.info(f"✅ Batch prediction made for {len(records)} rows in {elapsed:.3f}s")
+    return {"predictions": predictions}
+
+def _iter_raw_frames(upload, is_csv: bool):
+    if is_csv:
+        return pd.read_csv(upload, chunksize=BATCH_CHUNK_SIZE)
+    return pd.read_json(upload, lines=True, chunksize=BATCH_CHUNK_SIZE)
+
+@app.post("/predict/batch/stream")
+async def predict_batch_stream_endpoint(request: Request):
+    """
+    Streaming variant of /predict/batch. Accepts NDJSON (one raw record per
+    line) or CSV with a header row (Content-Type: text/csv) and streams back
+    predictions in the same format, BATCH_CHUNK_SIZE rows at a time, so memory
+    stays flat regardless of upload size.
+    """
+    is_csv = request.headers.get("content-type", "").startswith("text/csv")
+    loaded, _ = require_model()
+
+    # The body is spooled (to disk past STREAM_SPOOL_MAX_BYTES) before the response
+    # starts, because the request stream cannot be read while the response is streaming.
+    upload = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_MAX_BYTES)
+    async for chunk in request.stream():
+        upload.write(chunk)
+    empty = upload.tell() == 0
+    upload.seek(0)
+
+    def stream():
+        rows = 0
+        start = time.perf_counter()
+        try:
+            if is_csv:
+                yield "label,probability\n"
+            if empty:
+                return
+            for raw in _iter_raw_frames(upload, is_csv):
+                scored = score_raw_frame(raw, loaded)
+                labels = scored["label"].tolist()
+                probas = scored["probability"].tolist()
+                if is_csv:
+                    yield "".join(f"{label},{proba}\n" for label, proba in zip(labels, probas))
+                else:
+                    yield "".join(
+                        f'{{"label": {label}, "probability": {proba}}}\n' for label, proba in zip(labels, probas)
+                    )
+                rows += len(labels)
+                registry.record_prediction()
+        finally:
+            upload.close()
+        elapsed = time.perf_counter() - start
+        rate = rows / elapsed if elapsed > 0 else 0
+        logging.info(f"✅ Streamed predictions for {rows} rows in {elapsed:.3f}s ({rate:.1f} rows/s)")
 
-    logging.info(f"✅ Prediction made: {result}")
-    return {"prediction": result}
\ No newline at end of file
+    media_type = "text/csv" if is_csv else "application/x-ndjson"
+    # Totals are only known once the body has been sent, so streaming responses
+    # report the chunk size up front and log throughput when the stream ends.
+    headers = {"X-Batch-Chunk-Size": str(BATCH_CHUNK_SIZE)}
+    return StreamingResponse(stream(), media_type=media_type, headers=headers)
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+import numpy as np
+from typing import Callable, Dict, Union
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-record predictions into one batch call.
+
+    Requests are queued with a future each. A collector task waits for the
+    first request, then keeps gathering until max_batch_size rows are queued
+    or max_wait_ms has passed since that first request, stacks the feature
+    vectors into one float32 matrix and scores it in a worker thread, so the
+    event loop keeps accepting requests while the model runs. Each future is
+    resolved with its own {"label", "probability"} result.
+
+    `in_flight` returns the number of requests in flight that may call
+    predict(). When it is given, a batch is scored as soon as every one of
+    them has been queued, so a lone request does not wait out max_wait_ms.
+    """
+
+    def __init__(self, max_batch_size: int = 64, max_wait_ms: float = 2.0, in_flight: Callable[[], float] = None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.in_flight = in_flight
+
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+        self.early_flushes = 0
+        # Requests inside predict(): queued, being scored or not yet resumed with their result
+        self._waiting = 0
+
+        self._queue = None
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Starts the collector task on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def predict(self, predictor, record: Dict[str, Union[float, int]]) -> Dict[str, Union[int, float]]:
+        """Queues one preprocess() output for `predictor` and waits for its result."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiting += 1
+        try:
+            await self._queue.put((predictor, predictor.vector(record), future))
+            return await future
+        finally:
+            self._waiting -= 1
+
+    def _nothing_to_wait_for(self) -> bool:
+        # Every request in flight is already inside predict(), so none can join this batch
+        return self.in_flight is not None and self._queue.empty() and self.in_flight() <= self._waiting
+
+    async def _gather(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if self._nothing_to_wait_for():
+                self.early_flushes += 1
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Anything already queued joins this batch rather than waiting for the next one
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _collect(self):
+        while True:
+            batch = await self._gather()
+            # A model swap between requests can leave several predictors in one batch
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[0]), []).append(item)
+            for items in groups.values():
+                await self._score(items)
+
+    async def _score(self, items: list):
+        predictor = items[0][0]
+        matrix = np.stack([vector for _, vector, _ in items])
+        try:
+            proba = await asyncio.to_thread(predictor.predict_matrix, matrix)
+        except Exception as e:
+            logging.error(f"❌ Micro-batch prediction error: {e}")
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += len(items)
+        self.largest_batch = max(self.largest_batch, len(items))
+        for (_, _, future), p in zip(items, proba.tolist()):
+            # The client may have disconnected and cancelled its request
+            if not future.done():
+                future.set_result({"label": int(p >= predictor.threshold), "probability": p})
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "early_flushes": self.early_flushes,
+        }
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+def model_fingerprint(model_path: str, threshold: float, feature_list) -> str:
+    """
+    Hash of the model file bytes, threshold and feature list. Cached
+    predictions are namespaced by it, so they are dropped as soon as a
+    different model or metadata file is loaded.
+    """
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(json.dumps({"threshold": threshold, "features": list(feature_list)}).encode())
+    return digest.hexdigest()[:16]
+
+def feature_key(processed: dict, feature_list) -> str:
+    """
+    Canonical key for a preprocessed record: the float32 feature vector the
+    model sees, in feature_list order. Raw inputs that preprocess to the same
+    vector (e.g. 35 vs 35.0, or a null vs a missing key) share a key.
+    """
+    vector = np.array([processed[name] for name in feature_list], dtype=np.float32)
+    return hashlib.blake2b(vector.tobytes(), digest_size=16).hexdigest()
+
+class LocalLRUBackend:
+    """In-process LRU with per-entry expiry. Thread-safe."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict, ttl: float = None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def discard_prefix(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class RedisBackend:
+    """
+    Shared backend over a redis-py compatible client (get/set with `ex`).
+    Eviction and expiry are left to the server.
+    """
+
+    def __init__(self, client, prefix: str = "loanvet:prediction:"):
+        self.client = client
+        self.prefix = prefix
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str):
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: dict, ttl: float = None):
+        self.client.set(self.prefix + key, json.dumps(value), ex=int(ttl) if ttl else None)
+
+    def clear(self):
+        # Keys are namespaced by model fingerprint, so stale entries are never read
+        # and simply expire; nothing is deleted on the shared server.
+        pass
+
+    def discard_prefix(self, prefix: str):
+        pass
+
+    def __len__(self) -> int:
+        return 0
+
+class FakeRedisClient:
+    """Minimal in-memory stand-in for a redis client (get/set with `ex`), for local runs and tests."""
+
+    def __init__(self):
+        self._data = {}
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is None:
+            return None
+        data, expires_at = value
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return data
+
+    def set(self, key, value, ex=None):
+        self._data[key] = (value.encode() if isinstance(value, str) else value, time.monotonic() + ex if ex else None)
+        return True
+
+class PredictionCache:
+    """
+    Cache of prediction results keyed by model fingerprint + feature_key().
+    Tracks hits, misses and the backend's evictions/expirations.
+
+    Entries of the last max_namespaces fingerprints are kept, so an active
+    and a candidate model served side by side share the cache; when a newer
+    fingerprint pushes one out, its entries are dropped.
+    """
+
+    def __init__(self, backend, ttl_seconds: float = None, max_namespaces: int = 2):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_namespaces = max_namespaces
+        self.hits = 0
+        self.misses = 0
+        self._namespaces = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, fingerprint: str, key: str) -> str:
+        if fingerprint not in self._namespaces:
+            with self._lock:
+                self._namespaces[fingerprint] = True
+                while len(self._namespaces) > self.max_namespaces:
+                    # A model that is no longer served; its entries are unreachable
+                    stale, _ = self._namespaces.popitem(last=False)
+                    logging.info(f"Model fingerprint {stale} replaced by {fingerprint}; dropping its cached predictions.")
+                    self.backend.discard_prefix(f"{stale}:")
+        return f"{fingerprint}:{key}"
+
+    def get(self, fingerprint: str, key: str):
+        try:
+            value = self.backend.get(self._key(fingerprint, key))
+        except Exception as e:
+            logging.warning(f"Prediction cache read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, fingerprint: str, key: str, value: dict):
+        try:
+            self.backend.set(self._key(fingerprint, key), value, self.ttl_seconds)
+        except Exception as e:
+            logging.warning(f"Prediction cache write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "size": len(self.backend),
+            "max_size": getattr(self.backend, "max_size", None),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.backend.evictions,
+            "expirations": self.backend.expirations,
+        }
+
+def build_cache(backend: str = "local", max_size: int = 10_000, ttl_seconds: float = None, redis_url: str = None,
+                prefix: str = "loanvet:prediction:"):
+    """
+    Builds the prediction cache from configuration. Returns None when caching
+    is disabled (max_size <= 0 for the local backend). `prefix` namespaces
+    the keys of a shared redis server, so several caches can use one.
+    """
+    if backend == "local":
+        if max_size <= 0:
+            return None
+        return PredictionCache(LocalLRUBackend(max_size), ttl_seconds)
+    if backend == "fake":
+        return PredictionCache(RedisBackend(FakeRedisClient(), prefix), ttl_seconds)
+    if backend == "redis":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis cache backend requires the 'redis' package.")
+        return PredictionCache(RedisBackend(redis.Redis.from_url(redis_url or "redis://localhost:6379/0"), prefix), ttl_seconds)
+    raise ValueError("cache backend must be 'local', 'fake' or 'redis'")
@@ -0,0 +1,280 @@
+import json
+import logging
+import zipfile
+import numpy as np
+from typing import Dict
+
+# Default location of the exported model, next to the joblib artefact
+COMPILED_MODEL_PATH = "models/final/xgb_final_model.npz"
+
+# Rows traversed per step of CompiledModel.predict_proba; bounds the (rows, trees) index arrays
+SCORE_CHUNK_SIZE = 512
+
+class CompiledModel:
+    """
+    Pure-NumPy scorer for a binary:logistic XGBoost tree ensemble.
+
+    Trees are stored as padded (n_trees, max_nodes) arrays: split feature,
+    float32 threshold, left/right child, default-left (missing value)
+    direction and leaf value. Leaves point to themselves, so every row can be
+    advanced through every tree for max_depth steps at once without masking.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.default_left = arrays["default_left"]
+        self.value = arrays["value"]
+        self.base_margin = float(arrays["base_margin"])
+        self.max_depth = int(arrays["max_depth"])
+        self.feature_names = [str(name) for name in arrays["feature_names"]]
+
+        # Traversal works on flat node ids (tree * max_nodes + node) so each step is a few
+        # 1D take() calls. Exports include the flat index arrays, so a memory-mapped model
+        # shares them between processes; older exports have them derived here.
+        n_trees, max_nodes = self.feature.shape
+        self._roots = np.arange(n_trees, dtype=np.intp) * max_nodes
+        if "flat_feature" not in arrays:
+            logging.warning("⚠️ Compiled model has no traversal arrays; building a private copy in this process. "
+                            "Re-export it with `python -m src.api.compiled_model` to share them between workers.")
+            arrays = {**arrays, **traversal_arrays(self.feature, self.left, self.right)}
+        self._flat_feature = np.asarray(arrays["flat_feature"], dtype=np.intp)
+        self._children = np.asarray(arrays["children"], dtype=np.intp)
+        self._flat_threshold = self.threshold.ravel()
+        self._flat_default_left = self.default_left.ravel()
+        self._flat_value = self.value.ravel()
+
+    @property
+    def n_trees(self) -> int:
+        return self.feature.shape[0]
+
+    def predict_margin(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected a 2D array with {len(self.feature_names)} feature columns, got shape {X.shape}")
+
+        margin = np.empty(len(X), dtype=np.float64)
+        for offset in range(0, len(X), SCORE_CHUNK_SIZE):
+            chunk = X[offset:offset + SCORE_CHUNK_SIZE]
+            flat_chunk = chunk.ravel()
+            row_start = (np.arange(len(chunk), dtype=np.intp) * chunk.shape[1])[:, None]
+            node = np.repeat(self._roots[None, :], len(chunk), axis=0)
+            for _ in range(self.max_depth):
+                x = flat_chunk.take(row_start + self._flat_feature.take(node))
+                # NaN compares False, so missing values only go left when default_left is set
+                go_left = (x < self._flat_threshold.take(node)) | (np.isnan(x) & self._flat_default_left.take(node))
+                node = self._children.take(2 * node + ~go_left)
+            leaves = self._flat_value.take(node)
+            margin[offset:offset + len(chunk)] = self.base_margin + leaves.sum(axis=1, dtype=np.float64)
+        return margin
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Same contract as XGBClassifier.predict_proba: an (n_rows, 2) array of
+        class probabilities, so the compiled model can be passed to predict_batch.
+        """
+        proba = 1.0 / (1.0 + np.exp(-self.predict_margin(X)))
+        return np.column_stack([1.0 - proba, proba])
+
+def traversal_arrays(feature: np.ndarray, left: np.ndarray, right: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Flat index arrays used by CompiledModel traversal: the split feature per
+    flat node id, and children laid out as [left, right] per flat node id.
+    """
+    n_trees, max_nodes = feature.shape
+    roots = np.arange(n_trees, dtype=np.intp) * max_nodes
+    children = np.stack([left, right], axis=-1) + roots[:, None, None]
+    return {
+        "flat_feature": feature.ravel().astype(np.intp),
+        "children": children.ravel().astype(np.intp),
+    }
+
+class CompiledPredictor:
+    """
+    SinglePredictor counterpart over a CompiledModel, for serving without
+    xgboost. Exposes the same predict/vector/predict_matrix interface.
+    """
+
+    def __init__(self, model: CompiledModel, feature_list, threshold):
+        self.model = model
+        self.feature_list = list(feature_list)
+        self.threshold = threshold
+
+    def vector(self, record: Dict[str, float]) -> np.ndarray:
+        return np.array([record[name] for name in self.feature_list], dtype=np.float32)
+
+    def predict_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        return self.model.predict_proba(matrix)[:, 1]
+
+    def predict(self, record: Dict[str, float]) -> Dict[str, float]:
+        try:
+            proba = float(self.predict_matrix(self.vector(record)[None, :])[0])
+            return {"label": int(proba >= self.threshold), "probability": proba}
+        except Exception as e:
+            logging.error(f"❌ Prediction error: {e}")
+            raise
+
+def compile_booster(booster) -> Dict[str, np.ndarray]:
+    """
+    Flattens an xgboost Booster into the arrays used by CompiledModel,
+    read from the booster's JSON model so thresholds and leaf values keep
+    their exact float32 values.
+    """
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise ValueError(f"Only binary:logistic models can be compiled, got '{objective}'")
+
+    trees = learner["gradient_booster"]["model"]["trees"]
+    if any(tree["categories_nodes"] for tree in trees):
+        raise ValueError("Categorical splits are not supported")
+    max_nodes = max(len(tree["left_children"]) for tree in trees)
+
+    shape = (len(trees), max_nodes)
+    arrays = {
+        "feature": np.zeros(shape, dtype=np.int32),
+        "threshold": np.zeros(shape, dtype=np.float32),
+        "left": np.tile(np.arange(max_nodes, dtype=np.int32), (len(trees), 1)),
+        "right": np.tile(np.arange(max_nodes, dtype=np.int32), (len(trees), 1)),
+        "default_left": np.zeros(shape, dtype=bool),
+        "value": np.zeros(shape, dtype=np.float32),
+    }
+
+    max_depth = 0
+    for t, tree in enumerate(trees):
+        left = np.asarray(tree["left_children"], dtype=np.int32)
+        right = np.asarray(tree["right_children"], dtype=np.int32)
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+        is_leaf = left == -1
+        nodes = np.arange(len(left))
+
+        # Leaves keep their self-loop children; their split condition holds the leaf value
+        arrays["feature"][t, :len(left)] = np.where(is_leaf, 0, tree["split_indices"])
+        arrays["threshold"][t, :len(left)] = np.where(is_leaf, 0, conditions)
+        arrays["left"][t, :len(left)] = np.where(is_leaf, nodes, left)
+        arrays["right"][t, :len(left)] = np.where(is_leaf, nodes, right)
+        arrays["default_left"][t, :len(left)] = np.asarray(tree["default_left"], dtype=bool) & ~is_leaf
+        arrays["value"][t, :len(left)] = np.where(is_leaf, conditions, 0)
+        max_depth = max(max_depth, _tree_depth(left, right))
+
+    # base_score is stored as a probability; trees add to its logit
+    base_score = _base_score(learner["learner_model_param"]["base_score"])
+    arrays["base_margin"] = np.float64(np.log(base_score / (1.0 - base_score)))
+    arrays["max_depth"] = np.int32(max_depth)
+    arrays.update(traversal_arrays(arrays["feature"], arrays["left"], arrays["right"]))
+    # Boosters trained without feature names use xgboost's default f0, f1, ...
+    n_features = int(learner["learner_model_param"]["num_feature"])
+    feature_names = learner.get("feature_names") or booster.feature_names or [f"f{i}" for i in range(n_features)]
+    arrays["feature_names"] = np.asarray(feature_names)
+    return arrays
+
+def _base_score(value: str) -> float:
+    # xgboost < 3.1 saves a number ("1.5E-1"), later versions a one-element vector ("[1.5E-1]")
+    parsed = json.loads(value)
+    if isinstance(parsed, list):
+        if len(parsed) != 1:
+            raise ValueError(f"Expected a single base_score, got {value}")
+        parsed = parsed[0]
+    return float(parsed)
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth = 0
+    frontier = [0]
+    while frontier:
+        children = [c for node in frontier for c in (left[node], right[node]) if c != -1]
+        if not children:
+            break
+        depth += 1
+        frontier = children
+    return depth
+
+def export_model(model, path: str = COMPILED_MODEL_PATH) -> str:
+    """
+    Exports an XGBClassifier (or Booster) to an uncompressed .npz file that
+    load_compiled_model() can memory-map.
+    """
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    np.savez(path, **compile_booster(booster))
+    logging.info(f"✅ Compiled model exported to {path}")
+    return path
+
+def _mmap_npz(path: str) -> Dict[str, np.ndarray]:
+    # np.load cannot memory-map .npz members, but np.savez stores them uncompressed,
+    # so each member's .npy payload can be mapped directly from its offset in the zip.
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path} member {info.filename} is compressed and cannot be memory-mapped")
+            f.seek(info.header_offset)
+            local_header = f.read(30)
+            name_length = int.from_bytes(local_header[26:28], "little")
+            extra_length = int.from_bytes(local_header[28:30], "little")
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            if np.lib.format.read_magic(f) == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            name = info.filename[:-len(".npy")]
+            if dtype.hasobject or shape == ():
+                f.seek(info.header_offset + 30 + name_length + extra_length)
+                arrays[name] = np.lib.format.read_array(f)
+            else:
+                order = "F" if fortran_order else "C"
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape, order=order)
+    return arrays
+
+def load_compiled_model(path: str = COMPILED_MODEL_PATH, mmap: bool = True) -> CompiledModel:
+    """
+    Loads an exported model. With mmap=True the tree arrays are mapped
+    read-only from the file, so loading is near-instant and the pages are
+    shared between processes that load the same file.
+    """
+    if mmap:
+        return CompiledModel(_mmap_npz(path))
+    with np.load(path) as data:
+        return CompiledModel({name: data[name] for name in data.files})
+
+if __name__ == "__main__":
+    import argparse
+    import joblib
+
+    from src.api.utils import preprocess_columnar
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Export the final XGBoost model to a compiled NumPy .npz")
+    parser.add_argument("--model", default="models/final/xgb_final_model.joblib")
+    parser.add_argument("--metadata", default="models/final/xgb_final_metadata.json")
+    parser.add_argument("--output", default=COMPILED_MODEL_PATH)
+    parser.add_argument("--check-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    export_model(model, args.output)
+
+    # Verify against predict_proba on random raw inputs run through the serving preprocessing
+    with open(args.metadata, "r") as f:
+        feature_list = json.load(f)["features"]
+    rng = np.random.default_rng(0)
+    n = args.check_rows
+    raw = {
+        "age": rng.integers(18, 100, n),
+        "monthly_income": np.where(rng.random(n) < 0.2, np.nan, rng.lognormal(8.5, 0.8, n)),
+        "number_of_dependents": np.where(rng.random(n) < 0.05, np.nan, rng.integers(0, 8, n)),
+        "number_of_open_credit_lines_and_loans": rng.integers(0, 30, n),
+        "number_real_estate_loans_or_lines": rng.integers(0, 6, n),
+        "debt_ratio": rng.exponential(0.5, n),
+        "revolving_utilization_of_unsecured_lines": rng.uniform(0, 1.5, n),
+        "total_delinquencies": rng.poisson(0.4, n),
+    }
+    X = preprocess_columnar(raw, feature_list)
+    X[rng.random(X.shape) < 0.01] = np.nan
+    expected = model.predict_proba(X)[:, 1]
+    actual = load_compiled_model(args.output).predict_proba(X)[:, 1]
+    max_diff = float(np.abs(expected - actual).max())
+    if max_diff > 1e-6:
+        raise SystemExit(f"❌ Compiled model differs from predict_proba by up to {max_diff:.2e}")
+    print(f"✅ Compiled model matches predict_proba on {n} rows (max abs diff {max_diff:.2e}).")
@@ -0,0 +1,377 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+import pandas as pd
+
+from src.api.cache import model_fingerprint
+from src.api.compiled_model import CompiledPredictor, load_compiled_model
+from src.api.explain import Explainer, explainer_model_path
+from src.api.utils import SinglePredictor, feature_set_mismatch, predict_batch, preprocess, preprocess_batch
+
+# Rows in the dummy batch scored during warm-up, so the batch path allocates its buffers too
+WARMUP_BATCH_ROWS = 256
+
+AB_MODES = ("split", "shadow")
+
+def file_state(paths) -> tuple:
+    """(mtime_ns, size) of each file, None for a missing one; changes when a file is replaced or rewritten."""
+    state = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            state.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            state.append(None)
+    return tuple(state)
+
+class ModelVersion:
+    """
+    One loaded model with its metadata and predictor. A version is loaded
+    and warmed up before it is served and is not modified afterwards, so a
+    request keeps scoring with the version it started with while the
+    registry swaps in another.
+    """
+
+    def __init__(self, model_path: str, metadata_path: str, backend: str = "joblib"):
+        self.model_path = model_path
+        self.metadata_path = metadata_path
+        self.backend = backend
+
+        self.model = None
+        self.metadata = {}
+        self.threshold = 0.5
+        self.feature_list = []
+        self.predictor = None
+        self.fingerprint = None
+        self.missing_features = set()
+        self.extra_features = set()
+        self.file_state = None
+        self.timings = {}
+        self._explainer = None
+        self._explainer_lock = threading.Lock()
+
+    def _load_model(self):
+        if self.backend == "compiled":
+            return load_compiled_model(self.model_path, mmap=True)
+        import joblib
+        return joblib.load(self.model_path)
+
+    def load(self):
+        # Taken before reading, so a write that lands during the load shows up as a change
+        self.file_state = file_state((self.model_path, self.metadata_path))
+
+        start = time.perf_counter()
+        try:
+            model = self._load_model()
+            logging.info("✅ Model loaded successfully.")
+        except Exception as e:
+            logging.error(f"❌ Failed to load model: {e}")
+            raise RuntimeError("Failed to load model.")
+        self.timings["model_load_seconds"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            with open(self.metadata_path, "r") as f:
+                metadata = json.load(f)
+            threshold = metadata.get("threshold", 0.5)
+            feature_list = metadata.get("features", [])
+            logging.info(f"✅ Metadata loaded successfully with {len(feature_list)} features.")
+        except Exception as e:
+            logging.error(f"❌ Failed to load metadata: {e}")
+            raise RuntimeError("Failed to load metadata.")
+        self.timings["metadata_load_seconds"] = time.perf_counter() - start
+
+        self.model = model
+        self.metadata = metadata
+        self.threshold = threshold
+        self.feature_list = feature_list
+        if self.backend == "compiled":
+            self.predictor = CompiledPredictor(model, feature_list, threshold)
+        else:
+            self.predictor = SinglePredictor(model, feature_list, threshold)
+        self.fingerprint = model_fingerprint(self.model_path, threshold, feature_list)
+        self.missing_features, self.extra_features = feature_set_mismatch(feature_list)
+        return self
+
+    def warm_up(self):
+        """
+        Scores a dummy record through the single and batch paths so the
+        booster's prediction buffers are allocated before real traffic.
+        """
+        start = time.perf_counter()
+        self.predictor.predict(preprocess({}))
+        dummy = pd.DataFrame(index=range(WARMUP_BATCH_ROWS))
+        features = preprocess_batch(dummy, self.feature_list)
+        predict_batch(features, self.model, self.feature_list, self.threshold)
+        if self.backend == "joblib":
+            # Compiled versions load the booster for explanations on the first /explain instead
+            self.explainer().explain(features.to_numpy()[:1])
+        self.timings["warmup_seconds"] = time.perf_counter() - start
+        return self
+
+    def explainer(self) -> Explainer:
+        """The version's Explainer, built on first use."""
+        if self._explainer is None:
+            with self._explainer_lock:
+                if self._explainer is None:
+                    if self.backend == "compiled":
+                        import joblib
+                        booster = joblib.load(explainer_model_path(self.model_path)).get_booster()
+                    else:
+                        booster = self.model.get_booster()
+                    self._explainer = Explainer(booster, self.feature_list, self.threshold, self.predictor.predict_matrix)
+        return self._explainer
+
+    def status(self) -> dict:
+        return {
+            "model_path": self.model_path,
+            "metadata_path": self.metadata_path,
+            "fingerprint": self.fingerprint,
+            "threshold": self.threshold,
+            "timings": dict(self.timings),
+        }
+
+class ModelRegistry:
+    """
+    Holds the served model versions for one API worker. Nothing is loaded
+    at construction; start() loads and warms the model either inline or in
+    a background thread so the worker can bind and answer /healthz while the
+    model is still deserializing.
+
+    Startup timings (seconds since the registry was created at worker import)
+    are kept in `timings` and reported by status().
+
+    With backend="compiled", model_path is a compiled .npz export that is
+    memory-mapped read-only, so every worker process shares one copy of the
+    tree arrays and xgboost is never imported.
+
+    watch() polls the model and metadata files. When they change and have
+    stopped changing for one poll interval, the new version is loaded and
+    warmed up in the watcher thread and then swapped in with a single
+    reference assignment; requests never wait for a load, and a failed load
+    keeps the current version. A candidate model (candidate_model_path) is
+    served next to the active one: with mode="split" it scores a `split`
+    fraction of requests, with mode="shadow" it scores requests off the
+    request path and its results are only reported.
+    """
+
+    def __init__(self, model_path: str, metadata_path: str, backend: str = "joblib",
+                 candidate_model_path: str = None, candidate_metadata_path: str = None,
+                 mode: str = "split", split: float = 0.1, on_reload=None):
+        if backend not in ("joblib", "compiled"):
+            raise ValueError("model backend must be 'joblib' or 'compiled'")
+        if mode not in AB_MODES:
+            raise ValueError("A/B mode must be 'split' or 'shadow'")
+        if candidate_model_path and not candidate_metadata_path:
+            raise ValueError("a candidate model needs its metadata path")
+        self.model_path = model_path
+        self.metadata_path = metadata_path
+        self.backend = backend
+        self.mode = mode
+        self.split = split
+        # Called as on_reload(slot, version or None, seconds) after each reload attempt
+        self.on_reload = on_reload
+        self.paths = {"active": (model_path, metadata_path)}
+        if candidate_model_path:
+            self.paths["candidate"] = (candidate_model_path, candidate_metadata_path)
+
+        self.active = None
+        self.candidate = None
+
+        self.ready = False
+        self.error = None
+        self.timings = {}
+        self.reloads = []
+
+        self._created = time.perf_counter()
+        self._first_prediction = threading.Event()
+        self._thread = None
+        self._watcher = None
+        self._stop = threading.Event()
+        self._reload_lock = threading.Lock()
+        # File state at the last load attempt of each slot, so a failed load is not retried until the files change
+        self._attempted = {}
+
+    # The active version's attributes, for callers that only serve one model
+    @property
+    def loaded(self) -> bool:
+        return self.active is not None
+
+    @property
+    def model(self):
+        return self.active.model if self.active else None
+
+    @property
+    def threshold(self) -> float:
+        return self.active.threshold if self.active else 0.5
+
+    @property
+    def feature_list(self) -> list:
+        return self.active.feature_list if self.active else []
+
+    @property
+    def predictor(self):
+        return self.active.predictor if self.active else None
+
+    @property
+    def fingerprint(self):
+        return self.active.fingerprint if self.active else None
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self._created
+
+    def _load_version(self, slot: str) -> ModelVersion:
+        self._attempted[slot] = file_state(self.paths[slot])
+        return ModelVersion(*self.paths[slot], self.backend).load()
+
+    def load(self):
+        version = self._load_version("active")
+        self.timings.update(version.timings)
+        self.active = version
+        self.timings["loaded_after_seconds"] = self._elapsed()
+
+    def warm_up(self):
+        self.active.warm_up()
+        self.timings["warmup_seconds"] = self.active.timings["warmup_seconds"]
+        if "candidate" in self.paths and self.candidate is None:
+            # The active model is served even if the candidate cannot be loaded
+            self.reload("candidate")
+        self.ready = True
+        self.timings["ready_after_seconds"] = self._elapsed()
+        logging.info(f"✅ Model warmed up; worker ready after {self.timings['ready_after_seconds']:.3f}s")
+
+    def _load_and_warm_up(self):
+        try:
+            self.load()
+            self.warm_up()
+        except Exception as e:
+            self.error = str(e)
+            logging.error(f"❌ Model registry failed to start: {e}")
+
+    def start(self, background: bool = True):
+        """
+        Loads and warms the model. In the foreground, failures raise so the
+        worker does not start; in the background they are reported by /readyz.
+        A registry already made ready (e.g. preloaded before forking) is kept.
+        """
+        if self.ready:
+            return
+        if background:
+            self._thread = threading.Thread(target=self._load_and_warm_up, name="model-warmup", daemon=True)
+            self._thread.start()
+        else:
+            self.load()
+            self.warm_up()
+
+    def wait_until_ready(self, timeout: float = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def reload(self, slot: str = "active") -> bool:
+        """
+        Loads and warms up the slot's files as a new version, then swaps it in.
+        Returns False, keeping the current version, if the load fails.
+        """
+        with self._reload_lock:
+            start = time.perf_counter()
+            try:
+                version = self._load_version(slot).warm_up()
+            except Exception as e:
+                logging.error(f"❌ Reload of the {slot} model failed; keeping the current version: {e}")
+                self._record_reload(slot, None, time.perf_counter() - start, str(e))
+                return False
+            previous = getattr(self, slot)
+            setattr(self, slot, version)
+            if slot == "active":
+                self.error = None
+            seconds = time.perf_counter() - start
+            self._record_reload(slot, version, seconds)
+            logging.info(f"✅ {slot.capitalize()} model {previous.fingerprint if previous else None} -> "
+                         f"{version.fingerprint} swapped in after {seconds:.3f}s")
+            return True
+
+    def _record_reload(self, slot: str, version, seconds: float, error: str = None):
+        self.reloads = self.reloads[-9:] + [{
+            "slot": slot,
+            "fingerprint": version.fingerprint if version else None,
+            "seconds": seconds,
+            "error": error,
+            "at": time.time(),
+        }]
+        if self.on_reload is not None:
+            self.on_reload(slot, version, seconds)
+
+    def watch(self, interval: float):
+        """Starts polling the model files every `interval` seconds in a daemon thread."""
+        if self._watcher is not None or interval <= 0:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval: float):
+        pending = {}
+        while not self._stop.wait(interval):
+            # Startup loads the slots; until it has, there is nothing to compare against
+            if not self.ready:
+                continue
+            for slot, paths in self.paths.items():
+                state = file_state(paths)
+                if state == self._attempted.get(slot) or None in state:
+                    pending.pop(slot, None)
+                    continue
+                # Reload only once the files have not changed for a whole interval, so a copy in progress is not read
+                if pending.get(slot) != state:
+                    pending[slot] = state
+                    continue
+                del pending[slot]
+                self.reload(slot)
+
+    def select(self) -> tuple:
+        """
+        (version, variant) to score a request with: the candidate for a
+        `split` fraction of requests when splitting traffic, otherwise the
+        active version.
+        """
+        active, candidate = self.active, self.candidate
+        if candidate is not None and self.mode == "split" and random.random() < self.split:
+            return candidate, "candidate"
+        return active, "active"
+
+    def shadow(self):
+        """The version to shadow-score requests with, if any."""
+        return self.candidate if self.mode == "shadow" else None
+
+    def record_prediction(self):
+        # Only the first prediction is timed, to measure time-to-first-prediction per worker
+        if not self._first_prediction.is_set():
+            self._first_prediction.set()
+            self.timings["first_prediction_after_seconds"] = self._elapsed()
+            logging.info(f"✅ First prediction served {self.timings['first_prediction_after_seconds']:.3f}s after worker start")
+
+    def status(self) -> dict:
+        active, candidate = self.active, self.candidate
+        return {
+            "loaded": active is not None,
+            "ready": self.ready,
+            "error": self.error,
+            "model_path": self.model_path,
+            "backend": self.backend,
+            "fingerprint": active.fingerprint if active else None,
+            "timings": dict(self.timings),
+            "active": active.status() if active else None,
+            "candidate": candidate.status() if candidate else None,
+            "mode": self.mode if "candidate" in self.paths else None,
+            "split": self.split if "candidate" in self.paths and self.mode == "split" else None,
+            "reloads": list(self.reloads),
+        }
@@ -0,0 +1,142 @@
+"""
+Pre-forked multi-process launcher for the LoanVet API.
+
+The parent imports the app, memory-maps the compiled model and warms it,
+binds the listening socket and then forks the worker pool. Workers inherit
+the imported modules copy-on-write and share the model's file-backed pages,
+so model memory stays flat as workers are added. The parent supervises the
+pool and periodically logs each worker's RSS, split into shared file-backed
+pages (the mapped model) and private anonymous memory.
+
+Export the model first, then run from the repository root (Linux/macOS):
+    python -m src.api.compiled_model
+    python -m src.api.serve --port 8000
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+# Set before the app is imported so the registry is built over the compiled export
+os.environ.setdefault("LOANVET_MODEL_BACKEND", "compiled")
+
+def available_cores() -> int:
+    """Cores this process may run on (respects CPU affinity / cgroup cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def memory_usage(pid: int) -> dict:
+    """
+    RSS of a process in MiB from /proc, split into file-backed pages (shared
+    with other workers mapping the same model file) and anonymous memory.
+    PSS charges shared pages proportionally, so summing it across workers
+    gives the pool's real footprint. Empty where /proc is unavailable.
+    """
+    usage = {}
+    fields = {"VmRSS:": "rss_mib", "RssFile:": "rss_file_mib", "RssAnon:": "rss_anon_mib"}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, rest = line.partition(" ")
+                if key in fields:
+                    usage[fields[key]] = int(rest.split()[0]) / 1024
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    usage["pss_mib"] = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return usage
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app, sock: socket.socket, log_level: str):
+    import uvicorn
+
+    # The parent's signal handlers must not fire in the worker; uvicorn installs its own
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+def log_memory(workers: list):
+    total_pss = 0.0
+    for pid in workers:
+        usage = memory_usage(pid)
+        total_pss += usage.get("pss_mib", 0.0)
+        logging.info(
+            f"Worker {pid}: RSS {usage.get('rss_mib', 0):.1f} MiB "
+            f"(file-backed {usage.get('rss_file_mib', 0):.1f}, anonymous {usage.get('rss_anon_mib', 0):.1f}), "
+            f"PSS {usage.get('pss_mib', 0):.1f} MiB"
+        )
+    logging.info(f"Pool of {len(workers)} workers: total PSS {total_pss:.1f} MiB")
+
+def serve(host: str, port: int, workers: int, report_interval: float, log_level: str):
+    from src.api.app import app, registry
+
+    # Load and warm once in the parent; forked workers start with the model ready
+    registry.start(background=False)
+    sock = bind_socket(host, port)
+    logging.info(f"✅ Model preloaded ({registry.backend}); forking {workers} workers on {host}:{port}")
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(app, sock, log_level)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def shutdown(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    next_report = time.monotonic() + min(report_interval, 5.0)
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            children.remove(pid)
+            logging.info(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}")
+            continue
+        if report_interval > 0 and time.monotonic() >= next_report:
+            log_memory(children)
+            next_report = time.monotonic() + report_interval
+        time.sleep(0.5)
+    sock.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: available cores)")
+    parser.add_argument("--report-interval", type=float, default=60.0, help="seconds between RSS reports (0 disables)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("The pre-forked launcher needs os.fork(); use `uvicorn src.api.app:app --workers N` on this platform.")
+    serve(args.host, args.port, args.workers or available_cores(), args.report_interval, args.log_level)
@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class ShadowScorer:
+    """
+    Scores requests with a shadow model version in a small thread pool, off
+    the request path; the result is passed to `on_result` and never served.
+    At most max_pending records wait for a thread. Past that, new ones are
+    dropped and counted rather than queued, so a slow shadow model cannot
+    build up memory or delay the served model.
+
+    shutdown() cancels the records still waiting and frees their slots; a
+    record submitted afterwards starts a new thread pool.
+    """
+
+    def __init__(self, workers: int = 1, max_pending: int = 1000, on_result=None):
+        self.workers = workers
+        self.max_pending = max_pending
+        # Called as on_result(version, result, served, seconds) in a shadow thread
+        self.on_result = on_result
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def submit(self, version, record: dict, served: dict) -> bool:
+        """Queues a preprocess() output for the shadow version; `served` is the result the client got."""
+        if not self._slots.acquire(blocking=False):
+            self._count("dropped")
+            return False
+        self._count("submitted")
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="shadow")
+            future = self._executor.submit(self._score, version, record, served)
+        future.add_done_callback(self._release_if_cancelled)
+        return True
+
+    def _release_if_cancelled(self, future):
+        # A cancelled record never runs _score, so its slot is freed here
+        if future.cancelled():
+            self._slots.release()
+
+    def _score(self, version, record: dict, served: dict):
+        try:
+            start = time.perf_counter()
+            result = version.predictor.predict(record)
+            if self.on_result is not None:
+                self.on_result(version, result, served, time.perf_counter() - start)
+        except Exception as e:
+            self._count("failed")
+            logging.error(f"❌ Shadow prediction failed: {e}")
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
@@ -1,7 +1,11 @@
 import logging
+import threading
 import pandas as pd
 import numpy as np
-from typing import Dict, Union
+from functools import lru_cache
+from typing import Dict, Set, Tuple, Union
+
+from src.feature_registry import compile_features
 
 def predict_single(record: Dict[str, Union[float, int]], model, feature_list, threshold) -> Dict[str, Union[int, float]]:
     try:
@@ -27,54 +31,207 @@ def predict_batch(df: pd.DataFrame, model, feature_list, threshold) -> pd.DataFr
         logging.error(f"❌ Batch prediction error: {e}")
         raise
 
-import numpy as np
+class SinglePredictor:
+    """
+    Low-latency counterpart of predict_single. Copies the preprocess() output
+    into a reusable float32 row buffer (one per thread) laid out in
+    feature_list order and scores it with the raw booster's inplace_predict,
+    skipping DataFrame construction and the sklearn wrapper.
+    """
+
+    def __init__(self, model, feature_list, threshold):
+        self.booster = model.get_booster()
+        self.feature_list = list(feature_list)
+        self.threshold = threshold
+        self._local = threading.local()
+
+    def _buffer(self) -> np.ndarray:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = np.empty((1, len(self.feature_list)), dtype=np.float32)
+        return buffer
+
+    def predict(self, record: Dict[str, Union[float, int]]) -> Dict[str, Union[int, float]]:
+        try:
+            buffer = self._buffer()
+            row = buffer[0]
+            for j, name in enumerate(self.feature_list):
+                row[j] = record[name]
+            proba = float(self.booster.inplace_predict(buffer)[0])
+            label = int(proba >= self.threshold)
+            return {"label": label, "probability": proba}
+        except Exception as e:
+            logging.error(f"❌ Prediction error: {e}")
+            raise
+
+    def vector(self, record: Dict[str, Union[float, int]]) -> np.ndarray:
+        """A preprocess() output as a standalone float32 row in feature_list order."""
+        return np.array([record[name] for name in self.feature_list], dtype=np.float32)
+
+    def predict_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        """Positive-class probabilities for a float32 (rows, features) matrix."""
+        return self.booster.inplace_predict(matrix)
+
+# Features produced by preprocess(), in the order the final model expects them
+SERVING_FEATURES = (
+    "age",
+    "NumberOfOpenCreditLinesAndLoans",
+    "NumberRealEstateLoansOrLines",
+    "NumberOfDependents",
+    "MonthlyIncome_missing_flag",
+    "NumberOfDependents_missing_flag",
+    "RevolvingUtilizationOfUnsecuredLines_log",
+    "MonthlyIncome_log",
+    "DebtRatio_log",
+    "TotalDelinquencies_log",
+    "HighUtilizationFlag",
+    "IncomePerCreditLine",
+    "AgeGroup_MidAge",
+    "AgeGroup_Senior",
+    "DependentsGroup_Small",
+    "DependentsGroup_Large",
+    "Util_x_Late",
+    "IncomePerDependent",
+    "CreditLines_x_Delinquencies",
+)
+
+# Raw API inputs (snake_case) and the cleaned-table column each one feeds in the feature registry
+RAW_INPUT_COLUMNS = {
+    "age": "age",
+    "monthly_income": "MonthlyIncome",
+    "number_of_dependents": "NumberOfDependents",
+    "number_of_open_credit_lines_and_loans": "NumberOfOpenCreditLinesAndLoans",
+    "number_real_estate_loans_or_lines": "NumberRealEstateLoansOrLines",
+    "debt_ratio": "DebtRatio",
+    "revolving_utilization_of_unsecured_lines": "RevolvingUtilizationOfUnsecuredLines",
+    "total_delinquencies": "TotalDelinquencies",
+    "number_of_times_90_days_late": "NumberOfTimes90DaysLate",
+}
+
+# Defaults used when a raw input is absent or null. Income and dependents default to NaN so
+# missingness can be flagged; a missing 90-days-late count falls back to total_delinquencies.
+RAW_DEFAULTS = {
+    "age": 0.0,
+    "monthly_income": np.nan,
+    "number_of_dependents": np.nan,
+    "number_of_open_credit_lines_and_loans": 1.0,
+    "number_real_estate_loans_or_lines": 0.0,
+    "debt_ratio": 0.0,
+    "revolving_utilization_of_unsecured_lines": 0.0,
+    "total_delinquencies": 0.0,
+    "number_of_times_90_days_late": np.nan,
+}
+
+# Values missing income and dependents are imputed with once flagged
+IMPUTE_VALUES = {"MonthlyIncome": 0.0, "NumberOfDependents": 0.0}
+
+def _serving_inputs(raw: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Maps raw inputs (np.float64 scalars or float64 arrays, NaN where missing)
+    to the registry's input columns: missing flags, imputation and the
+    90-days-late fallback. Works the same on scalars and arrays.
+    """
+    c = {column: raw[key] for key, column in RAW_INPUT_COLUMNS.items()}
+    for column, fill in IMPUTE_VALUES.items():
+        missing = np.isnan(c[column])
+        c[f"{column}_missing_flag"] = missing
+        c[column] = np.where(missing, fill, c[column])
+    late = c["NumberOfTimes90DaysLate"]
+    c["NumberOfTimes90DaysLate"] = np.where(np.isnan(late), c["TotalDelinquencies"], late)
+    return c
+
+_SERVING_COLUMNS = tuple(_serving_inputs({key: np.float64(np.nan) for key in RAW_INPUT_COLUMNS}))
+
+@lru_cache(maxsize=16)
+def serving_transform(feature_list: tuple = SERVING_FEATURES):
+    """Registry transform for feature_list compiled against the serving input columns."""
+    return compile_features(feature_list, _SERVING_COLUMNS)
+
+def _raw_value(raw_data: dict, key: str, default=None):
+    # Treat explicit nulls and NaN the same as an absent key
+    value = raw_data.get(key)
+    if value is None or value != value:
+        return default
+    return value
 
 def preprocess(raw_data: dict) -> dict:
     """
     Transform raw input features into the engineered features
     needed by the model pipeline.
     """
-    processed = {}
-
-    # Handle missing flags for monthly income and dependents
-    monthly_income = raw_data.get("monthly_income")
-    number_of_dependents = raw_data.get("number_of_dependents")
-    
-    processed["MonthlyIncome_missing_flag"] = 0 if monthly_income and monthly_income > 0 else 1
-    processed["NumberOfDependents_missing_flag"] = 0 if number_of_dependents is not None else 1
-    
-    # Log transformations - add small epsilon to avoid log(0)
-    processed["RevolvingUtilizationOfUnsecuredLines_log"] = np.log1p(raw_data.get("revolving_utilization_of_unsecured_lines", 0))
-    processed["MonthlyIncome_log"] = np.log1p(monthly_income) if monthly_income else 0
-    processed["DebtRatio_log"] = np.log1p(raw_data.get("debt_ratio", 0))
-    processed["TotalDelinquencies_log"] = np.log1p(raw_data.get("total_delinquencies", 0))
-
-    # Flags and engineered features
-    processed["HighUtilizationFlag"] = 1 if raw_data.get("revolving_utilization_of_unsecured_lines", 0) > 0.75 else 0
-
-    # IncomePerCreditLine = monthly_income / number_of_open_credit_lines_and_loans
-    open_lines = raw_data.get("number_of_open_credit_lines_and_loans", 1)
-    processed["IncomePerCreditLine"] = monthly_income / open_lines if open_lines > 0 else 0
-
-    # Age groups: (one-hot encoding)
-    age = raw_data.get("age", 0)
-    processed["AgeGroup_MidAge"] = 1 if 35 <= age < 60 else 0
-    processed["AgeGroup_Senior"] = 1 if age >= 60 else 0
-
-    # Dependents groups: (one-hot encoding)
-    dep = number_of_dependents if number_of_dependents is not None else 0
-    processed["DependentsGroup_Small"] = 1 if 1 <= dep <= 3 else 0
-    processed["DependentsGroup_Large"] = 1 if dep > 3 else 0
-
-    # Interaction features
-    processed["Util_x_Late"] = raw_data.get("revolving_utilization_of_unsecured_lines", 0) * raw_data.get("total_delinquencies", 0)
-    processed["IncomePerDependent"] = (monthly_income / dep) if dep > 0 else 0
-    processed["CreditLines_x_Delinquencies"] = open_lines * raw_data.get("total_delinquencies", 0)
-
-    # Add raw numeric features required by the model
-    processed["age"] = age
-    processed["NumberOfOpenCreditLinesAndLoans"] = open_lines
-    processed["NumberRealEstateLoansOrLines"] = raw_data.get("number_real_estate_loans_or_lines", 0)
-    processed["NumberOfDependents"] = dep
-
-    return processed
\ No newline at end of file
+    raw = {key: np.float64(_raw_value(raw_data, key, default)) for key, default in RAW_DEFAULTS.items()}
+    return serving_transform().transform_record(_serving_inputs(raw))
+
+def feature_set_mismatch(feature_list) -> Tuple[Set[str], Set[str]]:
+    """
+    Model features preprocess() does not produce, and produced features the
+    model does not use. preprocess() always yields SERVING_FEATURES, so this
+    is computed once per loaded model rather than per request.
+    """
+    produced, expected = set(SERVING_FEATURES), set(feature_list)
+    return expected - produced, produced - expected
+
+# Packed binary input: little-endian float64 raw inputs in RAW_DEFAULTS order, NaN where missing
+PACKED_DTYPE = np.dtype("<f8")
+
+def unpack_raw(payload: bytes) -> dict:
+    """
+    Raw inputs from a packed float64 array. The trailing
+    number_of_times_90_days_late value may be left out.
+    """
+    values = np.frombuffer(payload, dtype=PACKED_DTYPE)
+    if len(values) not in (len(RAW_DEFAULTS) - 1, len(RAW_DEFAULTS)):
+        raise ValueError(f"Expected {len(RAW_DEFAULTS)} packed float64 values, got {len(values)}")
+    return dict(zip(RAW_DEFAULTS, values.tolist()))
+
+def _num_rows(raw) -> int:
+    if isinstance(raw, (pd.DataFrame, np.ndarray)):
+        return len(raw)
+    return len(next(iter(raw.values()))) if raw else 0
+
+def _has_column(raw, name: str) -> bool:
+    if isinstance(raw, pd.DataFrame):
+        return name in raw.columns
+    if isinstance(raw, np.ndarray):
+        return raw.dtype.names is not None and name in raw.dtype.names
+    return name in raw
+
+def _raw_array(raw, name: str, n: int) -> np.ndarray:
+    default = RAW_DEFAULTS[name]
+    if not _has_column(raw, name):
+        return np.full(n, default, dtype=np.float64)
+    if isinstance(raw, pd.DataFrame):
+        values = pd.to_numeric(raw[name], errors="coerce").to_numpy(dtype=np.float64)
+    else:
+        values = np.asarray(raw[name], dtype=np.float64)
+    if np.isnan(default):
+        return values
+    # Null cells fall back to the same defaults as absent columns
+    return np.where(np.isnan(values), default, values)
+
+def preprocess_columnar(raw, feature_list, out: np.ndarray = None) -> np.ndarray:
+    """
+    Columnar counterpart of preprocess(). Takes raw inputs as a DataFrame,
+    a dict of arrays or a NumPy structured array (raw snake_case names) and
+    writes the engineered features into a float32 matrix of shape
+    (rows, len(feature_list)), one column per feature in feature_list order.
+
+    Both paths run the same feature registry kernels in float64 and round to
+    float32 on write, so each row is bit-for-bit what predict_single feeds
+    the model. Pass `out` to reuse a preallocated matrix.
+    """
+    n = _num_rows(raw)
+    if out is not None and (out.shape != (n, len(feature_list)) or out.dtype != np.float32):
+        raise ValueError(f"out must be a float32 array of shape {(n, len(feature_list))}")
+
+    transform = serving_transform(tuple(feature_list))
+    raw_columns = {name: _raw_array(raw, name, n) for name in RAW_DEFAULTS}
+    return transform.transform_columns(_serving_inputs(raw_columns), out=out)
+
+def preprocess_batch(raw: pd.DataFrame, feature_list=SERVING_FEATURES) -> pd.DataFrame:
+    """
+    Vectorized counterpart of preprocess() for a DataFrame of raw records,
+    returning the engineered features as float32 columns in feature_list order.
+    """
+    matrix = preprocess_columnar(raw, feature_list)
+    return pd.DataFrame(matrix, columns=list(feature_list), index=raw.index)
@@ -0,0 +1,19 @@
+"""
+Python clients for the LoanVet prediction API.
+
+LoanVetClient (blocking, thread-safe) and AsyncLoanVetClient (asyncio) keep a
+pool of keep-alive connections, bound the requests in flight, time out, and
+retry connection errors and 429/502/503/504 responses with jittered
+exponential backoff. predict_many() batches records into /predict/batch
+requests, and falls back to one /predict request per record when the server
+has no batch endpoint.
+
+The base URL defaults to LOANVET_API_URL (or the hosted API), the timeout to
+LOANVET_API_TIMEOUT seconds. Needs the 'httpx' package; 'orjson' is used for
+JSON when it is installed, and http2=True needs 'h2'.
+"""
+from .aio import AsyncLoanVetClient
+from .base import DEFAULT_BASE_URL, LoanVetAPIError, Retry
+from .sync import LoanVetClient
+
+__all__ = ["AsyncLoanVetClient", "DEFAULT_BASE_URL", "LoanVetAPIError", "LoanVetClient", "Retry"]
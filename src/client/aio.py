@@ -0,0 +1,104 @@
+"""
+asyncio client for the LoanVet prediction API.
+"""
+import asyncio
+from .base import (
+    BATCH_PATH,
+    DEFAULT_BASE_URL,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_TIMEOUT,
+    JSON_HEADERS,
+    NO_BATCH_STATUSES,
+    PREDICT_PATH,
+    LoanVetAPIError,
+    Retry,
+    batch_record,
+    check_response,
+    chunks,
+    decode_json,
+    encode_json,
+    http_limits,
+    require_httpx,
+    should_retry,
+)
+
+class AsyncLoanVetClient:
+    """
+    asyncio counterpart of LoanVetClient. At most max_connections requests
+    are in flight at once, so callers can gather any number of predict()
+    calls without opening more connections or overrunning the server.
+
+        async with AsyncLoanVetClient("http://localhost:8000") as client:
+            results = await asyncio.gather(*(client.predict(r) for r in records))
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, timeout: float = DEFAULT_TIMEOUT,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS, retry: Retry = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, http2: bool = False, transport=None):
+        httpx = require_httpx()
+        self.retry = retry or Retry()
+        self.batch_size = batch_size
+        self.max_connections = max_connections
+        self.batch_supported = None
+        self._transport_errors = (httpx.TransportError,)
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self._http = httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=http_limits(max_connections),
+                                       http2=http2, transport=transport)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    async def _post(self, path: str, payload):
+        body = encode_json(payload)
+        for attempt in range(self.retry.attempts + 1):
+            # The slot is released while backing off, so waiting retries do not hold up other requests
+            async with self._semaphore:
+                try:
+                    response = await self._http.post(path, content=body, headers=JSON_HEADERS)
+                except self._transport_errors:
+                    if attempt == self.retry.attempts:
+                        raise
+                    response = None
+            if response is not None and not should_retry(response, attempt, self.retry):
+                return decode_json(check_response(response).content)
+            await asyncio.sleep(self.retry.delay(attempt, response))
+
+    async def predict(self, record: dict) -> dict:
+        """Scores one raw record; returns {"label", "probability"}."""
+        return (await self._post(PREDICT_PATH, record))["prediction"]
+
+    async def predict_batch(self, records: list) -> list:
+        """Scores records in one /predict/batch request."""
+        return (await self._post(BATCH_PATH, [batch_record(r) for r in records]))["predictions"]
+
+    async def predict_many(self, records: list, batch_size: int = None) -> list:
+        """
+        Scores any number of records, in input order, as concurrent
+        /predict/batch requests of batch_size. Against a server without the
+        batch endpoint, records are sent one per /predict request instead.
+        """
+        records = list(records)
+        batches = chunks(records, batch_size or self.batch_size)
+        if not batches:
+            return []
+        results = []
+        if self.batch_supported is None:
+            # The first batch is sent alone to find out whether the endpoint exists
+            try:
+                results.append(await self.predict_batch(batches.pop(0)))
+                self.batch_supported = True
+            except LoanVetAPIError as e:
+                if e.status_code not in NO_BATCH_STATUSES:
+                    raise
+                self.batch_supported = False
+        if self.batch_supported:
+            results.extend(await asyncio.gather(*(self.predict_batch(batch) for batch in batches)))
+            return [prediction for batch in results for prediction in batch]
+        return list(await asyncio.gather(*(self.predict(record) for record in records)))
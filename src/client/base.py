@@ -0,0 +1,96 @@
+"""
+Pieces shared by the sync and asyncio clients: settings, retry policy, error
+type and request/response encoding.
+"""
+import json
+import os
+import random
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_BASE_URL = os.getenv("LOANVET_API_URL", "https://loanvet.onrender.com")
+DEFAULT_TIMEOUT = float(os.getenv("LOANVET_API_TIMEOUT", "10"))
+# Connections kept open per client, and requests in flight at once
+DEFAULT_MAX_CONNECTIONS = 16
+# Records per /predict/batch request (the server scores them in chunks of 10,000)
+DEFAULT_BATCH_SIZE = 1_000
+
+PREDICT_PATH = "/predict"
+BATCH_PATH = "/predict/batch"
+# Responses worth retrying: rate limited, model still loading (503) or a proxy error
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# Responses meaning the server has no batch endpoint
+NO_BATCH_STATUSES = frozenset({404, 405})
+
+class LoanVetAPIError(Exception):
+    """The API answered with an error status (after any retries)."""
+
+    def __init__(self, status_code: int, detail):
+        super().__init__(f"LoanVet API error {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+class Retry:
+    """
+    Retries with exponential backoff and full jitter. A Retry-After header on
+    a 429/503 response is used instead, when it is shorter than max_backoff.
+    """
+
+    def __init__(self, attempts: int = 3, backoff: float = 0.1, max_backoff: float = 2.0):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(self, attempt: int, response=None) -> float:
+        if response is not None:
+            try:
+                return min(float(response.headers["retry-after"]), self.max_backoff)
+            except (KeyError, ValueError):
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+def require_httpx():
+    try:
+        import httpx
+    except ImportError:
+        raise RuntimeError("The LoanVet client requires the 'httpx' package.")
+    return httpx
+
+def http_limits(max_connections: int):
+    httpx = require_httpx()
+    return httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+
+def encode_json(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
+def decode_json(content: bytes):
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+def batch_record(record: dict) -> dict:
+    """/predict/batch takes numbers only; absent (None/NaN) inputs are left out and get the server defaults."""
+    return {k: float(v) for k, v in record.items() if v is not None and v == v}
+
+def chunks(records: list, size: int) -> list:
+    return [records[i:i + size] for i in range(0, len(records), size)]
+
+def check_response(response):
+    """Raises LoanVetAPIError for an error status, with the API's `detail` when there is one."""
+    if response.status_code < 400:
+        return response
+    try:
+        detail = decode_json(response.content).get("detail")
+    except Exception:
+        detail = response.text
+    raise LoanVetAPIError(response.status_code, detail)
+
+def should_retry(response, attempt: int, retry: Retry) -> bool:
+    return response.status_code in RETRY_STATUSES and attempt < retry.attempts
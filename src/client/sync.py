@@ -0,0 +1,109 @@
+"""
+Blocking client for the LoanVet prediction API.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .base import (
+    BATCH_PATH,
+    DEFAULT_BASE_URL,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_TIMEOUT,
+    JSON_HEADERS,
+    NO_BATCH_STATUSES,
+    PREDICT_PATH,
+    LoanVetAPIError,
+    Retry,
+    batch_record,
+    check_response,
+    chunks,
+    decode_json,
+    encode_json,
+    http_limits,
+    require_httpx,
+    should_retry,
+)
+
+class LoanVetClient:
+    """
+    Keeps a pool of up to max_connections keep-alive connections, so only the
+    first requests pay for the TCP/TLS handshake. Safe to share between
+    threads; use one client per process.
+
+        with LoanVetClient("http://localhost:8000") as client:
+            client.predict({"age": 35, "monthly_income": 5000.0})
+            client.predict_many(records)
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, timeout: float = DEFAULT_TIMEOUT,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS, retry: Retry = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, http2: bool = False, transport=None):
+        httpx = require_httpx()
+        self.retry = retry or Retry()
+        self.batch_size = batch_size
+        self.max_connections = max_connections
+        # None until the first batch request shows whether the server has /predict/batch
+        self.batch_supported = None
+        self._transport_errors = (httpx.TransportError,)
+        # transport replaces the network, e.g. with an in-process test transport
+        self._http = httpx.Client(base_url=base_url, timeout=timeout, limits=http_limits(max_connections), http2=http2,
+                                  transport=transport)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._http.close()
+
+    def _post(self, path: str, payload):
+        body = encode_json(payload)
+        for attempt in range(self.retry.attempts + 1):
+            try:
+                response = self._http.post(path, content=body, headers=JSON_HEADERS)
+            except self._transport_errors:
+                if attempt == self.retry.attempts:
+                    raise
+                time.sleep(self.retry.delay(attempt))
+                continue
+            if not should_retry(response, attempt, self.retry):
+                return decode_json(check_response(response).content)
+            time.sleep(self.retry.delay(attempt, response))
+
+    def predict(self, record: dict) -> dict:
+        """Scores one raw record; returns {"label", "probability"}."""
+        return self._post(PREDICT_PATH, record)["prediction"]
+
+    def predict_batch(self, records: list) -> list:
+        """Scores records in one /predict/batch request."""
+        return self._post(BATCH_PATH, [batch_record(r) for r in records])["predictions"]
+
+    def predict_many(self, records: list, batch_size: int = None, concurrency: int = None) -> list:
+        """
+        Scores any number of records, in input order. Records are sent in
+        /predict/batch requests of batch_size, up to `concurrency` at a time
+        (default max_connections). Against a server without the batch
+        endpoint, records are sent one per /predict request instead.
+        """
+        records = list(records)
+        concurrency = concurrency or self.max_connections
+        batches = chunks(records, batch_size or self.batch_size)
+        if not batches:
+            return []
+        results = []
+        if self.batch_supported is None:
+            # The first batch is sent alone to find out whether the endpoint exists
+            try:
+                results.append(self.predict_batch(batches.pop(0)))
+                self.batch_supported = True
+            except LoanVetAPIError as e:
+                if e.status_code not in NO_BATCH_STATUSES:
+                    raise
+                self.batch_supported = False
+        with ThreadPoolExecutor(concurrency) as executor:
+            if self.batch_supported:
+                results.extend(executor.map(self.predict_batch, batches))
+                return [prediction for batch in results for prediction in batch]
+            return list(executor.map(self.predict, records))
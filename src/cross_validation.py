@@ -0,0 +1,257 @@
+"""
+Parallel cross-validation and model comparison.
+
+Replaces the fold loop of notebooks/02_advanced_models.ipynb. The engineered
+table is read once and its feature matrix, target and fold assignment are
+placed in shared memory. Every model x fold pair is then a job on a process
+pool, and each job is limited to --threads-per-job threads (OpenMP/BLAS and
+the model's own n_jobs/nthread), so jobs do not oversubscribe the cores.
+
+Fold assignments (StratifiedKFold, shuffled, random_state=42 as in the
+notebooks) are cached in models/advanced/cv_folds.npz and reused while the
+target column is unchanged. Each worker keeps the training matrices of the
+folds it has seen, including xgboost DMatrix and lightgbm Dataset objects,
+so further models on the same fold skip their construction.
+
+Metrics are written in the cv_metrics.json schema (mean/std of ROC-AUC,
+PR-AUC and F1 at 0.5, summed confusion matrix), with each job's wall-clock
+time added under "fold_seconds".
+
+Run from the repository root:
+    python src/cross_validation.py --jobs 15 --threads-per-job 1
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import namedtuple
+from multiprocessing import get_context, shared_memory
+import numpy as np
+from evaluation import sort_scores, summarize, sweep
+from storage import load_table
+
+OUTPUT_PATH = "models/advanced/cv_metrics.json"
+FOLDS_PATH = "models/advanced/cv_folds.npz"
+TARGET = "SeriousDlqin2yrs"
+N_SPLITS = 5
+SPLIT_SEED = 42
+THRESHOLD = 0.5
+
+# Raw and intermediate columns the notebooks drop before modelling
+DROP_COLUMNS = [
+    "RevolvingUtilizationOfUnsecuredLines",
+    "DebtRatio",
+    "NumberOfTime30-59DaysPastDueNotWorse",
+    "NumberOfTimes90DaysLate",
+    "NumberOfTime60-89DaysPastDueNotWorse",
+    "NumberOfTime30-59DaysPastDueNotWorse_log",
+    "NumberOfTimes90DaysLate_log",
+    "NumberOfTime60-89DaysPastDueNotWorse_log",
+    "TotalDelinquencies",
+    "MonthlyIncome",
+]
+
+# Models compared in the notebook CV loop: name -> (library, parameters)
+MODELS = {
+    "random_forest": ("sklearn_rf", {"n_estimators": 100, "class_weight": "balanced", "random_state": 42}),
+    "xgboost": ("xgboost", {"num_boost_round": 100, "max_depth": 3, "eta": 0.1, "eval_metric": "logloss", "seed": 42}),
+    "lightgbm": ("lightgbm", {"num_boost_round": 100, "learning_rate": 0.1, "seed": 42}),
+}
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+SharedArray = namedtuple("SharedArray", ["name", "shape", "dtype"])
+
+def share_array(array: np.ndarray, segments: list) -> SharedArray:
+    """Copies an array into a new shared memory segment, appended to `segments` for cleanup."""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    segments.append(shm)
+    return SharedArray(shm.name, array.shape, array.dtype.str)
+
+def load_dataset():
+    df = load_table("credit_risk_engineered")
+    df = df.drop(columns=DROP_COLUMNS, errors="ignore")
+    features = [c for c in df.columns if c != TARGET]
+    X = np.ascontiguousarray(df[features].to_numpy(dtype=np.float32))
+    y = df[TARGET].to_numpy(dtype=np.int8)
+    return X, y
+
+def fold_assignment(y: np.ndarray, n_splits=N_SPLITS, seed=SPLIT_SEED, path=FOLDS_PATH) -> np.ndarray:
+    """Test-fold index of every row, cached on disk and keyed by the target column and split settings."""
+    key = hashlib.sha256(y.tobytes() + f"{n_splits}:{seed}".encode()).hexdigest()
+    if os.path.exists(path):
+        cached = np.load(path)
+        if str(cached["key"]) == key:
+            return cached["folds"]
+
+    from sklearn.model_selection import StratifiedKFold
+
+    folds = np.empty(len(y), dtype=np.int8)
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    # Features do not affect stratified splits, so only the target is passed
+    for fold, (_, test_idx) in enumerate(skf.split(np.zeros(len(y)), y)):
+        folds[test_idx] = fold
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez(path, folds=folds, key=key)
+    return folds
+
+# == Worker process ==
+
+_worker = {}
+
+def init_worker(arrays: dict, threads: int):
+    """Attaches the shared arrays and caps the threads used by each job."""
+    # Set before the model libraries are imported (they are imported lazily in the worker)
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    _worker["threads"] = threads
+    _worker["segments"] = []
+    _worker["cache"] = {}
+    for name, spec in arrays.items():
+        shm = shared_memory.SharedMemory(name=spec.name)
+        _worker["segments"].append(shm)
+        _worker[name] = np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=shm.buf)
+
+def _cached(fold: int, name: str, build):
+    """
+    Per-fold objects (training matrix copy, DMatrix, Dataset) reused by the
+    jobs of the fold a worker is on. Only the current fold is kept, so a
+    worker never holds more than one copy of the training rows.
+    """
+    if _worker.get("cache_fold") != fold:
+        _worker["cache"].clear()
+        _worker["cache_fold"] = fold
+    cache = _worker["cache"]
+    if name not in cache:
+        cache[name] = build()
+    return cache[name]
+
+def _split(fold: int):
+    def build():
+        test = _worker["folds"] == fold
+        train_idx, test_idx = np.flatnonzero(~test), np.flatnonzero(test)
+        X, y = _worker["X"], _worker["y"]
+        return X[train_idx], y[train_idx], X[test_idx], y[test_idx]
+    return _cached(fold, "split", build)
+
+def fit_predict(library: str, params: dict, fold: int) -> np.ndarray:
+    """Fits on the fold's training rows and returns positive-class probabilities for its test rows."""
+    X_train, y_train, X_test, _ = _split(fold)
+    threads = _worker["threads"]
+    params = dict(params)
+
+    if library == "sklearn_rf":
+        from sklearn.ensemble import RandomForestClassifier
+
+        model = RandomForestClassifier(n_jobs=threads, **params).fit(X_train, y_train)
+        return model.predict_proba(X_test)[:, 1]
+
+    if library == "xgboost":
+        import xgboost as xgb
+
+        dtrain = _cached(fold, "xgb_train", lambda: xgb.DMatrix(X_train, label=y_train, nthread=threads))
+        dtest = _cached(fold, "xgb_test", lambda: xgb.DMatrix(X_test, nthread=threads))
+        rounds = params.pop("num_boost_round")
+        booster = xgb.train({"objective": "binary:logistic", "nthread": threads, **params}, dtrain, rounds)
+        return booster.predict(dtest)
+
+    if library == "lightgbm":
+        import lightgbm as lgb
+
+        # Binning happens once per fold; the constructed Dataset is reused by later lightgbm models
+        dtrain = _cached(fold, "lgb_train", lambda: lgb.Dataset(X_train, label=y_train, free_raw_data=False))
+        rounds = params.pop("num_boost_round")
+        booster = lgb.train({"objective": "binary", "num_threads": threads, "verbose": -1, **params}, dtrain, rounds)
+        return booster.predict(X_test, num_threads=threads)
+
+    raise ValueError(f"Unknown model library '{library}'")
+
+def run_job(job):
+    model_name, library, params, fold = job
+    start = time.perf_counter()
+    proba = fit_predict(library, params, fold)
+    y_test = _split(fold)[3]
+    summary = summarize(sweep(sort_scores(y_test, proba)), THRESHOLD)
+    metrics = {
+        "roc_auc": summary["roc_auc"],
+        "pr_auc": summary["pr_auc"],
+        "f1": summary["at_threshold"]["f1"],
+        "confusion_matrix": summary["at_threshold"]["confusion_matrix"],
+    }
+    return model_name, fold, metrics, time.perf_counter() - start
+
+# == Parent ==
+
+def aggregate(results: list, model_names: list) -> dict:
+    """Fold results in the cv_metrics.json schema, plus per-fold wall-clock seconds."""
+    metrics = {}
+    for name in model_names:
+        folds = sorted((r for r in results if r[0] == name), key=lambda r: r[1])
+        entry = {}
+        for metric in ("roc_auc", "pr_auc", "f1"):
+            values = [r[2][metric] for r in folds]
+            entry[f"{metric}_mean"] = float(np.mean(values))
+            entry[f"{metric}_std"] = float(np.std(values))
+        entry["confusion_matrix_sum"] = np.sum([r[2]["confusion_matrix"] for r in folds], axis=0).tolist()
+        entry["fold_seconds"] = [r[3] for r in folds]
+        metrics[name] = entry
+    return metrics
+
+def cross_validate(model_names, jobs: int = 0, threads_per_job: int = 1, n_splits=N_SPLITS, folds_path=FOLDS_PATH):
+    start = time.perf_counter()
+    X, y = load_dataset()
+    folds = fold_assignment(y, n_splits, path=folds_path)
+    print(f"Loaded {X.shape[0]:,} rows x {X.shape[1]} features in {time.perf_counter() - start:.2f}s.")
+
+    # Fold-major order, so a worker's consecutive jobs tend to share a fold's cached matrices
+    job_list = [(name, *MODELS[name], fold) for fold in range(n_splits) for name in model_names]
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    jobs = min(jobs or max(1, cores // threads_per_job), len(job_list))
+
+    segments = []
+    try:
+        arrays = {"X": share_array(X, segments), "y": share_array(y, segments), "folds": share_array(folds, segments)}
+        del X
+        context = get_context("fork") if hasattr(os, "fork") else get_context("spawn")
+        pool_start = time.perf_counter()
+        results = []
+        with context.Pool(jobs, initializer=init_worker, initargs=(arrays, threads_per_job)) as pool:
+            for model_name, fold, metrics, seconds in pool.imap_unordered(run_job, job_list):
+                results.append((model_name, fold, metrics, seconds))
+                print(f"  {model_name:<15} fold {fold}: ROC-AUC {metrics['roc_auc']:.4f} in {seconds:.2f}s")
+        elapsed = time.perf_counter() - pool_start
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+    job_seconds = sum(r[3] for r in results)
+    print(f"Ran {len(job_list)} jobs on {jobs} processes x {threads_per_job} threads in {elapsed:.1f}s "
+          f"({job_seconds:.1f}s of job time, {job_seconds / elapsed if elapsed > 0 else 0:.1f}x parallel speedup).")
+    return aggregate(results, model_names)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="*", choices=list(MODELS), default=list(MODELS))
+    parser.add_argument("--jobs", type=int, default=0, help="worker processes (default: cores / threads per job)")
+    parser.add_argument("--threads-per-job", type=int, default=1)
+    parser.add_argument("--splits", type=int, default=N_SPLITS)
+    parser.add_argument("--folds-cache", default=FOLDS_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    args = parser.parse_args()
+
+    metrics = cross_validate(args.models, args.jobs, args.threads_per_job, args.splits, args.folds_cache)
+    for name, entry in metrics.items():
+        print(f"{name:<15} ROC-AUC {entry['roc_auc_mean']:.4f} ± {entry['roc_auc_std']:.4f}  "
+              f"PR-AUC {entry['pr_auc_mean']:.4f} ± {entry['pr_auc_std']:.4f}  "
+              f"F1 {entry['f1_mean']:.4f} ± {entry['f1_std']:.4f}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(metrics, f, indent=4)
+    print(f"✅ Cross-validation metrics saved to {args.output}")
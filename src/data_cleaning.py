@@ -1,5 +1,28 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
 import sqlite3
+import time
+import numpy as np
+import pandas as pd
 from eda_baseline import load_data
+from storage import STORAGE_BACKEND, export_sqlite_table, save_table
+
+DB_PATH = "data/loanvet.db"
+
+# Rows read, transformed and written per step of the streaming pipeline
+CHUNK_SIZE = 100_000
+
+# Columns imputed with their (post-deduplication) median
+IMPUTE_COLUMNS = ["MonthlyIncome", "NumberOfDependents"]
+
+# Versioned, frozen cleaning statistics (cleaning_stats_v<N>.json), written by full runs
+STATS_DIR = "data/stats"
+
+# Row state of incremental.materialize, which upserts output rows by raw key
+INCREMENTAL_STATE_TABLES = ("raw_row_state", "materialization_state")
 
 # Drop unnamed index column
 def drop_first_col(df):
@@ -22,11 +45,12 @@ def create_missing_flags(df):
     return df
 
 # Impute MonthlyIncome with median & NumberOfDependents with median or 0
-def impute_missing_values(df):
-    median_income = df['MonthlyIncome'].median()
+# Pass frozen medians (see load_cleaning_stats) to reuse a previous run's statistics
+def impute_missing_values(df, medians=None):
+    median_income = medians["MonthlyIncome"] if medians else df['MonthlyIncome'].median()
     df['MonthlyIncome'] = df['MonthlyIncome'].fillna(median_income)
 
-    median_dependents = df['NumberOfDependents'].median()
+    median_dependents = medians["NumberOfDependents"] if medians else df['NumberOfDependents'].median()
     df['NumberOfDependents'] = df['NumberOfDependents'].fillna(median_dependents)
     return df
 
@@ -52,25 +76,244 @@ def cap_outliers(df, caps):
             df[col] = df[col].clip(lower=lower, upper=upper)
     return df
 
-def save_imputed_data(df):
-    conn = sqlite3.connect("data/loanvet.db")
-    df.to_sql("credit_risk_imputed", conn, if_exists='replace', index=False)
+# == Frozen cleaning statistics ==
+
+def _stats_versions(stats_dir=STATS_DIR):
+    paths = glob.glob(os.path.join(stats_dir, "cleaning_stats_v*.json"))
+    return sorted(int(os.path.basename(p)[len("cleaning_stats_v"):-len(".json")]) for p in paths)
+
+def stats_content_hash(stats) -> str:
+    """Hash of the statistics that determine cleaning output (medians and caps)."""
+    content = {"medians": stats["medians"], "caps": stats["caps"]}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+def save_cleaning_stats(medians, rows, stats_dir=STATS_DIR):
+    """
+    Freezes the imputation medians and caps of a full run as the next stats
+    version. When they are the same as the latest version's, that version is
+    returned and nothing is written, so incremental runs are not rebuilt.
+    """
+    stats = {
+        "medians": {col: float(value) for col, value in medians.items()},
+        "caps": {col: list(bounds) for col, bounds in custom_caps.items()},
+    }
+    content_hash = stats_content_hash(stats)
+    latest = load_cleaning_stats(stats_dir=stats_dir)
+    if latest is not None and stats_content_hash(latest) == content_hash:
+        print(f"Cleaning statistics unchanged; keeping version {latest['version']}.")
+        return latest
+
+    os.makedirs(stats_dir, exist_ok=True)
+    version = (_stats_versions(stats_dir) or [0])[-1] + 1
+    stats = {
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "rows": rows,
+        **stats,
+        "content_hash": content_hash,
+    }
+    with open(os.path.join(stats_dir, f"cleaning_stats_v{version}.json"), "w") as f:
+        json.dump(stats, f, indent=2)
+    print(f"Cleaning statistics frozen as version {version}.")
+    return stats
+
+def load_cleaning_stats(version=None, stats_dir=STATS_DIR):
+    """Loads a frozen stats version (the latest by default), or None if none exist."""
+    versions = _stats_versions(stats_dir)
+    if not versions:
+        return None
+    version = version or versions[-1]
+    with open(os.path.join(stats_dir, f"cleaning_stats_v{version}.json")) as f:
+        return json.load(f)
+
+def invalidate_incremental_state(db_path=DB_PATH):
+    """
+    Drops the incremental row state before a full run rewrites output tables
+    (with new rowids), so the next incremental run rebuilds them instead of
+    upserting into rows that then hold other raw rows.
+    """
+    if not os.path.exists(db_path):
+        return
+    conn = sqlite3.connect(db_path)
+    for table in INCREMENTAL_STATE_TABLES:
+        conn.execute(f"DROP TABLE IF EXISTS {quote(table)}")
+    conn.commit()
     conn.close()
+
+def save_imputed_data(df):
+    invalidate_incremental_state()
+    save_table(df, "credit_risk_imputed")
     print("Imputed data saved to 'credit_risk_imputed' table.")
 
 def save_cleaned_data(df):
-    conn = sqlite3.connect("data/loanvet.db")
-    df.to_sql("credit_risk_cleaned", conn, if_exists='replace', index=False)
+    invalidate_incremental_state()
+    save_table(df, "credit_risk_cleaned")
+    print("Cleaned data saved to 'credit_risk_cleaned' table.")
+
+# == Streaming (out-of-core) pipeline ==
+
+class StreamingMedian:
+    """
+    Exact streaming median: counts of each distinct non-null value, merged
+    chunk by chunk. Memory grows with the number of distinct values, not rows.
+    Matches pandas' Series.median() (mean of the two middle values for an
+    even count, NaN when there are no values).
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.n = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        uniques, counts = np.unique(values, return_counts=True)
+        for value, count in zip(uniques.tolist(), counts.tolist()):
+            self.counts[value] = self.counts.get(value, 0) + count
+        self.n += len(values)
+
+    def median(self) -> float:
+        if self.n == 0:
+            return np.nan
+        # 0-based ranks of the middle value(s)
+        lower_rank, upper_rank = (self.n - 1) // 2, self.n // 2
+        lower = upper = None
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if lower is None and seen > lower_rank:
+                lower = value
+            if seen > upper_rank:
+                upper = value
+                break
+        return (lower + upper) / 2
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def mark_first_occurrences(conn, table="credit_risk_raw"):
+    """
+    SQL-side deduplication: records the rowid of the first occurrence of each
+    distinct row (ignoring the unnamed index column) in a temp table, so the
+    rows can be streamed back in their original order. Returns the columns
+    kept and the number of duplicates dropped.
+    """
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({quote(table)})")][1:]
+    column_sql = ", ".join(quote(c) for c in columns)
+    conn.execute("DROP TABLE IF EXISTS temp.first_rows")
+    conn.execute("CREATE TEMP TABLE first_rows (rid INTEGER PRIMARY KEY)")
+    # GROUP BY treats NULLs as equal, like pandas drop_duplicates treats NaN
+    conn.execute(f"INSERT INTO first_rows SELECT MIN(rowid) FROM {quote(table)} GROUP BY {column_sql}")
+    total = conn.execute(f"SELECT COUNT(*) FROM {quote(table)}").fetchone()[0]
+    kept = conn.execute("SELECT COUNT(*) FROM first_rows").fetchone()[0]
+    return columns, total - kept
+
+def iter_first_rows(conn, columns, table="credit_risk_raw", chunk_size=CHUNK_SIZE):
+    # Keyset pagination over first_rows: each chunk is its own query, so writes
+    # to the output tables never interleave with an open read cursor.
+    column_sql = ", ".join(f"t.{quote(c)}" for c in columns)
+    last_rid = 0
+    while True:
+        chunk = pd.read_sql_query(
+            f"SELECT f.rid, {column_sql} FROM first_rows f JOIN {quote(table)} t ON t.rowid = f.rid "
+            f"WHERE f.rid > ? ORDER BY f.rid LIMIT ?",
+            conn,
+            params=(last_rid, chunk_size),
+        )
+        if chunk.empty:
+            return
+        last_rid = int(chunk["rid"].iloc[-1])
+        yield chunk.drop(columns="rid")
+
+def streaming_medians(conn, columns, chunk_size=CHUNK_SIZE):
+    sketches = {col: StreamingMedian() for col in IMPUTE_COLUMNS}
+    for chunk in iter_first_rows(conn, columns, chunk_size=chunk_size):
+        for col, sketch in sketches.items():
+            sketch.update(chunk[col].astype("float64"))
+    return {col: sketch.median() for col, sketch in sketches.items()}
+
+def impute_chunk(df, medians):
+    # Same steps as the in-memory path, with medians computed over the whole table
+    df = create_missing_flags(df)
+    for col, median in medians.items():
+        # A chunk where every value is NULL is read back as object dtype
+        df[col] = df[col].astype("float64").fillna(median)
+    return df
+
+def clean_streaming(db_path=DB_PATH, chunk_size=CHUNK_SIZE):
+    """
+    Out-of-core version of the cleaning pipeline. Deduplicates in SQL, makes
+    one pass for the imputation medians and a second pass that writes
+    credit_risk_imputed and credit_risk_cleaned chunk by chunk. Memory scales
+    with chunk_size rather than the table size.
+    """
+    start = time.perf_counter()
+    invalidate_incremental_state(db_path)
+    conn = sqlite3.connect(db_path)
+    columns, duplicates = mark_first_occurrences(conn)
+    print(f"Dropped {duplicates} duplicate rows")
+
+    medians = streaming_medians(conn, columns, chunk_size)
+    print(f"Imputation medians: {medians}")
+    kept = conn.execute("SELECT COUNT(*) FROM first_rows").fetchone()[0]
+    save_cleaning_stats(medians, kept)
+
+    rows = 0
+    if_exists = "replace"
+    for chunk in iter_first_rows(conn, columns, chunk_size=chunk_size):
+        imputed = impute_chunk(chunk, medians)
+        imputed.to_sql("credit_risk_imputed", conn, if_exists=if_exists, index=False)
+        cleaned = cap_outliers(imputed.copy(), custom_caps)
+        cleaned.to_sql("credit_risk_cleaned", conn, if_exists=if_exists, index=False)
+        conn.commit()
+        if_exists = "append"
+        rows += len(chunk)
     conn.close()
+
+    print("Imputed data saved to 'credit_risk_imputed' table.")
     print("Cleaned data saved to 'credit_risk_cleaned' table.")
+    # Deduplication runs in SQLite, so columnar outputs are exported from it afterwards
+    if STORAGE_BACKEND != "sqlite":
+        export_sqlite_table("credit_risk_imputed", STORAGE_BACKEND, db_path=db_path)
+        export_sqlite_table("credit_risk_cleaned", STORAGE_BACKEND, db_path=db_path)
+    print(f"Streamed {rows} rows in {time.perf_counter() - start:.1f}s")
+    return rows
 
-if __name__ == "__main__":
+def clean_in_memory():
     df = load_data()
     df = drop_first_col(df)
     df = drop_duplicates(df)
     df = create_missing_flags(df)
+    save_cleaning_stats({col: df[col].median() for col in IMPUTE_COLUMNS}, len(df))
     df = impute_missing_values(df)
     save_imputed_data(df)
-    
+
     df = cap_outliers(df, custom_caps)
-    save_cleaned_data(df)
\ No newline at end of file
+    save_cleaned_data(df)
+
+def verify_against_in_memory(db_path=DB_PATH):
+    """Checks the streamed tables equal the in-memory pipeline's output on the full raw table."""
+    df = drop_duplicates(drop_first_col(load_data()))
+    imputed = impute_missing_values(create_missing_flags(df))
+    cleaned = cap_outliers(imputed.copy(), custom_caps)
+
+    conn = sqlite3.connect(db_path)
+    for table, expected in (("credit_risk_imputed", imputed), ("credit_risk_cleaned", cleaned)):
+        actual = pd.read_sql_query(f"SELECT * FROM {table}", conn)
+        pd.testing.assert_frame_equal(actual, expected.reset_index(drop=True), check_dtype=False)
+        print(f"✅ {table} matches the in-memory pipeline ({len(actual)} rows).")
+    conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplicate, impute and cap the raw credit table.")
+    parser.add_argument("--in-memory", action="store_true", help="use the original pandas pipeline")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--verify", action="store_true", help="compare the streamed tables with the in-memory pipeline")
+    args = parser.parse_args()
+
+    if args.in_memory:
+        clean_in_memory()
+    else:
+        clean_streaming(chunk_size=args.chunk_size)
+        if args.verify:
+            verify_against_in_memory()
\ No newline at end of file
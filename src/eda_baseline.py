@@ -1,19 +1,15 @@
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-import sqlite3
+from storage import load_table
 
-def load_data():
-    conn = sqlite3.connect("data/loanvet.db")
-    df = pd.read_sql_query("SELECT * FROM credit_risk_raw", conn)
-    conn.close()
-    return df
+# Both loaders read from the backend set by LOANVET_STORAGE (see storage.py);
+# columns and filters are pushed down to it
+def load_data(columns=None, filters=None):
+    return load_table("credit_risk_raw", columns, filters)
 
-def load_cleaned_data():
-    conn = sqlite3.connect("data/loanvet.db")
-    df = pd.read_sql_query("SELECT * FROM credit_risk_cleaned", conn)
-    conn.close()
-    return df
+def load_cleaned_data(columns=None, filters=None):
+    return load_table("credit_risk_cleaned", columns, filters)
 
 def eda_overview(df):
     print("Shape:", df.shape)
@@ -3,6 +3,7 @@ import matplotlib.pyplot as plt
 from matplotlib.ticker import FixedLocator
 import seaborn as sns
 from eda_baseline import load_cleaned_data
+from eda_stats import iqr_outlier_summary
 
 def plot_eda(df):
     numeric_cols = df.select_dtypes(include='number').columns
@@ -50,18 +51,6 @@ def plot_eda(df):
         plt.tight_layout()
         plt.show()
 
-def iqr_outlier_summary(df):
-    numeric_cols = df.select_dtypes(include='number').columns
-    for col in numeric_cols:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-        outliers = df[(df[col] < lower_bound) | (df[col] > upper_bound)]
-        pct = len(outliers) / len(df) * 100
-        print(f"{col}: {len(outliers)} outliers ({pct:.2f}%)")
-
 if __name__ == "__main__":
     df = load_cleaned_data()
     plot_eda(df)
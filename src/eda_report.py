@@ -0,0 +1,431 @@
+"""
+Headless EDA report for large tables.
+
+The per-column plotting loops in eda_outliers, eda_target_analysis and
+eda_missing draw every row of the table with seaborn and block on
+plt.show(). This report streams the table once instead:
+
+- Exact, vectorized per chunk: row and missing counts, mean, std, min,
+  max, skewness, target rate, target rate by missingness, counts of binary
+  columns, pairwise-complete correlations and the missingness of each
+  block of rows (replacing the one-cell-per-row heatmap).
+- From a stratified sample (a fixed-size reservoir per target class, kept
+  in the same pass): histograms, quantiles and box statistics, overall
+  (reweighted to the class sizes) and by target.
+
+Stats are cached in data/stats/eda/ by table fingerprint (see
+storage.table_fingerprint) and collection settings, so an unchanged table
+is not read again.
+Figures are rendered off-screen (Agg) in a process pool, saved as PNG files
+and embedded in a single self-contained HTML report.
+
+Run from the repository root:
+    python src/eda_report.py --table credit_risk_cleaned
+"""
+import argparse
+import base64
+import hashlib
+import html
+import json
+import math
+import os
+import time
+from multiprocessing import get_context
+import numpy as np
+from eda_stats import PairwiseCorrelation
+from storage import iter_table, table_fingerprint
+
+TARGET = "SeriousDlqin2yrs"
+REPORT_DIR = "reports/eda"
+CACHE_DIR = "data/stats/eda"
+CHUNK_SIZE = 250_000
+# Reservoir size per target class for histograms, quantiles and box statistics
+SAMPLE_PER_CLASS = 100_000
+BINS = 30
+# Rows of the missingness matrix; chunks are merged down to at most this many blocks
+MISSING_BLOCKS = 200
+# Outliers drawn per box plot; the outlier share covers all of them
+MAX_FLIERS = 200
+QUANTILES = (0.0, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 1.0)
+
+# == Streaming pass ==
+
+class StratifiedReservoir:
+    """
+    Uniform sample of up to `size` rows per class. Each row gets a random key
+    and the rows with the smallest keys are kept, so merging a chunk is one
+    argpartition.
+    """
+
+    def __init__(self, size: int, seed: int = 0):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.keys, self.rows, self.seen = {}, {}, {}
+
+    def add(self, X: np.ndarray, y: np.ndarray):
+        for label in np.unique(y):
+            rows = X[y == label]
+            label = int(label)
+            keys = self.rng.random(len(rows))
+            if label in self.keys:
+                keys = np.concatenate([self.keys[label], keys])
+                rows = np.concatenate([self.rows[label], rows])
+            if len(keys) > self.size:
+                keep = np.argpartition(keys, self.size)[:self.size]
+                keys, rows = keys[keep], rows[keep]
+            self.keys[label], self.rows[label] = keys, rows
+            self.seen[label] = self.seen.get(label, 0) + int((y == label).sum())
+
+def collect(table: str, target: str = TARGET, chunk_size: int = CHUNK_SIZE, sample_per_class: int = SAMPLE_PER_CLASS,
+            seed: int = 0, backend=None):
+    """One pass over the table. Returns the exact accumulators and the stratified sample."""
+    columns = None
+    reservoir = StratifiedReservoir(sample_per_class, seed)
+    blocks = []
+    for chunk in iter_table(table, backend=backend, chunk_size=chunk_size):
+        if columns is None:
+            columns = [c for c in chunk.select_dtypes(include="number").columns if c != target]
+            p = len(columns)
+            acc = {name: np.zeros(p) for name in ("count", "sum", "missing", "ones", "missing_pos")}
+            acc.update(min=np.full(p, np.inf), max=np.full(p, -np.inf), rows=0, positives=0)
+            # Central moments are combined across chunks (Chan et al.), which stays stable on heavy tails
+            acc.update(m2=np.zeros(p), m3=np.zeros(p))
+            correlation = PairwiseCorrelation(p)
+        # All-NULL chunks of a column arrive from SQLite as object dtype
+        X = chunk[columns].astype("float64").to_numpy()
+        y = chunk[target].to_numpy(dtype=np.float64)
+        missing = np.isnan(X)
+        present = ~missing
+        positive = y == 1
+
+        n_b = present.sum(axis=0)
+        with np.errstate(all="ignore"):
+            mean_b = np.where(n_b > 0, np.where(present, X, 0.0).sum(axis=0) / np.maximum(n_b, 1), 0.0)
+        d = np.where(present, X - mean_b, 0.0)
+        m2_b, m3_b = (d ** 2).sum(axis=0), (d ** 3).sum(axis=0)
+        n_a = acc["count"]
+        mean_a = np.divide(acc["sum"], n_a, out=np.zeros_like(n_a), where=n_a > 0)
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        with np.errstate(all="ignore"):
+            acc["m3"] += m3_b + np.nan_to_num(
+                delta ** 3 * n_a * n_b * (n_a - n_b) / n ** 2 + 3 * delta * (n_a * m2_b - n_b * acc["m2"]) / n
+            )
+            acc["m2"] += m2_b + np.nan_to_num(delta ** 2 * n_a * n_b / n)
+        acc["count"] = n
+        acc["sum"] += mean_b * n_b
+
+        acc["rows"] += len(X)
+        acc["positives"] += int(positive.sum())
+        acc["missing"] += missing.sum(axis=0)
+        acc["missing_pos"] += (missing & positive[:, None]).sum(axis=0)
+        acc["ones"] += (X == 1).sum(axis=0)
+        acc["min"] = np.fmin(acc["min"], np.where(present, X, np.inf).min(axis=0))
+        acc["max"] = np.fmax(acc["max"], np.where(present, X, -np.inf).max(axis=0))
+        correlation.add(X)
+        blocks.append((len(X), missing.sum(axis=0)))
+        reservoir.add(X, y)
+
+    if columns is None:
+        raise ValueError(f"Table '{table}' is empty")
+    acc["correlation"] = correlation.result()
+    return columns, acc, blocks, reservoir
+
+# == Statistics from the pass ==
+
+def weighted_quantiles(values: np.ndarray, weights: np.ndarray, quantiles) -> np.ndarray:
+    order = np.argsort(values)
+    cumulative = np.cumsum(weights[order])
+    index = np.searchsorted(cumulative, np.asarray(quantiles) * cumulative[-1], side="left")
+    return values[order][np.minimum(index, len(values) - 1)]
+
+def box_stats(values: np.ndarray, weights: np.ndarray, label: str) -> dict:
+    """Box plot statistics as matplotlib's Axes.bxp takes them (1.5 IQR whiskers)."""
+    q1, med, q3 = weighted_quantiles(values, weights, (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = np.sort(values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)])
+    if len(outliers) > MAX_FLIERS:
+        outliers = outliers[np.linspace(0, len(outliers) - 1, MAX_FLIERS).astype(int)]
+    is_outlier = (values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)
+    return {
+        "label": label,
+        "q1": float(q1), "med": float(med), "q3": float(q3),
+        "whislo": float(inside.min()) if len(inside) else float(q1),
+        "whishi": float(inside.max()) if len(inside) else float(q3),
+        "fliers": outliers.tolist(),
+        "outlier_pct": float(100 * weights[is_outlier].sum() / weights.sum()),
+    }
+
+def _merge_blocks(blocks: list, columns: list) -> dict:
+    """Missing share per column for at most MISSING_BLOCKS consecutive blocks of rows."""
+    rows = np.array([n for n, _ in blocks], dtype=np.float64)
+    missing = np.array([m for _, m in blocks], dtype=np.float64).reshape(len(blocks), len(columns))
+    groups = np.array_split(np.arange(len(blocks)), min(len(blocks), MISSING_BLOCKS))
+    shares = [missing[g].sum(axis=0) / rows[g].sum() for g in groups]
+    return {"block_rows": [float(rows[g].sum()) for g in groups], "share": np.array(shares).tolist()}
+
+def summarize(columns, acc, blocks, reservoir) -> dict:
+    labels = sorted(reservoir.rows)
+    sample = np.concatenate([reservoir.rows[c] for c in labels])
+    sample_y = np.concatenate([np.full(len(reservoir.rows[c]), c) for c in labels])
+    # Each sampled row stands for seen / kept rows of its class
+    weights = np.concatenate([np.full(len(reservoir.rows[c]), reservoir.seen[c] / len(reservoir.rows[c])) for c in labels])
+
+    count = acc["count"]
+    with np.errstate(all="ignore"):
+        mean = acc["sum"] / count
+        std = np.sqrt(acc["m2"] / (count - 1))
+        # Adjusted Fisher-Pearson skewness, as DataFrame.skew()
+        skew = np.sqrt(count * (count - 1)) / (count - 2) * (acc["m3"] / count) / (acc["m2"] / count) ** 1.5
+
+    stats = {}
+    for j, column in enumerate(columns):
+        values = sample[:, j]
+        present = ~np.isnan(values)
+        v, w, t = values[present], weights[present], sample_y[present]
+        missing = float(acc["missing"][j])
+        positives_missing = float(acc["missing_pos"][j])
+        entry = {
+            "count": int(count[j]),
+            "missing": int(missing),
+            "missing_pct": float(100 * missing / acc["rows"]),
+            "mean": float(mean[j]), "std": float(std[j]), "skew": float(skew[j]),
+            "min": float(acc["min"][j]), "max": float(acc["max"][j]),
+            "target_rate_missing": positives_missing / missing if missing else None,
+            "target_rate_present": (acc["positives"] - positives_missing) / (acc["rows"] - missing)
+            if acc["rows"] > missing else None,
+        }
+        is_binary = len(v) > 0 and np.isin(v, (0.0, 1.0)).all() and np.isin((acc["min"][j], acc["max"][j]), (0.0, 1.0)).all()
+        entry["kind"] = "binary" if is_binary else "continuous"
+        if is_binary:
+            entry["value_counts"] = {"0": int(count[j] - acc["ones"][j]), "1": int(acc["ones"][j])}
+        elif len(v):
+            entry["quantiles"] = dict(zip(map(str, QUANTILES), weighted_quantiles(v, w, QUANTILES).tolist()))
+            counts, edges = np.histogram(v, bins=BINS, weights=w)
+            positive_counts, _ = np.histogram(v, bins=edges, weights=w * (t == 1))
+            entry["histogram"] = {
+                "edges": edges.tolist(),
+                "counts": counts.tolist(),
+                "target_rate": np.divide(positive_counts, counts, out=np.full(len(counts), np.nan), where=counts > 0).tolist(),
+            }
+            entry["box"] = box_stats(v, w, column)
+            entry["box_by_target"] = [box_stats(v[t == c], np.ones(int((t == c).sum())), str(c)) for c in labels if (t == c).any()]
+        stats[column] = entry
+
+    return {
+        "rows": int(acc["rows"]),
+        "positives": int(acc["positives"]),
+        "sample_rows": {str(c): int(len(reservoir.rows[c])) for c in labels},
+        "columns": stats,
+        "missing_blocks": _merge_blocks(blocks, columns),
+        "correlation": {"columns": columns, "values": np.where(np.isnan(acc["correlation"]), None, acc["correlation"]).tolist()},
+    }
+
+def load_or_compute(table, target=TARGET, chunk_size=CHUNK_SIZE, sample_per_class=SAMPLE_PER_CLASS, seed=0,
+                    cache_dir=CACHE_DIR, refresh=False) -> dict:
+    """Report stats for the table, from the cache when the table fingerprint and settings are unchanged."""
+    # chunk_size is part of the key: the reservoir sample depends on how rows are split into chunks
+    settings = f"{target}:{chunk_size}:{sample_per_class}:{seed}:{BINS}:{MISSING_BLOCKS}"
+    key = f"{table}-{table_fingerprint(table)}-{hashlib.sha256(settings.encode()).hexdigest()[:8]}"
+    path = os.path.join(cache_dir, f"{key}.json")
+    if not refresh and os.path.exists(path):
+        with open(path, "r") as f:
+            print(f"Using cached stats {path}.")
+            return json.load(f)
+
+    start = time.perf_counter()
+    stats = summarize(*collect(table, target, chunk_size, sample_per_class, seed))
+    stats.update(table=table, target=target, chunk_size=chunk_size, fingerprint=key,
+                 seconds=time.perf_counter() - start)
+    print(f"Computed stats for {stats['rows']:,} rows in {stats['seconds']:.1f}s.")
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(stats, f)
+    return stats
+
+# == Figures (rendered in worker processes) ==
+
+def _figure(width=5, height=4):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt, *plt.subplots(figsize=(width, height))
+
+def render_figure(task) -> str:
+    kind, name, payload, path = task
+    plt, fig, ax = _figure(*((12, 10) if kind == "correlation" else (12, 6) if kind == "missing" else (5, 4)))
+    if kind == "histogram":
+        edges = np.asarray(payload["edges"])
+        ax.bar(edges[:-1], payload["counts"], width=np.diff(edges), align="edge", color="skyblue", edgecolor="black")
+        ax.set_title(f"Distribution of {name}")
+        ax.set_xlabel(name)
+        ax.set_ylabel("Frequency (estimated)")
+        ax.grid(True, linestyle="--", alpha=0.5)
+    elif kind == "box":
+        ax.bxp([payload], showfliers=True)
+        ax.set_xticks([])
+        ax.set_title(f"Boxplot of {name}")
+    elif kind == "box_by_target":
+        ax.bxp(payload, showfliers=True)
+        ax.set_title(name)
+        ax.grid(True, linestyle="--", alpha=0.5)
+    elif kind == "count":
+        ax.bar(list(payload), list(payload.values()), color="C0")
+        ax.set_title(f"Countplot of {name}")
+    elif kind == "missing":
+        share = np.asarray(payload["share"], dtype=np.float64)
+        image = ax.imshow(share, aspect="auto", cmap="viridis", vmin=0, vmax=1, interpolation="nearest")
+        ax.set_xticks(range(len(payload["columns"])))
+        ax.set_xticklabels(payload["columns"], rotation=90)
+        ax.set_ylabel("Row block (table order)")
+        fig.colorbar(image, ax=ax, label="Share missing")
+        ax.set_title("Missing values by row block")
+    elif kind == "correlation":
+        values = np.array(payload["values"], dtype=np.float64)
+        image = ax.imshow(values, cmap="coolwarm", vmin=-1, vmax=1)
+        ticks = range(len(payload["columns"]))
+        ax.set_xticks(ticks)
+        ax.set_xticklabels(payload["columns"], rotation=90)
+        ax.set_yticks(ticks)
+        ax.set_yticklabels(payload["columns"])
+        for i in ticks:
+            for j in ticks:
+                if not np.isnan(values[i, j]):
+                    ax.text(j, i, f"{values[i, j]:.2f}", ha="center", va="center", fontsize=7)
+        fig.colorbar(image, ax=ax, shrink=0.75)
+        ax.set_title("Correlation Matrix")
+    fig.tight_layout()
+    fig.savefig(path, dpi=90)
+    plt.close(fig)
+    return path
+
+def figure_tasks(stats: dict, figure_dir: str) -> dict:
+    """Figure tasks by report section."""
+    def path(kind, name):
+        return os.path.join(figure_dir, f"{kind}_{name}.png".replace("/", "_"))
+
+    target = stats["target"]
+    columns = stats["columns"]
+    continuous = [c for c, s in columns.items() if s["kind"] == "continuous" and "histogram" in s]
+    binary = [c for c, s in columns.items() if s["kind"] == "binary"]
+    missing_columns = [c for c, s in columns.items() if s["missing"]]
+    share = np.asarray(stats["missing_blocks"]["share"], dtype=np.float64)
+    index = [list(columns).index(c) for c in missing_columns]
+    corr_columns = [c for c in stats["correlation"]["columns"] if not c.endswith("_missing_flag")]
+    corr_index = [stats["correlation"]["columns"].index(c) for c in corr_columns]
+    corr = np.array(stats["correlation"]["values"], dtype=np.float64)[np.ix_(corr_index, corr_index)]
+
+    sections = {
+        "Distributions": [("histogram", c, columns[c]["histogram"], path("histogram", c)) for c in continuous],
+        "Outliers": [("box", c, columns[c]["box"], path("box", c)) for c in continuous]
+        + [("count", c, columns[c]["value_counts"], path("count", c)) for c in binary],
+        f"By {target}": [
+            ("box_by_target", f"{c} by {target}", columns[c]["box_by_target"], path("by_target", c)) for c in continuous
+        ],
+        "Missing values": [("missing", "missing", {"share": share[:, index].tolist(), "columns": missing_columns},
+                            path("missing", "blocks"))] if missing_columns else [],
+        "Correlation": [("correlation", "correlation", {"values": corr.tolist(), "columns": corr_columns},
+                         path("correlation", "matrix"))],
+    }
+    return sections
+
+def render_figures(sections: dict, workers: int = 0):
+    tasks = [task for section in sections.values() for task in section]
+    try:
+        workers = workers or len(os.sched_getaffinity(0))
+    except AttributeError:
+        workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [render_figure(task) for task in tasks]
+    context = get_context("fork") if hasattr(os, "fork") else get_context("spawn")
+    with context.Pool(min(workers, len(tasks))) as pool:
+        return pool.map(render_figure, tasks)
+
+# == HTML ==
+
+def _fmt(value) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, float):
+        return f"{value:,.4g}"
+    return f"{value:,}" if isinstance(value, int) else html.escape(str(value))
+
+def _table(header, rows) -> str:
+    head = "".join(f"<th>{html.escape(h)}</th>" for h in header)
+    body = "".join("<tr>" + "".join(f"<td>{_fmt(v)}</td>" for v in row) + "</tr>" for row in rows)
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+def _image(path: str) -> str:
+    with open(path, "rb") as f:
+        data = base64.b64encode(f.read()).decode()
+    return f'<img src="data:image/png;base64,{data}" alt="{html.escape(os.path.basename(path))}"/>'
+
+def write_html(stats: dict, sections: dict, path: str):
+    columns = stats["columns"]
+    summary = [
+        [c, s["count"], s["missing_pct"], s["mean"], s["std"], s["min"], s.get("quantiles", {}).get("0.25"),
+         s.get("quantiles", {}).get("0.5"), s.get("quantiles", {}).get("0.75"), s["max"], s["skew"],
+         s.get("box", {}).get("outlier_pct")]
+        for c, s in columns.items()
+    ]
+    missing = [[c, s["missing"], s["missing_pct"], s["target_rate_missing"], s["target_rate_present"]]
+               for c, s in columns.items() if s["missing"]]
+    rate = stats["positives"] / stats["rows"] if stats["rows"] else float("nan")
+
+    parts = [
+        f"<h1>EDA report: {html.escape(stats['table'])}</h1>",
+        f"<p>{stats['rows']:,} rows. Target <code>{html.escape(stats['target'])}</code>: {stats['positives']:,} positives "
+        f"({rate:.2%}). Counts, moments, missingness and correlations are exact; histograms, quantiles and box plots "
+        f"use a stratified sample of {', '.join(f'{n:,} (class {c})' for c, n in stats['sample_rows'].items())} rows, "
+        f"reweighted to the class sizes. Stats fingerprint <code>{html.escape(stats['fingerprint'])}</code>.</p>",
+        "<h2>Summary</h2>",
+        _table(["column", "count", "missing %", "mean", "std", "min", "25%", "50%", "75%", "max", "skew", "outliers %"],
+               summary),
+    ]
+    if missing:
+        parts += ["<h2>Missingness and target rate</h2>",
+                  _table(["column", "missing", "missing %", "target rate (missing)", "target rate (present)"], missing)]
+    for title, tasks in sections.items():
+        if tasks:
+            parts += [f"<h2>{html.escape(title)}</h2>", '<div class="grid">']
+            parts += [_image(task[3]) for task in tasks]
+            parts.append("</div>")
+
+    style = ("body{font-family:sans-serif;margin:2em;} table{border-collapse:collapse;font-size:13px;} "
+             "td,th{border:1px solid #ccc;padding:3px 8px;text-align:right;} td:first-child{text-align:left;} "
+             ".grid{display:flex;flex-wrap:wrap;gap:8px;} .grid img{max-width:100%;}")
+    with open(path, "w") as f:
+        f.write(f'<!DOCTYPE html>\n<html lang="en">\n<head><meta charset="utf-8"/><title>EDA report: '
+                f'{html.escape(stats["table"])}</title><style>{style}</style></head>\n<body>\n'
+                + "\n".join(parts) + "\n</body>\n</html>\n")
+
+def build_report(table, output_dir=REPORT_DIR, workers=0, **kwargs) -> str:
+    stats = load_or_compute(table, **kwargs)
+    figure_dir = os.path.join(output_dir, f"{table}_figures")
+    os.makedirs(figure_dir, exist_ok=True)
+    sections = figure_tasks(stats, figure_dir)
+    start = time.perf_counter()
+    figures = render_figures(sections, workers)
+    print(f"Rendered {len(figures)} figures in {time.perf_counter() - start:.1f}s.")
+    path = os.path.join(output_dir, f"{table}_report.html")
+    write_html(stats, sections, path)
+    print(f"✅ EDA report written to {path}")
+    return path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table", default="credit_risk_cleaned")
+    parser.add_argument("--target", default=TARGET)
+    parser.add_argument("--output-dir", default=REPORT_DIR)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--sample-per-class", type=int, default=SAMPLE_PER_CLASS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=0, help="figure rendering processes (default: available cores)")
+    parser.add_argument("--refresh", action="store_true", help="recompute stats even if cached")
+    args = parser.parse_args()
+
+    build_report(args.table, args.output_dir, args.workers, target=args.target, chunk_size=args.chunk_size,
+                 sample_per_class=args.sample_per_class, seed=args.seed, refresh=args.refresh)
@@ -0,0 +1,142 @@
+"""
+Vectorized outlier and correlation statistics for the EDA scripts.
+
+iqr_outlier_summary takes the quartiles of every column in one nanquantile
+call and counts the rows outside the 1.5 IQR fences by broadcasting the
+bounds over the matrix, instead of two quantile calls and a filtered copy of
+the DataFrame per column.
+
+Correlations are accumulated chunk by chunk from cross products
+(PairwiseCorrelation), so they can be computed over a table streamed with
+storage.iter_table as well as over an in-memory DataFrame. They match
+DataFrame.corr(): Pearson over the pairwise-complete rows of each pair.
+detect_multicollinearity then selects the pairs above the threshold with an
+upper-triangle mask instead of a double loop over the columns.
+
+The prints and return values are those of the original functions in
+eda_outliers and eda_target_analysis, which now use this module.
+"""
+import warnings
+import numpy as np
+import pandas as pd
+from storage import CHUNK_SIZE, iter_table
+
+def _numeric(df: pd.DataFrame, columns=None) -> tuple:
+    columns = list(columns) if columns is not None else list(df.select_dtypes(include="number").columns)
+    return columns, df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+
+def outlier_counts(X: np.ndarray) -> tuple:
+    """Quartiles, IQR fences and the number of rows outside them, per column."""
+    with warnings.catch_warnings():
+        # All-missing columns get NaN quartiles (and no outliers), as with Series.quantile
+        warnings.simplefilter("ignore", RuntimeWarning)
+        q1, q3 = np.nanquantile(X, [0.25, 0.75], axis=0)
+    iqr = q3 - q1
+    lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    # NaNs compare False on both sides, so missing values are not counted, as in the per-column filter
+    counts = np.count_nonzero((X < lower) | (X > upper), axis=0)
+    return q1, q3, lower, upper, counts
+
+def iqr_outlier_summary(df):
+    columns, X = _numeric(df)
+    if not len(columns):
+        return
+    counts = outlier_counts(X)[4]
+    for col, count in zip(columns, counts):
+        pct = count / len(df) * 100
+        print(f"{col}: {count} outliers ({pct:.2f}%)")
+
+class PairwiseCorrelation:
+    """
+    Pearson correlations over pairwise-complete rows (as DataFrame.corr()),
+    accumulated from per-chunk cross products. Values are shifted by the
+    first chunk's means to limit cancellation on heavy-tailed columns.
+    """
+
+    def __init__(self, n_columns: int):
+        shape = (n_columns, n_columns)
+        self.shift = None
+        self.n, self.sx, self.sxx, self.sxy = (np.zeros(shape) for _ in range(4))
+
+    def add(self, X: np.ndarray):
+        if self.shift is None:
+            with warnings.catch_warnings():
+                # An all-missing column has no mean; it is shifted by 0
+                warnings.simplefilter("ignore", RuntimeWarning)
+                self.shift = np.nan_to_num(np.nanmean(X, axis=0))
+        present = ~np.isnan(X)
+        M = present.astype(np.float64)
+        Z = np.where(present, X - self.shift, 0.0)
+        self.n += M.T @ M
+        self.sx += Z.T @ M
+        self.sxx += (Z * Z).T @ M
+        self.sxy += Z.T @ Z
+
+    def result(self) -> np.ndarray:
+        with np.errstate(all="ignore"):
+            cov = self.n * self.sxy - self.sx * self.sx.T
+            var = self.n * self.sxx - self.sx ** 2
+            corr = np.clip(cov / np.sqrt(var * var.T), -1.0, 1.0)
+        # As DataFrame.corr(): a column correlates 1 with itself unless it is constant or empty
+        diagonal = np.diagonal(corr)
+        np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+        return corr
+
+def correlation_matrix(data, columns=None, chunk_size=CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Correlation matrix of a DataFrame, or of an iterable of DataFrame chunks
+    (e.g. storage.iter_table), over `columns` (default: the numeric columns of
+    the first chunk).
+    """
+    if isinstance(data, pd.DataFrame):
+        df = data
+        data = (df.iloc[start:start + chunk_size] for start in range(0, max(len(df), 1), chunk_size))
+    accumulator = None
+    for chunk in data:
+        if accumulator is None:
+            columns = _numeric(chunk.iloc[:0], columns)[0]
+            accumulator = PairwiseCorrelation(len(columns))
+        accumulator.add(_numeric(chunk, columns)[1])
+    if accumulator is None:
+        raise ValueError("No data to correlate")
+    return pd.DataFrame(accumulator.result(), index=columns, columns=columns)
+
+def table_correlation(table, columns=None, backend=None, chunk_size=CHUNK_SIZE) -> pd.DataFrame:
+    """Correlation matrix of a stored table, streamed in chunks so it need not fit in memory."""
+    return correlation_matrix(iter_table(table, columns, backend=backend, chunk_size=chunk_size), columns)
+
+def high_correlation_pairs(corr: pd.DataFrame, threshold=0.8) -> list:
+    """(feature_i, feature_j, |corr|) for the pairs above the threshold, in the column order of `corr`."""
+    values = np.abs(corr.to_numpy())
+    rows, cols = np.triu_indices(len(values), k=1)
+    above = values[rows, cols] > threshold
+    names = corr.columns
+    return [(names[i], names[j], values[i, j]) for i, j in zip(rows[above], cols[above])]
+
+def _correlation_columns(columns) -> list:
+    return [col for col in columns if not col.endswith('_missing_flag')]
+
+def detect_multicollinearity(df, threshold=0.8):
+    """
+    Prints and returns the feature pairs with |corr| > threshold. `df` may also
+    be an iterable of DataFrame chunks, e.g. iter_table("credit_risk_cleaned").
+    """
+    if isinstance(df, pd.DataFrame):
+        corr = correlation_matrix(df, _correlation_columns(df.select_dtypes(include='number').columns))
+    else:
+        chunks = iter(df)
+        first = next(chunks)
+        columns = _correlation_columns(first.select_dtypes(include='number').columns)
+        corr = correlation_matrix(_chain(first, chunks), columns)
+    high_corr = high_correlation_pairs(corr, threshold)
+    if high_corr:
+        print(f"Features with |corr| > {threshold}:")
+        for fi, fj, val in high_corr:
+            print(f"  {fi} ↔ {fj}: {val:.2f}")
+    else:
+        print(f"No feature pairs with |corr| > {threshold}.")
+    return high_corr
+
+def _chain(first, rest):
+    yield first
+    yield from rest
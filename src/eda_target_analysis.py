@@ -3,6 +3,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from eda_baseline import load_cleaned_data
+from eda_stats import detect_multicollinearity
 
 def plot_numeric_distributions(df):
     numeric_cols = [
@@ -70,25 +71,6 @@ def plot_correlation_matrix(df):
     plt.title('Correlation Matrix')
     plt.show()
 
-def detect_multicollinearity(df, threshold=0.8):
-    numeric_cols = [
-        col for col in df.select_dtypes(include='number').columns
-        if not col.endswith('_missing_flag')
-    ]
-    corr = df[numeric_cols].corr().abs()
-    high_corr = []
-    for i, fi in enumerate(numeric_cols):
-        for fj in numeric_cols[i+1:]:
-            if corr.at[fi, fj] > threshold:
-                high_corr.append((fi, fj, corr.at[fi, fj]))
-    if high_corr:
-        print(f"Features with |corr| > {threshold}:")
-        for fi, fj, val in high_corr:
-            print(f"  {fi} ↔ {fj}: {val:.2f}")
-    else:
-        print(f"No feature pairs with |corr| > {threshold}.")
-    return high_corr
-
 if __name__ == "__main__":
     df = load_cleaned_data()
     plot_numeric_distributions(df)
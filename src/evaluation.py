@@ -0,0 +1,303 @@
+"""
+Threshold sweep and evaluation of the final model on the hold-out set.
+
+The hold-out split is the one used in the notebooks (20%, stratified,
+random_state=42 over credit_risk_engineered). It is scored once and the
+scores are saved, so later runs re-tune the threshold without the model.
+
+Every candidate threshold (each distinct score) is evaluated in one pass:
+scores are sorted once, and cumulative sums of positives and negatives give
+the confusion matrix at every threshold. ROC, PR, F1 and cost-weighted
+profit follow from those counts in O(n log n) overall, instead of one
+confusion matrix per threshold.
+
+Bootstrap confidence intervals reuse the sorted order: a resample is a
+vector of per-row counts, so each resample is an O(n) weighted cumulative
+sum. Resamples are spread over a process pool and seeded per task, so the
+intervals do not depend on the number of workers.
+
+Run from the repository root:
+    python src/evaluation.py --bootstrap 1000
+    python src/evaluation.py --objective profit --update-metadata
+"""
+import argparse
+import json
+import os
+import time
+from collections import namedtuple
+from multiprocessing import get_context
+import numpy as np
+from storage import load_table
+
+MODEL_PATH = "models/final/xgb_final_model.joblib"
+METADATA_PATH = "models/final/xgb_final_metadata.json"
+SCORES_PATH = "reports/evaluation/holdout_scores.npz"
+REPORT_PATH = "reports/evaluation/threshold_sweep.json"
+TARGET = "SeriousDlqin2yrs"
+
+# Hold-out split used by the model notebooks
+TEST_SIZE = 0.2
+SPLIT_SEED = 42
+
+# Value of each outcome per applicant, in units of the margin earned on a good loan.
+# A missed default (approved defaulter) costs five good loans; a rejected good
+# applicant forgoes one. Rejected defaulters neither earn nor lose.
+DEFAULT_PAYOFFS = {"tp": 0.0, "fp": -1.0, "fn": -5.0, "tn": 1.0}
+
+# Resamples per pool task; fixed so results do not depend on the worker count
+BOOTSTRAP_TASK_SIZE = 25
+
+SortedScores = namedtuple("SortedScores", ["positive", "score", "ends"])
+
+def sort_scores(y_true, y_score) -> SortedScores:
+    """
+    Sorts by descending score once. `ends` holds the last position of each
+    distinct score, i.e. the rows predicted positive at that threshold.
+    """
+    y_score = np.asarray(y_score, dtype=np.float64)
+    order = np.argsort(-y_score, kind="stable")
+    score = y_score[order]
+    positive = np.asarray(y_true)[order].astype(bool)
+    ends = np.append(np.flatnonzero(np.diff(score)), len(score) - 1)
+    return SortedScores(positive, score, ends)
+
+def _trapezoid(y, x) -> float:
+    return float(np.sum(np.diff(x) * (y[1:] + y[:-1]) / 2))
+
+def sweep(sorted_scores: SortedScores, weights=None, payoffs=DEFAULT_PAYOFFS) -> dict:
+    """
+    Confusion counts and metrics at every threshold, from one cumulative sum.
+    Row 0 is the threshold above every score (nothing predicted positive);
+    row i > 0 predicts positive for scores >= thresholds[i]. `weights` are
+    per-row counts in sorted order (bootstrap resamples).
+    """
+    positive = sorted_scores.positive
+    w = np.ones(len(positive)) if weights is None else np.asarray(weights, dtype=np.float64)
+    tp = np.concatenate(([0.0], np.cumsum(np.where(positive, w, 0.0))[sorted_scores.ends]))
+    fp = np.concatenate(([0.0], np.cumsum(w)[sorted_scores.ends])) - tp
+    n_pos, n_neg = tp[-1], fp[-1]
+    fn, tn = n_pos - tp, n_neg - fp
+
+    predicted = tp + fp
+    # Precision is 1 where nothing is predicted positive, as in sklearn's curve endpoint
+    precision = np.divide(tp, predicted, out=np.ones_like(tp), where=predicted > 0)
+    recall = tp / n_pos if n_pos > 0 else np.zeros_like(tp)
+    fpr = fp / n_neg if n_neg > 0 else np.zeros_like(fp)
+    denominator = precision + recall
+    f1 = np.divide(2 * precision * recall, denominator, out=np.zeros_like(tp), where=denominator > 0)
+    profit = payoffs["tp"] * tp + payoffs["fp"] * fp + payoffs["fn"] * fn + payoffs["tn"] * tn
+
+    return {
+        "thresholds": np.concatenate(([np.inf], sorted_scores.score[sorted_scores.ends])),
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "precision": precision, "recall": recall, "fpr": fpr, "f1": f1,
+        "profit_per_applicant": profit / (n_pos + n_neg),
+    }
+
+def threshold_index(curves: dict, threshold: float) -> int:
+    """Row of the sweep that predicts positive for scores >= threshold."""
+    # thresholds[1:] are descending; count those >= threshold
+    return int(np.searchsorted(-curves["thresholds"][1:], -threshold, side="right"))
+
+def metrics_at(curves: dict, index: int) -> dict:
+    return {
+        "threshold": float(curves["thresholds"][index]),
+        **{k: float(curves[k][index]) for k in ("precision", "recall", "fpr", "f1", "profit_per_applicant")},
+        "confusion_matrix": [[int(curves["tn"][index]), int(curves["fp"][index])],
+                             [int(curves["fn"][index]), int(curves["tp"][index])]],
+    }
+
+def summarize(curves: dict, threshold: float) -> dict:
+    """Threshold-free metrics plus the operating points at `threshold`, best F1 and best profit."""
+    recall, precision = curves["recall"], curves["precision"]
+    return {
+        "roc_auc": _trapezoid(curves["recall"], curves["fpr"]),
+        # Trapezoidal area under the PR curve, as the notebooks compute pr_auc (auc(recall, precision))
+        "pr_auc": _trapezoid(precision, recall),
+        "average_precision": float(np.sum(np.diff(recall) * precision[1:])),
+        "at_threshold": metrics_at(curves, threshold_index(curves, threshold)),
+        "best_f1": metrics_at(curves, int(np.argmax(curves["f1"]))),
+        "best_profit": metrics_at(curves, int(np.argmax(curves["profit_per_applicant"]))),
+    }
+
+def _statistics(curves: dict, threshold: float) -> list:
+    at = threshold_index(curves, threshold)
+    best_f1 = int(np.argmax(curves["f1"]))
+    best_profit = int(np.argmax(curves["profit_per_applicant"]))
+    return [
+        _trapezoid(curves["recall"], curves["fpr"]),
+        _trapezoid(curves["precision"], curves["recall"]),
+        curves["precision"][at],
+        curves["recall"][at],
+        curves["f1"][at],
+        curves["profit_per_applicant"][at],
+        curves["f1"][best_f1],
+        curves["thresholds"][best_f1],
+        curves["thresholds"][best_profit],
+    ]
+
+BOOTSTRAP_STATISTICS = (
+    "roc_auc", "pr_auc", "precision", "recall", "f1", "profit_per_applicant",
+    "best_f1", "best_f1_threshold", "best_profit_threshold",
+)
+
+# == Bootstrap workers ==
+
+_worker = {}
+
+def init_bootstrap_worker(sorted_scores, threshold, payoffs):
+    _worker.update(sorted_scores=sorted_scores, threshold=threshold, payoffs=payoffs)
+
+def bootstrap_task(task):
+    seed, resamples = task
+    rng = np.random.default_rng(seed)
+    sorted_scores = _worker["sorted_scores"]
+    n = len(sorted_scores.positive)
+    rows = []
+    for _ in range(resamples):
+        # Row counts of a resample with replacement; applied to the pre-sorted rows
+        weights = np.bincount(rng.integers(0, n, n), minlength=n)
+        curves = sweep(sorted_scores, weights, _worker["payoffs"])
+        rows.append(_statistics(curves, _worker["threshold"]))
+    return rows
+
+def bootstrap(sorted_scores: SortedScores, threshold: float, resamples: int = 1000, confidence: float = 0.95,
+              workers: int = 0, seed: int = 0, payoffs=DEFAULT_PAYOFFS) -> dict:
+    """Percentile bootstrap confidence intervals for BOOTSTRAP_STATISTICS."""
+    sizes = [BOOTSTRAP_TASK_SIZE] * (resamples // BOOTSTRAP_TASK_SIZE)
+    if resamples % BOOTSTRAP_TASK_SIZE:
+        sizes.append(resamples % BOOTSTRAP_TASK_SIZE)
+    tasks = list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+
+    initargs = (sorted_scores, threshold, payoffs)
+    if workers == 1:
+        init_bootstrap_worker(*initargs)
+        results = [bootstrap_task(task) for task in tasks]
+    else:
+        try:
+            workers = workers or len(os.sched_getaffinity(0))
+        except AttributeError:
+            workers = workers or os.cpu_count() or 1
+        # Fork shares the sorted arrays with the workers instead of pickling them per task
+        context = get_context("fork") if hasattr(os, "fork") else get_context("spawn")
+        with context.Pool(min(workers, len(tasks)), initializer=init_bootstrap_worker, initargs=initargs) as pool:
+            results = pool.map(bootstrap_task, tasks)
+
+    samples = np.array([row for rows in results for row in rows], dtype=np.float64)
+    lower, upper = np.percentile(samples, [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100], axis=0)
+    return {
+        name: {"lower": float(lo), "upper": float(hi), "std": float(std)}
+        for name, lo, hi, std in zip(BOOTSTRAP_STATISTICS, lower, upper, samples.std(axis=0))
+    }
+
+# == Hold-out scoring ==
+
+def score_holdout(model_path=MODEL_PATH, metadata_path=METADATA_PATH, scores_path=SCORES_PATH, rescore=False):
+    """
+    Hold-out labels and scores. Saved scores are reused while the model file
+    is unchanged; otherwise the hold-out set is loaded and scored once.
+    """
+    model_mtime = os.path.getmtime(model_path)
+    if not rescore and os.path.exists(scores_path):
+        saved = np.load(scores_path)
+        if str(saved["model_path"]) == model_path and float(saved["model_mtime"]) == model_mtime:
+            print(f"Reusing hold-out scores from {scores_path}.")
+            return saved["y_true"], saved["y_score"]
+
+    import joblib
+    from sklearn.model_selection import train_test_split
+
+    with open(metadata_path, "r") as f:
+        feature_list = json.load(f)["features"]
+    df = load_table("credit_risk_engineered", columns=feature_list + [TARGET])
+    _, X_test, _, y_test = train_test_split(
+        df[feature_list], df[TARGET], test_size=TEST_SIZE, stratify=df[TARGET], random_state=SPLIT_SEED
+    )
+    start = time.perf_counter()
+    y_score = joblib.load(model_path).predict_proba(X_test)[:, 1]
+    y_true = y_test.to_numpy()
+    print(f"Scored {len(y_true):,} hold-out rows in {time.perf_counter() - start:.2f}s.")
+
+    os.makedirs(os.path.dirname(scores_path), exist_ok=True)
+    np.savez(scores_path, y_true=y_true, y_score=y_score, model_path=model_path, model_mtime=model_mtime)
+    return y_true, y_score
+
+def update_metadata(metadata_path: str, summary: dict, objective: str):
+    """Writes the tuned threshold and the metrics at it into the model metadata."""
+    point = summary[f"best_{objective}"]
+    with open(metadata_path, "r") as f:
+        metadata = json.load(f)
+    metadata.update({
+        "threshold": round(point["threshold"], 4),
+        "roc_auc": round(summary["roc_auc"], 4),
+        "pr_auc": round(summary["pr_auc"], 4),
+        "f1": round(point["f1"], 4),
+    })
+    with open(metadata_path, "w") as f:
+        json.dump(metadata, f, indent=2)
+    print(f"✅ Updated {metadata_path} with threshold {metadata['threshold']} (best {objective}).")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--metadata", default=METADATA_PATH)
+    parser.add_argument("--scores", default=SCORES_PATH, help="saved hold-out scores (reused while the model is unchanged)")
+    parser.add_argument("--rescore", action="store_true", help="score the hold-out set even if saved scores exist")
+    parser.add_argument("--output", default=REPORT_PATH)
+    parser.add_argument("--threshold", type=float, default=None, help="operating threshold (default: from metadata)")
+    for outcome, value in DEFAULT_PAYOFFS.items():
+        parser.add_argument(f"--{outcome}-value", type=float, default=value, help=f"value per {outcome.upper()} applicant")
+    parser.add_argument("--bootstrap", type=int, default=1000, help="bootstrap resamples (0 to skip)")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--workers", type=int, default=0, help="bootstrap processes (default: available cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--objective", choices=("f1", "profit"), default="f1", help="threshold written by --update-metadata")
+    parser.add_argument("--update-metadata", action="store_true")
+    args = parser.parse_args(argv)
+
+    payoffs = {outcome: getattr(args, f"{outcome}_value") for outcome in DEFAULT_PAYOFFS}
+    with open(args.metadata, "r") as f:
+        threshold = json.load(f).get("threshold", 0.5) if args.threshold is None else args.threshold
+
+    y_true, y_score = score_holdout(args.model, args.metadata, args.scores, args.rescore)
+
+    start = time.perf_counter()
+    sorted_scores = sort_scores(y_true, y_score)
+    curves = sweep(sorted_scores, payoffs=payoffs)
+    summary = summarize(curves, threshold)
+    sweep_seconds = time.perf_counter() - start
+    print(f"Swept {len(curves['thresholds']) - 1:,} thresholds over {len(y_true):,} rows in {sweep_seconds:.3f}s.")
+
+    report = {"rows": int(len(y_true)), "payoffs": payoffs, "sweep_seconds": sweep_seconds, **summary}
+    if args.bootstrap > 0:
+        start = time.perf_counter()
+        report["bootstrap"] = {
+            "resamples": args.bootstrap,
+            "confidence": args.confidence,
+            "intervals": bootstrap(sorted_scores, threshold, args.bootstrap, args.confidence,
+                                   args.workers, args.seed, payoffs),
+        }
+        report["bootstrap"]["seconds"] = time.perf_counter() - start
+        print(f"Bootstrapped {args.bootstrap} resamples in {report['bootstrap']['seconds']:.2f}s.")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    at, best_f1, best_profit = summary["at_threshold"], summary["best_f1"], summary["best_profit"]
+    print(f"ROC-AUC: {summary['roc_auc']:.4f}  PR-AUC: {summary['pr_auc']:.4f}")
+    print(f"At threshold {threshold:.4f}: F1 {at['f1']:.4f}, precision {at['precision']:.4f}, "
+          f"recall {at['recall']:.4f}, profit/applicant {at['profit_per_applicant']:.4f}")
+    print(f"Best F1 {best_f1['f1']:.4f} at threshold {best_f1['threshold']:.4f}")
+    print(f"Best profit/applicant {best_profit['profit_per_applicant']:.4f} at threshold {best_profit['threshold']:.4f}")
+    if args.bootstrap > 0:
+        for name, ci in report["bootstrap"]["intervals"].items():
+            print(f"  {name:<24} [{ci['lower']:.4f}, {ci['upper']:.4f}]")
+    print(f"✅ Report written to {args.output}")
+
+    if args.update_metadata:
+        update_metadata(args.metadata, summary, args.objective)
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import numpy as np
 import pandas as pd
-import sqlite3
+from data_cleaning import invalidate_incremental_state
 from eda_baseline import load_cleaned_data
+from feature_registry import FEATURES, LOG_FEATURES, compile_features
+from storage import save_table
 
 def log_transform(df):
     skewed_features = [
@@ -67,15 +69,12 @@ def add_interaction_features(df):
     df['CreditLines_x_Delinquencies'] = df['NumberOfOpenCreditLinesAndLoans'] * df['TotalDelinquencies']
     return df
 
-def minimal_preprocess(df):
-    # For baseline
-    df = aggregate_delinquencies(df)
-    df = log_transform(df)
-    df = encode_categorical_features(df)
-    return df
-
-def full_preprocess(df):
-    # For advanced models
+def reference_preprocess(df):
+    """
+    The hand-written chain the feature registry was derived from. The
+    pipeline no longer runs it; it is kept as the reference that parity
+    checks compare the registry against. Adds columns to df in place.
+    """
     df = aggregate_delinquencies(df)
     df = log_transform(df)
     df = bin_age(df)
@@ -86,11 +85,41 @@ def full_preprocess(df):
     df = add_interaction_features(df)
     return df
 
+# Columns each table adds to the cleaned columns, in table order; all are defined in the feature registry
+ENGINEERED_FEATURES = [feature.name for feature in FEATURES]
+BASELINE_FEATURES = ["TotalDelinquencies", *[f"{name}_log" for name in LOG_FEATURES]]
+
+def engineer(df, features):
+    """df's columns followed by `features`, computed from the feature registry. df is not modified."""
+    columns = list(df.columns) + [name for name in features if name not in df.columns]
+    return compile_features(columns, df.columns).transform_frame(df)
+
+def minimal_preprocess(df):
+    # For baseline
+    return engineer(df, BASELINE_FEATURES)
+
+def full_preprocess(df):
+    # For advanced models
+    return engineer(df, ENGINEERED_FEATURES)
+
+# == Fused feature engine ==
+
+def fused_preprocess(df, feature_list):
+    """
+    Computes only the columns in feature_list, with the same values as
+    full_preprocess() and reference_preprocess(), in one pass that stores each feature as its own
+    column as soon as it is computed. Transforms are compiled from the
+    shared feature registry, so intermediate columns are computed once, only
+    if a requested feature depends on them, and released after their last
+    use. Columns of df (e.g. the target or missing flags) can be requested
+    as-is.
+    """
+    return compile_features(feature_list, df.columns).transform_frame(df)
+
 def save_engineered_data(df, full=True):
-    conn = sqlite3.connect("data/loanvet.db")
     table_name = "credit_risk_engineered" if full else "credit_risk_baseline"
-    df.to_sql(table_name, conn, if_exists='replace', index=False)
-    conn.close()
+    invalidate_incremental_state()
+    save_table(df, table_name)
     print(f"✅ Saved data to '{table_name}' table.")
 
 if __name__ == "__main__":
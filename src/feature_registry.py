@@ -0,0 +1,234 @@
+"""
+Single definition of every engineered feature, shared by the offline
+pipeline (feature_engineering.py) and the API (src/api/utils.py).
+
+Each Feature names its input columns and a vectorized kernel taking those
+inputs positionally. Kernels only use NumPy ufuncs and operators, so the
+same kernel runs on whole columns (batch and streaming) or on np.float64
+scalars (single records). Inputs use the cleaned-table column names; an
+input is either a column provided by the caller or another feature.
+
+Definitions follow the training pipeline, since that is what the models
+were fitted on.
+"""
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+Feature = namedtuple("Feature", ["name", "inputs", "kernel"])
+
+def per_count(value, count):
+    """
+    value / (count + 1), the training definition, with the baseline's guard:
+    0 where the denominator is not positive (a negative count), so no inf
+    or NaN is produced.
+    """
+    denominator = count + 1
+    invalid = denominator <= 0
+    return np.where(invalid, 0.0, value / np.where(invalid, 1.0, denominator))
+
+LOG_FEATURES = [
+    "RevolvingUtilizationOfUnsecuredLines",
+    "MonthlyIncome",
+    "DebtRatio",
+    "NumberOfTime30-59DaysPastDueNotWorse",
+    "NumberOfTimes90DaysLate",
+    "NumberOfTime60-89DaysPastDueNotWorse",
+    "TotalDelinquencies",
+]
+
+FEATURES = [
+    Feature(
+        "TotalDelinquencies",
+        ("NumberOfTime30-59DaysPastDueNotWorse", "NumberOfTimes90DaysLate", "NumberOfTime60-89DaysPastDueNotWorse"),
+        lambda late_30_59, late_90, late_60_89: late_30_59 + late_90 + late_60_89,
+    ),
+    *[Feature(f"{name}_log", (name,), np.log1p) for name in LOG_FEATURES],
+    Feature("HighUtilizationFlag", ("RevolvingUtilizationOfUnsecuredLines",), lambda util: (util > 0.9).astype(np.uint8)),
+    Feature(
+        "IncomePerCreditLine",
+        ("MonthlyIncome", "NumberOfOpenCreditLinesAndLoans"),
+        per_count,
+    ),
+    # Age bins [18, 30), [30, 50), [50, 100) as pd.cut(right=False); Young is the dropped dummy
+    Feature("AgeGroup_MidAge", ("age",), lambda age: (age >= 30) & (age < 50)),
+    Feature("AgeGroup_Senior", ("age",), lambda age: (age >= 50) & (age < 100)),
+    # Dependents bins (-1, 0], (0, 2], (2, 10] as pd.cut(right=True); None is the dropped dummy
+    Feature("DependentsGroup_Small", ("NumberOfDependents",), lambda dep: (dep > 0) & (dep <= 2)),
+    Feature("DependentsGroup_Large", ("NumberOfDependents",), lambda dep: (dep > 2) & (dep <= 10)),
+    Feature(
+        "Util_x_Late",
+        ("RevolvingUtilizationOfUnsecuredLines_log", "NumberOfTimes90DaysLate_log"),
+        lambda util_log, late_log: util_log * late_log,
+    ),
+    Feature(
+        "IncomePerDependent",
+        ("MonthlyIncome", "NumberOfDependents"),
+        per_count,
+    ),
+    Feature(
+        "CreditLines_x_Delinquencies",
+        ("NumberOfOpenCreditLinesAndLoans", "TotalDelinquencies"),
+        lambda lines, delinquencies: lines * delinquencies,
+    ),
+]
+
+REGISTRY = {feature.name: feature for feature in FEATURES}
+
+class FeatureTransform:
+    """
+    The features in feature_list compiled against a set of available input
+    columns: the base columns to read and the features to compute, in
+    dependency order. A requested name that is an available column is passed
+    through (and an available column is never recomputed, e.g. a precomputed
+    TotalDelinquencies).
+    """
+
+    def __init__(self, feature_list, available):
+        self.feature_list = list(feature_list)
+        self.available = frozenset(available)
+        self.inputs = []
+        self.steps = []
+
+        missing = []
+        visiting = set()
+
+        def resolve(name):
+            if name in self.inputs or any(step.name == name for step in self.steps):
+                return
+            if name in self.available:
+                self.inputs.append(name)
+                return
+            feature = REGISTRY.get(name)
+            if feature is None:
+                missing.append(name)
+                return
+            if name in visiting:
+                raise ValueError(f"Feature {name} depends on itself")
+            visiting.add(name)
+            for dependency in feature.inputs:
+                resolve(dependency)
+            self.steps.append(feature)
+
+        for name in self.feature_list:
+            resolve(name)
+        if missing:
+            raise ValueError(f"No feature definition or input column for: {sorted(set(missing))}")
+
+        # Requested input columns are passed through; the rest of feature_list is computed
+        self.passthrough = [name for name in self.feature_list if name in self.inputs]
+        self._outputs = frozenset(self.feature_list) - frozenset(self.inputs)
+        # Values are released after the step that consumes them last
+        last_use = {}
+        for i, feature in enumerate(self.steps):
+            for name in feature.inputs:
+                last_use[name] = i
+        self._consumed = frozenset(last_use)
+        self._release = [[name for name, last in last_use.items() if last == i] for i in range(len(self.steps))]
+
+    def _run(self, load, store):
+        """
+        Runs the steps, loading each input with load(name) on first use and
+        handing every computed feature in feature_list to store(name, value)
+        as soon as it is computed. A value is dropped once its last consumer
+        has run, so only the live intermediates are held at a time.
+        """
+        values = {}
+        for i, feature in enumerate(self.steps):
+            args = []
+            for name in feature.inputs:
+                if name not in values:
+                    values[name] = load(name)
+                args.append(values[name])
+            value = feature.kernel(*args)
+            if feature.name in self._outputs:
+                store(feature.name, value)
+            if feature.name in self._consumed:
+                values[feature.name] = value
+            for name in self._release[i]:
+                del values[name]
+
+    def transform_record(self, record: dict) -> dict:
+        """Scalar mode: one record of input values to a dict of feature values."""
+        values = {name: record[name] for name in self.passthrough}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._run(lambda name: np.float64(record[name]), values.__setitem__)
+        return {name: float(values[name]) for name in self.feature_list}
+
+    def transform_columns(self, columns, out: np.ndarray = None, dtype=np.float32) -> np.ndarray:
+        """
+        Batch mode: a mapping of input columns (a DataFrame or a dict of
+        arrays) to a (rows, len(feature_list)) matrix, computed in float64
+        and cast on write. Pass `out` to reuse a preallocated matrix.
+        """
+        n = len(columns[self.inputs[0]]) if self.inputs else 0
+        if out is None:
+            out = np.empty((n, len(self.feature_list)), dtype=dtype)
+        elif out.shape != (n, len(self.feature_list)):
+            raise ValueError(f"out must have shape {(n, len(self.feature_list))}")
+        positions = {name: j for j, name in enumerate(self.feature_list)}
+
+        def store(name, value):
+            out[:, positions[name]] = value
+
+        for name in self.passthrough:
+            store(name, np.asarray(columns[name], dtype=np.float64))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._run(lambda name: np.asarray(columns[name], dtype=np.float64), store)
+        return out
+
+    def transform_frame(self, df: pd.DataFrame, dtype=np.float64) -> pd.DataFrame:
+        """
+        Frame mode: each feature becomes its own column as soon as it is
+        computed, with no intermediate matrix. Numeric features are cast to
+        `dtype`; flags keep the kernel's bool or uint8 dtype, and requested
+        input columns are passed through unchanged.
+        """
+        out = {name: df[name] for name in self.passthrough}
+
+        def store(name, value):
+            out[name] = value if value.dtype.kind in "bu" else value.astype(dtype, copy=False)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._run(lambda name: df[name].to_numpy(dtype=np.float64, na_value=np.nan), store)
+        return pd.DataFrame({name: out[name] for name in self.feature_list}, index=df.index, copy=False)
+
+    def transform_stream(self, frames, dtype=np.float64):
+        """Streaming mode: transforms an iterable of DataFrame chunks lazily."""
+        for df in frames:
+            yield self.transform_frame(df, dtype=dtype)
+
+@lru_cache(maxsize=64)
+def _compile(feature_list: tuple, available: frozenset) -> FeatureTransform:
+    return FeatureTransform(feature_list, available)
+
+def compile_features(feature_list, available) -> FeatureTransform:
+    """Compiled (and cached) transform for feature_list given the available input columns."""
+    return _compile(tuple(feature_list), frozenset(available))
+
+def parity_report(transform: FeatureTransform, columns: pd.DataFrame, reference: pd.DataFrame = None,
+                  rtol: float = 0.0, atol: float = 0.0) -> dict:
+    """
+    Flags train/serve skew. Runs `columns` through the scalar and batch
+    modes of `transform` and, if given, compares with `reference` (e.g.
+    reference_preprocess() output or another implementation's features). Returns
+    {check: {feature: mismatching rows}} for every feature that differs;
+    an empty dict means every mode agrees.
+    """
+    batch = transform.transform_columns(columns, dtype=np.float64)
+    records = columns[transform.inputs].to_dict("records")
+    scalar = np.array([[r[name] for name in transform.feature_list] for r in map(transform.transform_record, records)],
+                      dtype=np.float64).reshape(batch.shape)
+
+    comparisons = {"scalar_vs_batch": scalar}
+    if reference is not None:
+        comparisons["reference_vs_batch"] = reference[transform.feature_list].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    report = {}
+    for check, other in comparisons.items():
+        mismatch = ~np.isclose(other, batch, rtol=rtol, atol=atol, equal_nan=True)
+        counts = {name: int(n) for name, n in zip(transform.feature_list, mismatch.sum(axis=0)) if n}
+        if counts:
+            report[check] = counts
+    return report
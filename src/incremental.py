@@ -0,0 +1,258 @@
+"""
+Incremental materialization of the cleaned and engineered tables.
+
+Each raw row is keyed by the raw table's first (unnamed index) column and
+tracked in `raw_row_state` with a hash of its contents. A run scans the raw
+table in chunks and sends only new or changed rows through cleaning and
+feature engineering. It upserts them into credit_risk_imputed,
+credit_risk_cleaned, credit_risk_engineered and credit_risk_baseline, using
+the raw key as the output rows' SQLite rowid, so output rows stay in raw
+order and the table schemas are unchanged.
+
+Imputation uses the medians frozen in a versioned stats file (see
+data_cleaning.save_cleaning_stats), never statistics of the increment, so
+incremental output matches a full run made with the same stats version.
+When there is no state yet, or the stats version changes, the tables are
+rebuilt from scratch. Full pipeline runs (data_cleaning, feature_engineering)
+rewrite the output tables with new rowids, so they drop the row state and the
+next incremental run rebuilds too.
+
+Duplicates follow drop_duplicates: of the rows with the same contents, the
+one with the lowest key is kept. When a kept row changes, the rows dropped
+as its duplicates are re-checked at the end of the run, and the first one
+left is materialized in its place.
+
+Rows deleted from the raw table are not removed from the outputs.
+
+Run from the repository root (SQLite storage):
+    python src/incremental.py
+"""
+import argparse
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from data_cleaning import (CHUNK_SIZE, DB_PATH, IMPUTE_COLUMNS, cap_outliers, create_missing_flags, custom_caps,
+                           impute_missing_values, load_cleaning_stats, mark_first_occurrences, save_cleaning_stats,
+                           streaming_medians)
+from feature_engineering import full_preprocess, minimal_preprocess
+
+RAW_TABLE = "credit_risk_raw"
+OUTPUT_TABLES = ("credit_risk_imputed", "credit_risk_cleaned", "credit_risk_engineered", "credit_risk_baseline")
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def ensure_state(conn):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS raw_row_state ("
+        "row_key INTEGER PRIMARY KEY, row_hash INTEGER NOT NULL, kept INTEGER NOT NULL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS raw_row_state_hash ON raw_row_state (row_hash) WHERE kept = 1")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS materialization_state ("
+        "source TEXT PRIMARY KEY, stats_version INTEGER, high_water_mark INTEGER, updated_at TEXT)"
+    )
+
+def row_hashes(content: pd.DataFrame) -> np.ndarray:
+    # Hash of the row's values (not the key), as int64 for SQLite; raw columns are all numeric
+    return pd.util.hash_pandas_object(content.astype("float64"), index=False).to_numpy().view(np.int64)
+
+def frozen_stats(conn, version=None):
+    """The requested (or latest) frozen stats; computed from the raw table and saved if none exist."""
+    stats = load_cleaning_stats(version)
+    if stats is None:
+        columns, _ = mark_first_occurrences(conn, RAW_TABLE)
+        medians = streaming_medians(conn, columns)
+        rows = conn.execute("SELECT COUNT(*) FROM first_rows").fetchone()[0]
+        stats = save_cleaning_stats(medians, rows)
+    return stats
+
+def reset_outputs(conn):
+    for table in OUTPUT_TABLES:
+        conn.execute(f"DROP TABLE IF EXISTS {quote(table)}")
+    conn.execute("DELETE FROM raw_row_state")
+    conn.execute("DELETE FROM materialization_state WHERE source = ?", (RAW_TABLE,))
+    conn.commit()
+
+def classify(conn, keys: np.ndarray, hashes: np.ndarray):
+    """
+    Splits a chunk into rows to (re)process and rows to drop as duplicates.
+    A row is skipped when its stored hash is unchanged; it is a duplicate
+    when a kept row with a lower key (earlier in this chunk or already
+    materialized) has the same contents, as drop_duplicates keeps the first
+    occurrence. A kept row with a higher key and the same contents is
+    demoted to a duplicate instead.
+
+    Returns the chunk positions to process and to drop, and the keys of
+    kept rows to demote.
+    """
+    conn.execute("DROP TABLE IF EXISTS temp.chunk_rows")
+    conn.execute("CREATE TEMP TABLE chunk_rows (row_key INTEGER PRIMARY KEY, row_hash INTEGER)")
+    conn.executemany("INSERT INTO chunk_rows VALUES (?, ?)", zip(keys.tolist(), hashes.tolist()))
+    stored = {k: (h, kept) for k, h, kept in conn.execute(
+        "SELECT c.row_key, s.row_hash, s.kept FROM chunk_rows c JOIN raw_row_state s ON s.row_key = c.row_key"
+    ).fetchall()}
+    taken = {h: k for k, h in conn.execute(
+        "SELECT s.row_key, s.row_hash FROM chunk_rows c JOIN raw_row_state s "
+        "ON s.row_hash = c.row_hash AND s.kept = 1"
+    ).fetchall()}
+
+    process, duplicate, demoted = [], [], []
+    for i, (key, h) in enumerate(zip(keys.tolist(), hashes.tolist())):
+        previous = stored.get(key)
+        if previous is not None and previous[0] == h:
+            continue
+        if previous is not None and taken.get(previous[0]) == key:
+            # The row no longer holds its old contents; promote_duplicates finds that group a new kept row
+            del taken[previous[0]]
+        owner = taken.get(h)
+        if owner is not None and owner < key:
+            duplicate.append(i)
+            continue
+        if owner is not None and owner != key:
+            demoted.append(owner)
+        taken[h] = key
+        process.append(i)
+    return process, duplicate, demoted
+
+def upsert(conn, table, df: pd.DataFrame, keys):
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+        df.head(0).to_sql(table, conn, index=False)
+    columns = ", ".join(["rowid"] + [quote(c) for c in df.columns])
+    placeholders = ", ".join("?" * (df.shape[1] + 1))
+    rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {quote(table)} ({columns}) VALUES ({placeholders})",
+        ((key, *row) for key, row in zip(keys, rows)),
+    )
+
+def delete_outputs(conn, keys):
+    for table in OUTPUT_TABLES:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+            conn.executemany(f"DELETE FROM {quote(table)} WHERE rowid = ?", ((k,) for k in keys))
+
+def transform(content: pd.DataFrame, medians: dict) -> dict:
+    """The full pipeline for a set of deduplicated raw rows, using frozen medians."""
+    df = create_missing_flags(content.copy())
+    for col in IMPUTE_COLUMNS:
+        # A chunk where every value is NULL is read back as object dtype
+        df[col] = df[col].astype("float64")
+    imputed = impute_missing_values(df, medians)
+    cleaned = cap_outliers(imputed.copy(), custom_caps)
+    return {
+        "credit_risk_imputed": imputed,
+        "credit_risk_cleaned": cleaned,
+        "credit_risk_engineered": full_preprocess(cleaned),
+        "credit_risk_baseline": minimal_preprocess(cleaned),
+    }
+
+def write_rows(conn, content: pd.DataFrame, keys: list, hashes: list, medians: dict):
+    """Materializes rows as kept: outputs and row state."""
+    outputs = transform(content.reset_index(drop=True), medians)
+    for table, df in outputs.items():
+        upsert(conn, table, df, keys)
+    conn.executemany("INSERT OR REPLACE INTO raw_row_state VALUES (?, ?, 1)", zip(keys, hashes))
+
+def promote_duplicates(conn, key_column: str, medians: dict) -> int:
+    """
+    Materializes the lowest-keyed row of every group of identical rows that
+    has no kept row, i.e. whose kept row changed after the others were
+    dropped as its duplicates. Found from the row state, so groups left by
+    an interrupted run are picked up by the next one. Returns the number of
+    rows promoted.
+    """
+    conn.execute("DROP TABLE IF EXISTS temp.promoted_rows")
+    conn.execute("CREATE TEMP TABLE promoted_rows (row_key INTEGER PRIMARY KEY)")
+    conn.execute(
+        "INSERT INTO promoted_rows SELECT MIN(row_key) FROM raw_row_state GROUP BY row_hash HAVING MAX(kept) = 0"
+    )
+    if not conn.execute("SELECT 1 FROM promoted_rows").fetchone():
+        return 0
+    rows = pd.read_sql_query(
+        f"SELECT r.* FROM {quote(RAW_TABLE)} r JOIN promoted_rows p ON p.row_key = r.{quote(key_column)} "
+        f"ORDER BY r.{quote(key_column)}",
+        conn,
+    )
+    content = rows.drop(columns=[key_column])
+    write_rows(conn, content, rows[key_column].astype("int64").tolist(), row_hashes(content).tolist(), medians)
+    return len(rows)
+
+def materialize(db_path=DB_PATH, chunk_size=CHUNK_SIZE, stats_version=None, full=False):
+    """
+    Brings the output tables up to date with the raw table. Returns counts
+    of processed (new or changed), duplicate, unchanged and promoted rows
+    (duplicates materialized because the row they duplicated changed).
+    """
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    ensure_state(conn)
+
+    stats = frozen_stats(conn, stats_version)
+    state = conn.execute(
+        "SELECT stats_version FROM materialization_state WHERE source = ?", (RAW_TABLE,)
+    ).fetchone()
+    if full or state is None or state[0] != stats["version"]:
+        print(f"Rebuilding all output tables with stats version {stats['version']}.")
+        reset_outputs(conn)
+
+    key_column = conn.execute(f"PRAGMA table_info({quote(RAW_TABLE)})").fetchone()[1]
+    counts = {"processed": 0, "duplicates": 0, "unchanged": 0, "promoted": 0}
+    # Keyset pagination on the raw rowid (insertion order); the key column identifies rows
+    last_rowid = 0
+    while True:
+        chunk = pd.read_sql_query(
+            f"SELECT rowid AS _rowid, * FROM {quote(RAW_TABLE)} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            conn,
+            params=(last_rowid, chunk_size),
+        )
+        if chunk.empty:
+            break
+        last_rowid = int(chunk["_rowid"].iloc[-1])
+        keys = chunk[key_column].to_numpy(dtype=np.int64)
+        content = chunk.drop(columns=["_rowid", key_column])
+        hashes = row_hashes(content)
+        process, duplicate, demoted = classify(conn, keys, hashes)
+        counts["processed"] += len(process)
+        counts["duplicates"] += len(duplicate)
+        counts["unchanged"] += len(chunk) - len(process) - len(duplicate)
+        if not process and not duplicate:
+            conn.commit()
+            continue
+
+        # Outputs and row state for the chunk are committed together
+        if duplicate or demoted:
+            delete_outputs(conn, keys[duplicate].tolist() + demoted)
+            conn.executemany("UPDATE raw_row_state SET kept = 0 WHERE row_key = ?", ((k,) for k in demoted))
+        if duplicate:
+            conn.executemany(
+                "INSERT OR REPLACE INTO raw_row_state VALUES (?, ?, 0)",
+                zip(keys[duplicate].tolist(), hashes[duplicate].tolist()),
+            )
+        if process:
+            write_rows(conn, content.iloc[process], keys[process].tolist(), hashes[process].tolist(), stats["medians"])
+        conn.execute(
+            "INSERT OR REPLACE INTO materialization_state VALUES (?, ?, ?, ?)",
+            (RAW_TABLE, stats["version"], last_rowid, time.strftime("%Y-%m-%dT%H:%M:%S%z")),
+        )
+        conn.commit()
+
+    # Run once every chunk is up to date, so a group's remaining rows are known
+    counts["promoted"] = promote_duplicates(conn, key_column, stats["medians"])
+    conn.commit()
+    conn.close()
+    elapsed = time.perf_counter() - start
+    print(f"✅ Materialized {counts['processed']} new/changed rows, dropped {counts['duplicates']} duplicates, "
+          f"skipped {counts['unchanged']} unchanged rows, re-kept {counts['promoted']} former duplicates "
+          f"in {elapsed:.1f}s (stats version {stats['version']}).")
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally clean and engineer new or changed raw rows.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--stats-version", type=int, default=None, help="frozen stats version (default: latest)")
+    parser.add_argument("--full", action="store_true", help="rebuild every output table from scratch")
+    args = parser.parse_args()
+
+    materialize(chunk_size=args.chunk_size, stats_version=args.stats_version, full=args.full)
@@ -0,0 +1,318 @@
+"""
+loanvet-score: offline bulk scoring of raw applicants.
+
+Reads applicants in chunks from a SQLite table (default: credit_risk_raw in
+data/loanvet.db) or from a CSV, NDJSON or Parquet file, and fans the chunks
+out to a process pool. At most TASKS_PER_WORKER chunks per worker are in
+flight, so file input is read only as fast as it is scored. Each worker loads the model once, and for SQLite
+input reads its own rowid range, so the parent only hands out ranges.
+Workers preprocess with the columnar feature path and score a whole chunk
+per call. The parent writes probabilities and labels back in bulk, to a
+SQLite table or an output file. Progress, rows/sec and per-stage timings
+(read / preprocess / predict / write) are reported.
+
+Raw columns may use the API's snake_case names or the Kaggle column names
+of credit_risk_raw.
+
+Run from the repository root:
+    python -m src.score --workers 8
+    python -m src.score --input applicants.csv --output scores.csv
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import sqlite3
+import time
+from multiprocessing import get_context
+import numpy as np
+import pandas as pd
+
+from src.api.utils import RAW_DEFAULTS, preprocess_columnar
+
+DB_PATH = "data/loanvet.db"
+MODEL_PATH = "models/final/xgb_final_model.joblib"
+METADATA_PATH = "models/final/xgb_final_metadata.json"
+
+# Rows per task handed to a worker
+CHUNK_SIZE = 100_000
+
+# Tasks submitted but not yet written back, per worker; bounds the chunks held in memory
+TASKS_PER_WORKER = 2
+
+# Kaggle column names (credit_risk_raw) for each raw API input
+KAGGLE_COLUMNS = {
+    "age": "age",
+    "monthly_income": "MonthlyIncome",
+    "number_of_dependents": "NumberOfDependents",
+    "number_of_open_credit_lines_and_loans": "NumberOfOpenCreditLinesAndLoans",
+    "number_real_estate_loans_or_lines": "NumberRealEstateLoansOrLines",
+    "debt_ratio": "DebtRatio",
+    "revolving_utilization_of_unsecured_lines": "RevolvingUtilizationOfUnsecuredLines",
+    "number_of_times_90_days_late": "NumberOfTimes90DaysLate",
+}
+DELINQUENCY_COLUMNS = [
+    "NumberOfTime30-59DaysPastDueNotWorse",
+    "NumberOfTimes90DaysLate",
+    "NumberOfTime60-89DaysPastDueNotWorse",
+]
+
+STAGES = ("read", "preprocess", "predict", "write")
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def raw_inputs(df: pd.DataFrame) -> dict:
+    """Raw API input columns from a frame with snake_case or Kaggle column names."""
+    columns = {}
+    for name in RAW_DEFAULTS:
+        if name in df.columns:
+            columns[name] = df[name]
+        elif name in KAGGLE_COLUMNS and KAGGLE_COLUMNS[name] in df.columns:
+            columns[name] = df[KAGGLE_COLUMNS[name]]
+    if "total_delinquencies" not in columns and all(c in df.columns for c in DELINQUENCY_COLUMNS):
+        columns["total_delinquencies"] = df[DELINQUENCY_COLUMNS].sum(axis=1, min_count=1)
+    return {name: pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64) for name, values in columns.items()}
+
+# == Worker process ==
+
+_worker = {}
+
+def init_worker(model_backend: str, model_path: str, metadata_path: str):
+    """Loads the model once per worker process."""
+    with open(metadata_path, "r") as f:
+        metadata = json.load(f)
+    _worker["feature_list"] = metadata["features"]
+    _worker["threshold"] = metadata.get("threshold", 0.5)
+    if model_backend == "compiled":
+        from src.api.compiled_model import load_compiled_model
+
+        model = load_compiled_model(model_path)
+        _worker["predict"] = lambda X: model.predict_proba(X)[:, 1]
+    else:
+        import joblib
+
+        booster = joblib.load(model_path).get_booster()
+        # One process per core already; xgboost threads would oversubscribe
+        booster.set_param({"nthread": 1})
+        _worker["predict"] = booster.inplace_predict
+
+def score_frame(df: pd.DataFrame, key_column: str, timings: dict):
+    start = time.perf_counter()
+    X = preprocess_columnar(raw_inputs(df), _worker["feature_list"])
+    timings["preprocess"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    proba = np.asarray(_worker["predict"](X), dtype=np.float64)
+    timings["predict"] = time.perf_counter() - start
+
+    keys = df[key_column].to_numpy() if key_column in df.columns else df.index.to_numpy()
+    labels = (proba >= _worker["threshold"]).astype(np.int64)
+    return keys, proba, labels, timings
+
+def score_sqlite_range(task):
+    db_path, table, key_column, first_rowid, last_rowid = task
+    start = time.perf_counter()
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    df = pd.read_sql_query(
+        f"SELECT rowid AS _rowid, * FROM {quote(table)} WHERE rowid BETWEEN ? AND ?",
+        conn,
+        params=(first_rowid, last_rowid),
+    )
+    conn.close()
+    return score_frame(df, key_column, {"read": time.perf_counter() - start})
+
+def score_chunk(task):
+    df, key_column, read_seconds = task
+    return score_frame(df, key_column, {"read": read_seconds})
+
+# == Parent: task sources and writers ==
+
+def sqlite_tasks(db_path: str, table: str, key_column: str, chunk_size: int):
+    conn = sqlite3.connect(db_path)
+    first, last = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {quote(table)}").fetchone()
+    total = conn.execute(f"SELECT COUNT(*) FROM {quote(table)}").fetchone()[0]
+    conn.close()
+    tasks = [] if first is None else [
+        (db_path, table, key_column, start, min(start + chunk_size - 1, last))
+        for start in range(first, last + 1, chunk_size)
+    ]
+    return tasks, total
+
+def file_tasks(path: str, key_column: str, chunk_size: int):
+    """Reads the file in chunks in the parent; the read time travels with each chunk."""
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Scoring Parquet files requires the 'pyarrow' package.")
+        batches = (b.to_pandas() for b in pq.ParquetFile(path).iter_batches(batch_size=chunk_size))
+    elif path.endswith((".ndjson", ".jsonl", ".json")):
+        batches = pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        batches = pd.read_csv(path, chunksize=chunk_size)
+
+    offset = 0
+    while True:
+        start = time.perf_counter()
+        df = next(batches, None)
+        if df is None:
+            return
+        # Without a key column, rows are identified by their position in the file
+        df.index = pd.RangeIndex(offset, offset + len(df))
+        offset += len(df)
+        yield df, key_column, time.perf_counter() - start
+
+class SQLiteWriter:
+    def __init__(self, db_path: str, table: str):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.table = table
+        self.conn.execute(f"DROP TABLE IF EXISTS {quote(table)}")
+        self.conn.execute(
+            f"CREATE TABLE {quote(table)} (row_key INTEGER PRIMARY KEY, probability REAL, label INTEGER)"
+        )
+        self.conn.commit()
+
+    def write(self, keys, proba, labels):
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO {quote(self.table)} VALUES (?, ?, ?)",
+            zip(keys.tolist(), proba.tolist(), labels.tolist()),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+class FileWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self.is_parquet = path.endswith(".parquet")
+        self._writer = None
+        if not self.is_parquet:
+            self._file = open(path, "w")
+            self._file.write("row_key,probability,label\n")
+
+    def write(self, keys, proba, labels):
+        df = pd.DataFrame({"row_key": keys, "probability": proba, "label": labels})
+        if self.is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self._file, header=False, index=False)
+
+    def close(self):
+        if self.is_parquet:
+            if self._writer is not None:
+                self._writer.close()
+        else:
+            self._file.close()
+
+def bounded_results(pool, fn, tasks, limit: int):
+    """
+    Yields fn(task) for each task as results complete, pulling the next task
+    only when fewer than `limit` are in flight. Pool.imap would drain the
+    whole source into its task queue up front, so file chunks would pile up
+    in memory faster than the workers score them.
+    """
+    done = queue.Queue()
+    tasks = iter(tasks)
+    pending = 0
+    exhausted = False
+    while True:
+        while not exhausted and pending < limit:
+            task = next(tasks, None)
+            if task is None:
+                exhausted = True
+                break
+            pool.apply_async(fn, (task,), callback=done.put, error_callback=done.put)
+            pending += 1
+        if pending == 0:
+            return
+        result = done.get()
+        pending -= 1
+        if isinstance(result, BaseException):
+            raise result
+        yield result
+
+def score(source, writer, workers: int, model_backend: str, model_path: str, metadata_path: str,
+          sqlite_source: bool, total: int = None) -> dict:
+    """Runs the pool over the tasks and writes results as they complete. Returns the run summary."""
+    stage_seconds = dict.fromkeys(STAGES, 0.0)
+    rows = 0
+    start = time.perf_counter()
+    worker_fn = score_sqlite_range if sqlite_source else score_chunk
+    # Fork keeps worker start-up cheap where available; workers still load the model themselves
+    context = get_context("fork") if hasattr(os, "fork") else get_context("spawn")
+    with context.Pool(workers, initializer=init_worker, initargs=(model_backend, model_path, metadata_path)) as pool:
+        for keys, proba, labels, timings in bounded_results(pool, worker_fn, source, TASKS_PER_WORKER * workers):
+            write_start = time.perf_counter()
+            writer.write(keys, proba, labels)
+            stage_seconds["write"] += time.perf_counter() - write_start
+            for stage, seconds in timings.items():
+                stage_seconds[stage] += seconds
+
+            rows += len(keys)
+            elapsed = time.perf_counter() - start
+            progress = f"{rows:,}/{total:,}" if total else f"{rows:,}"
+            logging.info(f"Scored {progress} rows ({rows / elapsed:,.0f} rows/sec)")
+    writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "workers": workers,
+        "elapsed_seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+        # Worker stages are summed across processes (CPU-seconds); write is the parent's wall time
+        "stage_seconds": stage_seconds,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="loanvet-score", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="CSV, NDJSON or Parquet file of raw applicants (default: SQLite table)")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--table", default="credit_risk_raw", help="SQLite table of raw applicants")
+    parser.add_argument("--key-column", default=None, help="column identifying each applicant (default: SQLite rowid / file row number)")
+    parser.add_argument("--output", help="output CSV or Parquet file (default: SQLite table --output-table)")
+    parser.add_argument("--output-table", default="credit_risk_scores")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: available cores)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--model-backend", choices=("joblib", "compiled"), default="joblib")
+    parser.add_argument("--model", default=None, help="model path (default depends on --model-backend)")
+    parser.add_argument("--metadata", default=METADATA_PATH)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.model is None:
+        from src.api.compiled_model import COMPILED_MODEL_PATH
+
+        args.model = COMPILED_MODEL_PATH if args.model_backend == "compiled" else MODEL_PATH
+    try:
+        workers = args.workers or len(os.sched_getaffinity(0))
+    except AttributeError:
+        workers = args.workers or os.cpu_count() or 1
+
+    if args.input:
+        source, total = file_tasks(args.input, args.key_column, args.chunk_size), None
+    else:
+        source, total = sqlite_tasks(os.path.abspath(args.db), args.table, args.key_column or "_rowid", args.chunk_size)
+    writer = FileWriter(args.output) if args.output else SQLiteWriter(args.db, args.output_table)
+
+    summary = score(source, writer, workers, args.model_backend, args.model, args.metadata,
+                    sqlite_source=not args.input, total=total)
+    stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in summary["stage_seconds"].items())
+    logging.info(f"✅ Scored {summary['rows']:,} rows with {workers} workers in {summary['elapsed_seconds']:.1f}s "
+                 f"({summary['rows_per_second']:,.0f} rows/sec); stages: {stages}")
+    return summary
+
+if __name__ == "__main__":
+    main()
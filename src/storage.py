@@ -0,0 +1,210 @@
+"""
+Table storage for the pipeline stages: the original SQLite database or a
+columnar store of partitioned Parquet / Arrow IPC datasets under
+data/store/<table>/.
+
+Loaders take `columns` (projection) and `filters` (predicates as
+(column, op, value) tuples, e.g. [("age", ">=", 60)]). Both are pushed down
+to the storage: into the SELECT on SQLite, and into the dataset scan on the
+columnar store, where Parquet row groups are skipped using their statistics
+and Arrow IPC files are memory-mapped, so reads do not copy the file.
+Row order is kept within a file but not guaranteed across the files of a
+dataset.
+
+The backend is chosen with LOANVET_STORAGE=sqlite|parquet|arrow (default
+sqlite). The columnar backends need the 'pyarrow' package.
+"""
+import os
+import shutil
+import sqlite3
+import pandas as pd
+
+DB_PATH = "data/loanvet.db"
+STORE_ROOT = "data/store"
+STORAGE_BACKEND = os.getenv("LOANVET_STORAGE", "sqlite")
+
+# Rows per streamed chunk when copying tables, and max rows per file in the columnar store
+CHUNK_SIZE = 250_000
+
+FORMATS = {"parquet": "parquet", "arrow": "ipc"}
+SQL_OPERATORS = {"==": "=", "=": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("The parquet and arrow storage backends require the 'pyarrow' package.")
+    return pyarrow
+
+def _check_backend(backend):
+    if backend != "sqlite" and backend not in FORMATS:
+        raise ValueError("storage backend must be 'sqlite', 'parquet' or 'arrow'")
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def _sql_where(filters):
+    clauses, params = [], []
+    for column, op, value in filters or []:
+        if op == "in":
+            clauses.append(f"{_quote(column)} IN ({', '.join('?' * len(value))})")
+            params.extend(value)
+        elif op in SQL_OPERATORS:
+            clauses.append(f"{_quote(column)} {SQL_OPERATORS[op]} ?")
+            params.append(value)
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+def table_path(table, root=STORE_ROOT):
+    return os.path.join(root, table)
+
+def _dataset(table, backend, root):
+    pa = _pyarrow()
+    from pyarrow import fs
+
+    # Memory-mapped reads: Arrow IPC record batches are used in place, without copying the file
+    filesystem = fs.LocalFileSystem(use_mmap=True)
+    path = os.path.abspath(table_path(table, root))
+    return pa.dataset.dataset(path, format=FORMATS[backend], partitioning="hive", filesystem=filesystem)
+
+def load_table(table, columns=None, filters=None, backend=None, db_path=DB_PATH, root=STORE_ROOT):
+    """Loads a table into a DataFrame, reading only `columns` and rows matching `filters`."""
+    backend = backend or STORAGE_BACKEND
+    _check_backend(backend)
+    if backend == "sqlite":
+        select = ", ".join(_quote(c) for c in columns) if columns else "*"
+        where, params = _sql_where(filters)
+        conn = sqlite3.connect(db_path)
+        df = pd.read_sql_query(f"SELECT {select} FROM {_quote(table)}{where}", conn, params=params)
+        conn.close()
+        return df
+
+    pa = _pyarrow()
+    expression = pa.parquet.filters_to_expression(filters) if filters else None
+    scanned = _dataset(table, backend, root).to_table(columns=columns, filter=expression)
+    return scanned.to_pandas()
+
+def iter_table(table, columns=None, filters=None, backend=None, chunk_size=CHUNK_SIZE, db_path=DB_PATH, root=STORE_ROOT):
+    """Streams a table as DataFrame chunks of at most chunk_size rows."""
+    backend = backend or STORAGE_BACKEND
+    _check_backend(backend)
+    if backend == "sqlite":
+        select = ", ".join(_quote(c) for c in columns) if columns else "*"
+        where, params = _sql_where(filters)
+        # The generator may be resumed from another thread (pyarrow's write_dataset pulls
+        # batches from its own thread), one chunk at a time
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        try:
+            yield from pd.read_sql_query(
+                f"SELECT {select} FROM {_quote(table)}{where}", conn, params=params, chunksize=chunk_size
+            )
+        finally:
+            conn.close()
+        return
+
+    pa = _pyarrow()
+    expression = pa.parquet.filters_to_expression(filters) if filters else None
+    scanner = _dataset(table, backend, root).scanner(columns=columns, filter=expression, batch_size=chunk_size)
+    for batch in scanner.to_batches():
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+def table_fingerprint(table, backend=None, db_path=DB_PATH, root=STORE_ROOT) -> str:
+    """
+    Cheap fingerprint that changes when a table may have changed: on SQLite the
+    table's schema, row count and max rowid plus the database (and WAL) file
+    size and mtime; on the columnar store each file's path, size and mtime.
+    """
+    import hashlib
+
+    backend = backend or STORAGE_BACKEND
+    _check_backend(backend)
+    parts = [backend, table]
+    if backend == "sqlite":
+        conn = sqlite3.connect(db_path)
+        try:
+            parts += conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() or [None]
+            parts += conn.execute(f"SELECT COUNT(*), MAX(rowid) FROM {_quote(table)}").fetchone()
+        finally:
+            conn.close()
+        for path in (db_path, db_path + "-wal"):
+            if os.path.exists(path):
+                stat = os.stat(path)
+                parts += [path, stat.st_size, stat.st_mtime_ns]
+    else:
+        for directory, _, files in sorted(os.walk(table_path(table, root))):
+            for name in sorted(files):
+                stat = os.stat(os.path.join(directory, name))
+                parts += [os.path.relpath(os.path.join(directory, name), root), stat.st_size, stat.st_mtime_ns]
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:16]
+
+def save_table(data, table, backend=None, partition_cols=None, db_path=DB_PATH, root=STORE_ROOT):
+    """
+    Writes a DataFrame, or an iterable of DataFrame chunks, replacing the
+    table. On the columnar store, partition_cols splits the dataset into
+    hive-style directories (e.g. SeriousDlqin2yrs=1/) and files are capped at
+    CHUNK_SIZE rows.
+    """
+    backend = backend or STORAGE_BACKEND
+    _check_backend(backend)
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+
+    if backend == "sqlite":
+        conn = sqlite3.connect(db_path)
+        if_exists = "replace"
+        for chunk in chunks:
+            chunk.to_sql(table, conn, if_exists=if_exists, index=False)
+            if_exists = "append"
+        conn.commit()
+        conn.close()
+        return
+
+    pa = _pyarrow()
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        raise ValueError(f"No data to write to '{table}'")
+    # The first chunk fixes the schema; later chunks are cast to it
+    schema = pa.Schema.from_pandas(first, preserve_index=False)
+
+    def batches():
+        for chunk in _chain(first, chunks):
+            yield from pa.Table.from_pandas(chunk, schema=schema, preserve_index=False).to_batches()
+
+    # Replace the whole dataset, including partitions the new data no longer has
+    shutil.rmtree(table_path(table, root), ignore_errors=True)
+    pa.dataset.write_dataset(
+        batches(),
+        table_path(table, root),
+        schema=schema,
+        format=FORMATS[backend],
+        partitioning=partition_cols,
+        partitioning_flavor="hive" if partition_cols else None,
+        max_rows_per_file=CHUNK_SIZE,
+        max_rows_per_group=min(CHUNK_SIZE, 64 * 1024),
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+def export_sqlite_table(table, backend="parquet", partition_cols=None, db_path=DB_PATH, root=STORE_ROOT):
+    """Copies a SQLite table into the columnar store in CHUNK_SIZE-row chunks."""
+    save_table(iter_table(table, backend="sqlite", db_path=db_path), table, backend, partition_cols, root=root)
+    print(f"✅ Exported '{table}' to {table_path(table, root)} ({backend}).")
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export pipeline tables from SQLite to the columnar store.")
+    parser.add_argument("tables", nargs="*", default=["credit_risk_raw", "credit_risk_cleaned", "credit_risk_engineered"])
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--partition-by", nargs="*", default=None, help="hive partition columns")
+    args = parser.parse_args()
+
+    for name in args.tables:
+        export_sqlite_table(name, args.format, args.partition_by)
@@ -1,5 +1,11 @@
 import streamlit as st
-import requests
+from client import DEFAULT_BASE_URL, LoanVetClient
+
+# One pooled client per Streamlit process, reused across reruns and sessions.
+# The long timeout covers the hosted API waking up from idle.
+@st.cache_resource
+def get_client():
+    return LoanVetClient(DEFAULT_BASE_URL, timeout=60)
 
 st.title("LoanVet Credit Risk Prediction")
 
@@ -16,12 +22,9 @@ input_data = {
 
 if st.button("Predict"):
     try:
-        API_URL = "https://loanvet.onrender.com/predict"
-        response = requests.post(API_URL, json=input_data)
-        response.raise_for_status()
-        result = response.json()
-        label = result["prediction"]["label"]
-        proba = result["prediction"]["probability"]
+        prediction = get_client().predict(input_data)
+        label = prediction["label"]
+        proba = prediction["probability"]
 
         st.success(f"Prediction: {'High Risk' if label == 1 else 'Low Risk'}")
         st.info(f"Probability of Default: {proba:.4f}")
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests import the API as `src.api...` and the pipeline scripts as top-level modules, as they run
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
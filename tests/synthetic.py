@@ -0,0 +1,150 @@
+"""
+Synthetic data shaped like the Give Me Some Credit training file
+(cs-training.csv), the cleaned table and the API payload, so tests and
+benchmarks run without the Kaggle download. Tests assert on this data, so
+benchmarks import it from here rather than define their own.
+"""
+import numpy as np
+import pandas as pd
+
+from src.api.utils import RAW_DEFAULTS
+
+def make_raw_credit_frame(n: int, seed: int = 0, duplicate_rate: float = 0.004) -> pd.DataFrame:
+    """
+    Raw rows with the Kaggle column names and roughly the Kaggle
+    distributions: ~20% missing MonthlyIncome, ~2.6% missing
+    NumberOfDependents, heavy-tailed utilization and debt ratios, the 96/98
+    delinquency sentinel codes and a small share of duplicated rows.
+    "Unnamed: 0" is the 1-based row id, as pandas names the CSV's blank
+    first column.
+    """
+    rng = np.random.default_rng(seed)
+    late_30_59 = rng.poisson(0.25, n)
+    late_60_89 = rng.poisson(0.08, n)
+    late_90 = rng.poisson(0.1, n)
+    sentinel = rng.random(n) < 0.002
+    for late in (late_30_59, late_60_89, late_90):
+        late[sentinel] = rng.choice([96, 98], sentinel.sum())
+
+    df = pd.DataFrame({
+        "SeriousDlqin2yrs": (rng.random(n) < 0.067).astype(np.int64),
+        "RevolvingUtilizationOfUnsecuredLines": np.where(
+            rng.random(n) < 0.01, rng.lognormal(5, 2, n), rng.beta(0.6, 1.2, n)
+        ),
+        "age": rng.normal(52, 15, n).clip(0, 109).astype(np.int64),
+        "NumberOfTime30-59DaysPastDueNotWorse": late_30_59,
+        "DebtRatio": np.where(rng.random(n) < 0.2, rng.lognormal(6, 2, n), rng.beta(1.5, 3, n)),
+        "MonthlyIncome": rng.lognormal(8.6, 0.7, n).round(),
+        "NumberOfOpenCreditLinesAndLoans": rng.poisson(8.5, n),
+        "NumberOfTimes90DaysLate": late_90,
+        "NumberRealEstateLoansOrLines": rng.poisson(1.0, n),
+        "NumberOfTime60-89DaysPastDueNotWorse": late_60_89,
+        "NumberOfDependents": rng.choice([0, 1, 2, 3, 4, 5, 6], n, p=[0.58, 0.18, 0.13, 0.065, 0.02, 0.01, 0.015]).astype(np.float64),
+    })
+    df.loc[rng.random(n) < 0.198, "MonthlyIncome"] = np.nan
+    df.loc[rng.random(n) < 0.026, "NumberOfDependents"] = np.nan
+
+    # Copy a few earlier rows' values onto later rows so deduplication has work to do
+    dupes = np.flatnonzero(rng.random(n) < duplicate_rate)
+    dupes = dupes[dupes > 0]
+    sources = rng.integers(0, dupes)
+    for column in df.columns:
+        values = df[column].to_numpy(copy=True)
+        values[dupes] = values[sources]
+        df[column] = values
+
+    df.insert(0, "Unnamed: 0", np.arange(1, n + 1))
+    return df
+
+def to_csv(df: pd.DataFrame, path: str):
+    """Writes the frame as the Kaggle CSV, with a blank header for the id column."""
+    df.rename(columns={"Unnamed: 0": ""}).to_csv(path, index=False)
+
+def to_api_records(df: pd.DataFrame) -> list:
+    """Raw rows as /predict payloads (snake_case, missing values left out)."""
+    columns = {
+        "age": df["age"],
+        "monthly_income": df["MonthlyIncome"],
+        "number_of_dependents": df["NumberOfDependents"],
+        "number_of_open_credit_lines_and_loans": df["NumberOfOpenCreditLinesAndLoans"],
+        "number_real_estate_loans_or_lines": df["NumberRealEstateLoansOrLines"],
+        "debt_ratio": df["DebtRatio"],
+        "revolving_utilization_of_unsecured_lines": df["RevolvingUtilizationOfUnsecuredLines"],
+        "total_delinquencies": df["NumberOfTime30-59DaysPastDueNotWorse"] + df["NumberOfTimes90DaysLate"]
+        + df["NumberOfTime60-89DaysPastDueNotWorse"],
+        "number_of_times_90_days_late": df["NumberOfTimes90DaysLate"],
+    }
+    frame = pd.DataFrame({name: values.astype(np.float64) for name, values in columns.items()})
+    return [{k: v for k, v in record.items() if v == v} for record in frame.to_dict("records")]
+
+def make_raw_columns(n: int, seed: int = 0) -> dict:
+    """
+    Random raw inputs shaped like the API payload, with missing income,
+    dependents and 90-days-late counts (NaN), zero open lines and zero
+    income/dependents mixed in.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {
+        "age": rng.integers(18, 100, n).astype(np.float64),
+        "monthly_income": rng.lognormal(8.5, 0.8, n),
+        "number_of_dependents": rng.integers(0, 8, n).astype(np.float64),
+        "number_of_open_credit_lines_and_loans": rng.integers(0, 30, n).astype(np.float64),
+        "number_real_estate_loans_or_lines": rng.integers(0, 6, n).astype(np.float64),
+        "debt_ratio": rng.exponential(0.5, n),
+        "revolving_utilization_of_unsecured_lines": rng.uniform(0, 1.5, n),
+        "total_delinquencies": rng.poisson(0.4, n).astype(np.float64),
+    }
+    columns["number_of_times_90_days_late"] = np.floor(columns["total_delinquencies"] * rng.uniform(0, 1, n))
+    columns["number_of_times_90_days_late"][rng.random(n) < 0.3] = np.nan
+    columns["monthly_income"][rng.random(n) < 0.2] = np.nan
+    columns["monthly_income"][rng.random(n) < 0.05] = 0.0
+    columns["number_of_dependents"][rng.random(n) < 0.05] = np.nan
+    columns["number_of_open_credit_lines_and_loans"][rng.random(n) < 0.05] = 0.0
+    return columns
+
+def to_records(columns: dict) -> list:
+    # Missing values are left out of the record, as an API client would
+    n = len(next(iter(columns.values())))
+    records = []
+    for i in range(n):
+        record = {}
+        for name in RAW_DEFAULTS:
+            value = columns[name][i]
+            if not np.isnan(value):
+                record[name] = float(value)
+        records.append(record)
+    return records
+
+# Records on zero denominators, bin edges and the utilization threshold
+EDGE_CASES = [
+    {},
+    {"number_of_open_credit_lines_and_loans": 0, "monthly_income": 4000},
+    {"number_of_open_credit_lines_and_loans": 0},
+    {"age": 45, "number_of_dependents": 2},
+    {"monthly_income": 0, "number_of_dependents": 0},
+    {"monthly_income": 2500, "number_of_dependents": 3, "age": 35},
+    {"age": 60, "number_of_dependents": 4, "revolving_utilization_of_unsecured_lines": 0.75},
+    {"revolving_utilization_of_unsecured_lines": 0.7500001, "total_delinquencies": 12},
+    {"age": 30, "number_of_dependents": 2, "revolving_utilization_of_unsecured_lines": 0.9},
+    {"age": 50, "number_of_dependents": 10, "revolving_utilization_of_unsecured_lines": 0.9000001},
+    {"age": 100, "total_delinquencies": 5, "number_of_times_90_days_late": 2},
+]
+
+def make_cleaned_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    """Random rows shaped like credit_risk_cleaned (capped ranges, imputed income/dependents)."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "SeriousDlqin2yrs": rng.integers(0, 2, n),
+        "RevolvingUtilizationOfUnsecuredLines": rng.uniform(0, 1, n),
+        "age": rng.integers(18, 101, n),
+        "NumberOfTime30-59DaysPastDueNotWorse": rng.poisson(0.3, n).clip(0, 12),
+        "DebtRatio": rng.exponential(300, n).clip(0, 5000),
+        "MonthlyIncome": rng.lognormal(8.5, 0.8, n).clip(0, 50000),
+        "NumberOfOpenCreditLinesAndLoans": rng.integers(0, 31, n),
+        "NumberOfTimes90DaysLate": rng.poisson(0.2, n).clip(0, 12),
+        "NumberRealEstateLoansOrLines": rng.integers(0, 11, n),
+        "NumberOfTime60-89DaysPastDueNotWorse": rng.poisson(0.1, n).clip(0, 12),
+        "NumberOfDependents": rng.integers(0, 11, n).astype(np.float64),
+        "MonthlyIncome_missing_flag": rng.integers(0, 2, n),
+        "NumberOfDependents_missing_flag": rng.integers(0, 2, n),
+    })
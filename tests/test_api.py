@@ -0,0 +1,66 @@
+"""
+Single and batch endpoints of the prediction API must agree on the same
+records, including records with null values.
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("LOANVET_BACKGROUND_WARMUP", "0")
+os.environ.setdefault("LOANVET_MODEL_POLL_SECONDS", "0")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.api.app import app  # noqa: E402
+
+RECORDS = [
+    {"age": 45, "monthly_income": 5200, "number_of_dependents": 2, "debt_ratio": 0.35,
+     "revolving_utilization_of_unsecured_lines": 0.4, "total_delinquencies": 1, "number_of_times_90_days_late": 0},
+    {"age": 45, "monthly_income": None, "number_of_dependents": None, "debt_ratio": 0.35,
+     "revolving_utilization_of_unsecured_lines": 0.95, "total_delinquencies": 3, "number_of_times_90_days_late": None},
+    {"age": None, "monthly_income": 0, "number_of_open_credit_lines_and_loans": None},
+    {},
+]
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+def test_batch_accepts_nulls_like_predict(client):
+    single = [client.post("/predict", json=record).json()["prediction"] for record in RECORDS]
+    response = client.post("/predict/batch", json=RECORDS)
+    assert response.status_code == 200
+    batch = response.json()["predictions"]
+    for one, many in zip(single, batch):
+        assert one["label"] == many["label"]
+        assert one["probability"] == pytest.approx(many["probability"], abs=1e-6)
+
+def test_null_is_the_same_as_absent(client):
+    absent = client.post("/predict/batch", json=[{"age": 45}]).json()["predictions"][0]
+    null = client.post("/predict/batch", json=[{"age": 45, "monthly_income": None}]).json()["predictions"][0]
+    assert absent == null
+
+def test_explain_batch_accepts_nulls_like_explain(client):
+    single = [client.post("/explain", json=record).json()["explanation"] for record in RECORDS]
+    response = client.post("/explain/batch", json=RECORDS)
+    assert response.status_code == 200
+    for one, many in zip(single, response.json()["explanations"]):
+        assert one["label"] == many["label"]
+        assert one["probability"] == pytest.approx(many["probability"], abs=1e-6)
+        assert [r["feature"] for r in one["reasons"]] == [r["feature"] for r in many["reasons"]]
+
+@pytest.mark.parametrize("field", ["number_of_dependents", "number_of_open_credit_lines_and_loans"])
+def test_negative_counts_are_rejected(client, field):
+    response = client.post("/predict", json={**RECORDS[0], field: -1})
+    assert response.status_code == 422
+
+@pytest.mark.parametrize("path, body", [("/predict", RECORDS[0]), ("/explain", RECORDS[0]),
+                                        ("/explain/batch", RECORDS)])
+def test_feature_mismatch_is_rejected(client, monkeypatch, path, body):
+    from src.api.app import registry
+
+    monkeypatch.setattr(registry.active, "extra_features", {"UnusedFeature"})
+    response = client.post(path, json=body)
+    assert response.status_code == 422
+    assert "UnusedFeature" in response.json()["detail"]
@@ -0,0 +1,71 @@
+"""
+The micro-batcher waits for a batch to fill only while other requests are
+in flight that could still join it.
+"""
+import asyncio
+import time
+
+import numpy as np
+
+from src.api.batcher import MicroBatcher
+
+class StubPredictor:
+    threshold = 0.5
+
+    def vector(self, record: dict) -> np.ndarray:
+        return np.array([record["x"]], dtype=np.float32)
+
+    def predict_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        return matrix[:, 0].astype(np.float64)
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_lone_request_is_not_held_for_the_window():
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=64, max_wait_ms=500, in_flight=lambda: 1)
+        batcher.start()
+        try:
+            start = time.perf_counter()
+            result = await batcher.predict(StubPredictor(), {"x": 0.75})
+            return result, time.perf_counter() - start, batcher.stats()
+        finally:
+            await batcher.stop()
+
+    result, elapsed, stats = run(scenario())
+    assert result == {"label": 1, "probability": 0.75}
+    assert elapsed < 0.25
+    assert stats["early_flushes"] == 1
+
+def test_waits_for_requests_still_in_flight():
+    in_flight = [2]
+
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=64, max_wait_ms=500, in_flight=lambda: in_flight[0])
+        batcher.start()
+        predictor = StubPredictor()
+        try:
+            first = asyncio.ensure_future(batcher.predict(predictor, {"x": 0.1}))
+            # The second request is still on its way (e.g. preprocessing) when the first is queued
+            await asyncio.sleep(0.02)
+            second = await batcher.predict(predictor, {"x": 0.9})
+            return await first, second, batcher.stats()
+        finally:
+            await batcher.stop()
+
+    first, second, stats = run(scenario())
+    assert first["label"] == 0 and second["label"] == 1
+    assert stats["batches"] == 1 and stats["largest_batch"] == 2
+
+def test_without_in_flight_the_window_is_used():
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=64, max_wait_ms=50)
+        batcher.start()
+        try:
+            start = time.perf_counter()
+            await batcher.predict(StubPredictor(), {"x": 0.2})
+            return time.perf_counter() - start
+        finally:
+            await batcher.stop()
+
+    assert run(scenario()) >= 0.04
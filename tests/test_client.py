@@ -0,0 +1,88 @@
+"""
+The Python clients must return what the API returns, in input order, and
+handle retries and servers without /predict/batch.
+"""
+import asyncio
+import os
+
+import httpx
+import pytest
+
+os.environ.setdefault("LOANVET_BACKGROUND_WARMUP", "0")
+os.environ.setdefault("LOANVET_MODEL_POLL_SECONDS", "0")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.api.app import app  # noqa: E402
+from src.client import AsyncLoanVetClient, LoanVetAPIError, LoanVetClient, Retry  # noqa: E402
+from tests.synthetic import make_raw_columns, to_records  # noqa: E402
+
+RECORDS = to_records(make_raw_columns(25, seed=6)) + [{}, {"age": 40, "monthly_income": None}]
+
+@pytest.fixture(scope="module")
+def api():
+    with TestClient(app) as api:
+        yield api
+
+@pytest.fixture
+def client(api):
+    # Requests go through the TestClient's in-process ASGI transport instead of the network
+    with LoanVetClient("http://testserver", transport=api._transport) as client:
+        yield client
+
+def test_predict_matches_api(client, api):
+    for record in RECORDS[:5]:
+        assert client.predict(record) == api.post("/predict", json=record).json()["prediction"]
+
+def test_predict_many_batches_in_order(client, api):
+    expected = [api.post("/predict", json=record).json()["prediction"] for record in RECORDS]
+    results = client.predict_many(RECORDS, batch_size=4, concurrency=3)
+    assert client.batch_supported is True
+    assert [r["label"] for r in results] == [e["label"] for e in expected]
+    assert [r["probability"] for r in results] == pytest.approx([e["probability"] for e in expected], abs=1e-6)
+
+def test_api_errors_are_raised(client):
+    with pytest.raises(LoanVetAPIError) as error:
+        client.predict({"number_of_dependents": -1})
+    assert error.value.status_code == 422
+
+class FlakyServer:
+    """Answers 503 to the first request of each record and has no /predict/batch."""
+
+    def __init__(self):
+        self.seen = set()
+        self.requests = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if request.url.path == "/predict/batch":
+            return httpx.Response(404, json={"detail": "Not Found"})
+        age = httpx.Response(200, content=request.content).json()["age"]
+        if age not in self.seen:
+            self.seen.add(age)
+            return httpx.Response(503, headers={"Retry-After": "0"}, json={"detail": "Model is not loaded yet."})
+        return httpx.Response(200, json={"prediction": {"label": int(age >= 50), "probability": age / 100}})
+
+def test_falls_back_to_single_requests_and_retries():
+    server = FlakyServer()
+    records = [{"age": age} for age in (30, 55, 70)]
+    with LoanVetClient("http://testserver", transport=httpx.MockTransport(server), retry=Retry(attempts=2)) as client:
+        results = client.predict_many(records)
+    assert client.batch_supported is False
+    assert results == [{"label": 0, "probability": 0.3}, {"label": 1, "probability": 0.55},
+                       {"label": 1, "probability": 0.7}]
+    # One batch probe, then a 503 and a retry per record
+    assert server.requests == 1 + 2 * len(records)
+
+def test_async_client_falls_back_and_retries():
+    server = FlakyServer()
+    records = [{"age": age} for age in range(20, 40)]
+
+    async def scenario():
+        async with AsyncLoanVetClient("http://testserver", transport=httpx.MockTransport(server),
+                                      retry=Retry(attempts=2), max_connections=4) as client:
+            return await client.predict_many(records), client.batch_supported
+
+    results, batch_supported = asyncio.run(scenario())
+    assert batch_supported is False
+    assert [r["probability"] for r in results] == [r["age"] / 100 for r in records]
@@ -0,0 +1,53 @@
+"""
+The compiled NumPy scorer must match xgboost's predict_proba for a freshly
+trained booster, with missing values, whichever way the installed xgboost
+serializes base_score.
+"""
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from src.api.compiled_model import (COMPILED_MODEL_PATH, CompiledModel, _base_score, compile_booster, export_model,
+                                    load_compiled_model)
+
+@pytest.fixture(scope="module")
+def trained():
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(2_000, 6)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=len(X)) > 0.8).astype(int)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    model = xgb.XGBClassifier(n_estimators=40, max_depth=4, learning_rate=0.3, n_jobs=1)
+    model.fit(X, y)
+    test = rng.normal(size=(1_000, 6)).astype(np.float32)
+    test[rng.random(test.shape) < 0.1] = np.nan
+    return model, test
+
+def test_compiled_matches_predict_proba(trained):
+    model, X = trained
+    compiled = CompiledModel(compile_booster(model.get_booster()))
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-6)
+
+def test_exported_file_matches_predict_proba(trained, tmp_path):
+    model, X = trained
+    path = export_model(model, str(tmp_path / "model.npz"))
+    for mmap in (True, False):
+        loaded = load_compiled_model(path, mmap=mmap)
+        np.testing.assert_allclose(loaded.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-6)
+
+@pytest.mark.parametrize("value", ["1.5033065E-1", "[1.5033065E-1]", "0.15033065"])
+def test_base_score_formats(value):
+    assert _base_score(value) == pytest.approx(0.15033065)
+
+def test_committed_export_shares_traversal_arrays(caplog):
+    model = load_compiled_model(COMPILED_MODEL_PATH)
+    # Mapped from the file, so pre-forked workers share the pages
+    assert isinstance(model._children.base, np.memmap) and isinstance(model._flat_feature.base, np.memmap)
+    assert "traversal arrays" not in caplog.text
+
+def test_old_export_without_traversal_arrays_warns(trained, caplog):
+    model, X = trained
+    arrays = compile_booster(model.get_booster())
+    del arrays["flat_feature"], arrays["children"]
+    compiled = CompiledModel(arrays)
+    assert "no traversal arrays" in caplog.text
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-6)
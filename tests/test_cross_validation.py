@@ -0,0 +1,33 @@
+"""
+Cross-validation workers reuse a fold's training data between jobs, but
+keep only the fold they are on.
+"""
+import numpy as np
+import pytest
+
+import cross_validation
+from cross_validation import _split
+
+@pytest.fixture
+def worker(monkeypatch):
+    rng = np.random.default_rng(0)
+    state = {
+        "X": rng.normal(size=(60, 3)),
+        "y": rng.integers(0, 2, 60),
+        "folds": np.arange(60) % 3,
+        "threads": 1,
+        "cache": {},
+    }
+    monkeypatch.setattr(cross_validation, "_worker", state)
+    return state
+
+def test_split_is_reused_within_a_fold(worker):
+    assert _split(0)[0] is _split(0)[0]
+
+def test_only_the_current_fold_is_cached(worker):
+    first = _split(0)
+    second = _split(1)
+    assert len(worker["cache"]) == 1 and worker["cache"]["split"] is second
+    X_train, y_train, X_test, y_test = second
+    np.testing.assert_array_equal(X_test, worker["X"][worker["folds"] == 1])
+    assert len(X_train) + len(X_test) == 60 and first[2] is not X_test
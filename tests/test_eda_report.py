@@ -0,0 +1,62 @@
+"""
+The EDA report's one-pass statistics must match pandas over the whole table,
+however it is chunked, and cached stats must only be reused for the same
+table and settings.
+"""
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eda_report import TARGET, collect, load_or_compute, summarize
+from tests.synthetic import make_raw_credit_frame
+
+TABLE = "credit_risk_raw"
+
+@pytest.fixture
+def table(tmp_path, monkeypatch):
+    # The report reads data/loanvet.db relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    df = make_raw_credit_frame(3_000, seed=12).iloc[:, 1:]
+    with sqlite3.connect("data/loanvet.db") as conn:
+        df.to_sql(TABLE, conn, index=False)
+    return df
+
+@pytest.mark.parametrize("chunk_size", [3_000, 701])
+def test_exact_statistics_match_pandas(table, chunk_size):
+    stats = summarize(*collect(TABLE, chunk_size=chunk_size, sample_per_class=500))
+    features = table.drop(columns=TARGET)
+    assert stats["rows"] == len(table) and stats["positives"] == int(table[TARGET].sum())
+    for column in features.columns:
+        entry, values = stats["columns"][column], features[column]
+        assert entry["count"] == values.count() and entry["missing"] == values.isna().sum()
+        assert entry["min"] == values.min() and entry["max"] == values.max()
+        assert entry["mean"] == pytest.approx(values.mean(), rel=1e-10)
+        assert entry["std"] == pytest.approx(values.std(), rel=1e-8)
+        assert entry["skew"] == pytest.approx(values.skew(), rel=1e-6, abs=1e-9)
+    correlation = pd.DataFrame(stats["correlation"]["values"], dtype=float,
+                               index=stats["correlation"]["columns"], columns=stats["correlation"]["columns"])
+    expected = features.corr()
+    pd.testing.assert_frame_equal(correlation, expected, check_exact=False, rtol=0, atol=1e-9)
+
+def test_sample_is_capped_per_class(table):
+    stats = summarize(*collect(TABLE, chunk_size=701, sample_per_class=100))
+    assert stats["sample_rows"] == {"0": 100, "1": 100}
+
+def test_cached_stats_are_keyed_on_settings(table, tmp_path, capsys):
+    cache_dir = str(tmp_path / "cache")
+    first = load_or_compute(TABLE, chunk_size=701, sample_per_class=100, cache_dir=cache_dir)
+    again = load_or_compute(TABLE, chunk_size=701, sample_per_class=100, cache_dir=cache_dir)
+    assert "Using cached stats" in capsys.readouterr().out
+    # Compared as JSON, since NaN values never compare equal
+    assert json.dumps(again, sort_keys=True) == json.dumps(first, sort_keys=True)
+    # Another chunk size draws another reservoir sample, so it is not served from the cache
+    other = load_or_compute(TABLE, chunk_size=1_000, sample_per_class=100, cache_dir=cache_dir)
+    assert "Using cached stats" not in capsys.readouterr().out
+    assert other["fingerprint"] != first["fingerprint"]
+    assert len(os.listdir(cache_dir)) == 2
+    assert np.isclose(other["columns"]["age"]["mean"], first["columns"]["age"]["mean"])
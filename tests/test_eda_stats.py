@@ -0,0 +1,56 @@
+"""
+The vectorized EDA statistics must match the pandas code they replaced:
+DataFrame.corr() and the per-column IQR outlier filter.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from eda_stats import correlation_matrix, detect_multicollinearity, iqr_outlier_summary, outlier_counts
+from tests.synthetic import make_raw_credit_frame
+
+@pytest.fixture(scope="module")
+def frame():
+    df = make_raw_credit_frame(5_000, seed=8).iloc[:, 1:]
+    rng = np.random.default_rng(8)
+    df["DebtRatioScaled"] = df["DebtRatio"] * 2 + rng.normal(0, 1e-3, len(df))
+    df["Constant"] = 3.0
+    df["Empty"] = np.nan
+    return df
+
+def per_column_outliers(df):
+    # The per-column filter iqr_outlier_summary replaced
+    counts = {}
+    for col in df.select_dtypes(include="number").columns:
+        q1, q3 = df[col].quantile(0.25), df[col].quantile(0.75)
+        iqr = q3 - q1
+        counts[col] = len(df[(df[col] < q1 - 1.5 * iqr) | (df[col] > q3 + 1.5 * iqr)])
+    return counts
+
+@pytest.mark.parametrize("chunk_size", [5_000, 777])
+def test_correlation_matches_dataframe_corr(frame, chunk_size):
+    expected = frame.corr()
+    actual = correlation_matrix(frame, chunk_size=chunk_size)
+    pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=0, atol=1e-9)
+
+def test_correlation_of_chunk_iterable(frame):
+    chunks = (frame.iloc[start:start + 1_000] for start in range(0, len(frame), 1_000))
+    pd.testing.assert_frame_equal(correlation_matrix(chunks), frame.corr(), check_exact=False, rtol=0, atol=1e-9)
+
+def test_outlier_counts_match_per_column_filter(frame):
+    counts = outlier_counts(frame.to_numpy(dtype=np.float64))[4]
+    assert dict(zip(frame.columns, counts.tolist())) == per_column_outliers(frame)
+
+def test_outlier_summary_output(frame, capsys):
+    iqr_outlier_summary(frame)
+    expected = [f"{col}: {n} outliers ({n / len(frame) * 100:.2f}%)" for col, n in per_column_outliers(frame).items()]
+    assert capsys.readouterr().out.splitlines() == expected
+
+def test_multicollinearity_matches_pairwise_loop(frame):
+    columns = [c for c in frame.select_dtypes(include="number").columns if not c.endswith("_missing_flag")]
+    corr = frame[columns].corr().abs()
+    expected = [(fi, fj, corr.at[fi, fj]) for i, fi in enumerate(columns) for fj in columns[i + 1:]
+                if corr.at[fi, fj] > 0.8]
+    actual = detect_multicollinearity(frame, threshold=0.8)
+    assert [(fi, fj) for fi, fj, _ in actual] == [(fi, fj) for fi, fj, _ in expected] != []
+    assert [v for _, _, v in actual] == pytest.approx([v for _, _, v in expected], abs=1e-9)
@@ -0,0 +1,42 @@
+"""
+The single-sort threshold sweep must give the same metrics as sklearn's
+per-threshold functions, including on tied scores.
+"""
+import numpy as np
+import pytest
+from sklearn.metrics import (auc, average_precision_score, confusion_matrix, f1_score, precision_recall_curve,
+                             roc_auc_score)
+
+from evaluation import bootstrap, sort_scores, summarize, sweep
+
+@pytest.fixture(scope="module", params=["continuous", "tied"])
+def scores(request):
+    rng = np.random.default_rng(3)
+    y = (rng.random(3_000) < 0.1).astype(int)
+    score = np.clip(rng.normal(0.2 + 0.3 * y, 0.15), 0, 1)
+    if request.param == "tied":
+        score = score.round(2)
+    return y, score
+
+def test_areas_match_sklearn(scores):
+    y, score = scores
+    summary = summarize(sweep(sort_scores(y, score)), 0.5)
+    precision, recall, _ = precision_recall_curve(y, score)
+    assert summary["roc_auc"] == pytest.approx(roc_auc_score(y, score), abs=1e-12)
+    assert summary["pr_auc"] == pytest.approx(auc(recall, precision), abs=1e-12)
+    assert summary["average_precision"] == pytest.approx(average_precision_score(y, score), abs=1e-12)
+
+@pytest.mark.parametrize("threshold", [0.05, 0.3, 0.5, 0.9])
+def test_operating_point_matches_sklearn(scores, threshold):
+    y, score = scores
+    at = summarize(sweep(sort_scores(y, score)), threshold)["at_threshold"]
+    predicted = (score >= threshold).astype(int)
+    assert at["confusion_matrix"] == confusion_matrix(y, predicted, labels=[0, 1]).tolist()
+    assert at["f1"] == pytest.approx(f1_score(y, predicted, zero_division=0), abs=1e-12)
+
+def test_bootstrap_does_not_depend_on_workers(scores):
+    y, score = scores
+    sorted_scores = sort_scores(y, score)
+    single = bootstrap(sorted_scores, 0.5, resamples=60, workers=1, seed=1)
+    pooled = bootstrap(sorted_scores, 0.5, resamples=60, workers=2, seed=1)
+    assert single == pooled
@@ -0,0 +1,85 @@
+"""
+The offline pipeline, the fused engine and the API all compute features
+from the feature registry; they must match the hand-written chain the
+registry was derived from, and each other.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_cleaning import cap_outliers, create_missing_flags, custom_caps, impute_missing_values
+from feature_engineering import (aggregate_delinquencies, full_preprocess, fused_preprocess, log_transform,
+                                 minimal_preprocess, reference_preprocess)
+from feature_registry import compile_features, parity_report
+from src.api.utils import RAW_INPUT_COLUMNS, SERVING_FEATURES, preprocess_columnar
+from tests.synthetic import make_cleaned_frame, make_raw_credit_frame
+
+FEATURES = list(SERVING_FEATURES)
+
+def serving_skew(df: pd.DataFrame, feature_list: list) -> dict:
+    """Features whose float32 values from the API's raw-input path differ from the training pipeline's."""
+    complete = df[(df["MonthlyIncome_missing_flag"] == 0) & (df["NumberOfDependents_missing_flag"] == 0)]
+    engineered = full_preprocess(complete)
+    raw = {key: engineered[column].to_numpy(dtype=np.float64) for key, column in RAW_INPUT_COLUMNS.items()}
+    served = preprocess_columnar(raw, feature_list)
+    trained = engineered[feature_list].to_numpy(dtype=np.float32)
+    mismatch = served.view(np.uint32) != trained.view(np.uint32)
+    return {name: int(n) for name, n in zip(feature_list, mismatch.sum(axis=0)) if n}
+
+def cleaned_frame() -> pd.DataFrame:
+    """Synthetic cleaned rows, with rows on every bin edge and threshold appended."""
+    df = make_cleaned_frame(2_000, seed=4)
+    edges = df.iloc[[0] * 12].reset_index(drop=True)
+    edges["age"] = [18, 29, 30, 49, 50, 99, 100, 18, 30, 50, 100, 45]
+    edges["NumberOfDependents"] = [0.0, 0.5, 1.0, 2.0, 2.5, 10.0, 10.5, 0.0, 3.0, 0.0, 2.0, 11.0]
+    edges["RevolvingUtilizationOfUnsecuredLines"] = [0.9, 0.9000001, 0.0, 1.0, 0.5, 0.9, 0.91, 0.0, 0.9, 0.89, 1.0, 0.0]
+    edges["NumberOfOpenCreditLinesAndLoans"] = 0
+    edges["MonthlyIncome"] = [0.0] * 6 + [1000.0] * 6
+    return pd.concat([df, edges], ignore_index=True)
+
+@pytest.fixture(scope="module")
+def cleaned():
+    return cleaned_frame()
+
+@pytest.fixture(scope="module")
+def pipeline_cleaned():
+    # The cleaning path the pipeline runs, on raw rows with missing values and outliers
+    raw = make_raw_credit_frame(2_000, seed=5).iloc[:, 1:]
+    return cap_outliers(impute_missing_values(create_missing_flags(raw.copy())), custom_caps)
+
+@pytest.mark.parametrize("frame", ["cleaned", "pipeline_cleaned"])
+def test_full_preprocess_matches_reference_chain(frame, request):
+    df = request.getfixturevalue(frame)
+    expected = reference_preprocess(df.copy())
+    actual = full_preprocess(df)
+    assert list(actual.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True, check_dtype=False)
+
+def test_full_preprocess_does_not_modify_input(cleaned):
+    before = cleaned.copy()
+    full_preprocess(cleaned)
+    pd.testing.assert_frame_equal(cleaned, before)
+
+def test_minimal_preprocess_matches_reference_chain(pipeline_cleaned):
+    expected = log_transform(aggregate_delinquencies(pipeline_cleaned.copy()))
+    actual = minimal_preprocess(pipeline_cleaned)
+    assert list(actual.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True, check_dtype=False)
+
+def test_fused_preprocess_matches_full_preprocess(cleaned):
+    expected = full_preprocess(cleaned)[FEATURES]
+    pd.testing.assert_frame_equal(fused_preprocess(cleaned, FEATURES), expected, check_exact=True)
+
+def test_registry_modes_agree_with_reference(cleaned):
+    sample = cleaned.tail(300)
+    report = parity_report(compile_features(FEATURES, sample.columns), sample, reference_preprocess(sample.copy()))
+    assert report == {}
+
+def test_no_serving_skew(cleaned):
+    assert serving_skew(cleaned, FEATURES) == {}
+
+def test_flags_keep_narrow_dtypes(cleaned):
+    fused = fused_preprocess(cleaned, FEATURES)
+    assert fused["HighUtilizationFlag"].dtype == np.uint8
+    assert fused["AgeGroup_Senior"].dtype == np.bool_
+    assert fused["IncomePerCreditLine"].dtype == np.float64
@@ -0,0 +1,101 @@
+"""
+Incremental materialization must match a full rebuild from the same raw
+table and stats version, including which duplicates are dropped.
+"""
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from data_cleaning import clean_streaming, load_cleaning_stats, save_cleaning_stats
+from incremental import OUTPUT_TABLES, RAW_TABLE, materialize
+from tests.synthetic import make_raw_credit_frame
+
+KEY = "Unnamed: 0"
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # Frozen stats are written under data/stats relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    raw = make_raw_credit_frame(40, seed=11, duplicate_rate=0)
+    raw[KEY] = range(1, len(raw) + 1)
+    # Rows 6 and 9 duplicate row 3
+    for key in (6, 9):
+        raw.loc[raw[KEY] == key, raw.columns[1:]] = raw.loc[raw[KEY] == 3, raw.columns[1:]].to_numpy()
+    path = str(tmp_path / "loanvet.db")
+    with sqlite3.connect(path) as conn:
+        raw.to_sql(RAW_TABLE, conn, index=False)
+    return path
+
+def outputs(path) -> dict:
+    with sqlite3.connect(path) as conn:
+        return {table: pd.read_sql_query(f'SELECT rowid AS row_key, * FROM "{table}" ORDER BY rowid', conn)
+                for table in OUTPUT_TABLES}
+
+def rebuilt(path) -> dict:
+    materialize(path, chunk_size=7, full=True)
+    return outputs(path)
+
+def update_raw(path, key, **values):
+    with sqlite3.connect(path) as conn:
+        for column, value in values.items():
+            conn.execute(f'UPDATE {RAW_TABLE} SET "{column}" = ? WHERE "{KEY}" = ?', (value, key))
+
+def assert_matches_rebuild(path):
+    incremental = outputs(path)
+    full = rebuilt(path)
+    for table in OUTPUT_TABLES:
+        pd.testing.assert_frame_equal(incremental[table], full[table], check_dtype=False, obj=table)
+
+def test_duplicates_are_dropped(db):
+    counts = materialize(db, chunk_size=7)
+    assert counts["duplicates"] == 2
+    keys = outputs(db)["credit_risk_cleaned"]["row_key"].tolist()
+    assert 3 in keys and 6 not in keys and 9 not in keys
+
+def test_duplicate_is_kept_once_the_row_it_duplicated_changes(db):
+    materialize(db, chunk_size=7)
+    update_raw(db, 3, age=77)
+    counts = materialize(db, chunk_size=7)
+    assert counts["promoted"] == 1
+    keys = outputs(db)["credit_risk_cleaned"]["row_key"].tolist()
+    assert 3 in keys and 6 in keys and 9 not in keys
+    assert_matches_rebuild(db)
+
+def test_earlier_row_takes_over_a_later_kept_row(db):
+    materialize(db, chunk_size=7)
+    # Row 2 now has the contents of rows 3, 6 and 9, so it becomes the kept row of that group
+    with sqlite3.connect(db) as conn:
+        columns = [c[1] for c in conn.execute(f"PRAGMA table_info({RAW_TABLE})")][1:]
+        values = conn.execute(f'SELECT * FROM {RAW_TABLE} WHERE "{KEY}" = 3').fetchone()[1:]
+    update_raw(db, 2, **dict(zip(columns, values)))
+    materialize(db, chunk_size=7)
+    keys = outputs(db)["credit_risk_cleaned"]["row_key"].tolist()
+    assert 2 in keys and 3 not in keys
+    assert_matches_rebuild(db)
+
+def test_incremental_run_after_a_full_pipeline_run(db):
+    materialize(db, chunk_size=7)
+    # The full pipeline rewrites the cleaned tables with sequential rowids after dropping duplicates
+    clean_streaming(db, chunk_size=7)
+    update_raw(db, 20, age=77)
+    counts = materialize(db, chunk_size=7)
+    assert counts["processed"] == 38
+    cleaned = outputs(db)["credit_risk_cleaned"]
+    assert cleaned.loc[cleaned["row_key"] == 20, "age"].tolist() == [77]
+    assert len(cleaned) == 38
+    assert_matches_rebuild(db)
+
+def test_unchanged_run_processes_nothing(db):
+    materialize(db, chunk_size=7)
+    counts = materialize(db, chunk_size=7)
+    assert counts["processed"] == counts["duplicates"] == counts["promoted"] == 0
+
+def test_stats_version_only_changes_with_content(tmp_path):
+    stats_dir = str(tmp_path / "stats")
+    first = save_cleaning_stats({"MonthlyIncome": 5400.0, "NumberOfDependents": 0.0}, 100, stats_dir=stats_dir)
+    again = save_cleaning_stats({"MonthlyIncome": 5400.0, "NumberOfDependents": 0.0}, 120, stats_dir=stats_dir)
+    assert again["version"] == first["version"] == 1
+    changed = save_cleaning_stats({"MonthlyIncome": 5500.0, "NumberOfDependents": 0.0}, 120, stats_dir=stats_dir)
+    assert changed["version"] == 2
+    assert load_cleaning_stats(stats_dir=stats_dir)["version"] == 2
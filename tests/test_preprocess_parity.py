@@ -0,0 +1,89 @@
+"""
+The scalar preprocess() used by /predict and the vectorized paths used by
+the batch endpoints must produce bit-for-bit the same float32 features.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.api.utils import RAW_DEFAULTS, SERVING_FEATURES, preprocess, preprocess_batch, preprocess_columnar
+from tests.synthetic import EDGE_CASES, make_raw_columns, to_records
+
+FEATURES = list(SERVING_FEATURES)
+
+NULL_CASES = [
+    {key: None for key in RAW_DEFAULTS},
+    {"age": 40, "monthly_income": None, "number_of_dependents": None},
+    {"age": 40, "monthly_income": float("nan"), "number_of_dependents": 1},
+    {"age": None, "number_of_open_credit_lines_and_loans": None, "debt_ratio": None},
+    {"total_delinquencies": 3, "number_of_times_90_days_late": None},
+]
+
+ZERO_INCOME_CASES = [
+    {"monthly_income": 0},
+    {"monthly_income": 0, "number_of_open_credit_lines_and_loans": 0, "number_of_dependents": 0},
+    {"monthly_income": 0, "number_of_dependents": 5, "debt_ratio": 0},
+]
+
+# Bin edges: ages [18, 30), [30, 50), [50, 100); dependents (-1, 0], (0, 2], (2, 10]
+AGE_CASES = [{"age": age} for age in (0, 17.999, 18, 29.999, 30, 49.999, 50, 99.999, 100, 120)]
+DEPENDENTS_CASES = [{"number_of_dependents": dep} for dep in (-1, -0.5, 0, 0.001, 1, 2, 2.001, 9.999, 10, 10.001, 15)]
+
+LATE_CASES = [
+    {"total_delinquencies": 4},
+    {"total_delinquencies": 4, "number_of_times_90_days_late": 0},
+    {"total_delinquencies": 4, "number_of_times_90_days_late": 4},
+    {"total_delinquencies": 0, "number_of_times_90_days_late": 2, "revolving_utilization_of_unsecured_lines": 0.95},
+]
+
+CASES = EDGE_CASES + NULL_CASES + ZERO_INCOME_CASES + AGE_CASES + DEPENDENTS_CASES + LATE_CASES
+
+def scalar_matrix(records: list) -> np.ndarray:
+    return np.array([[preprocess(record)[name] for name in FEATURES] for record in records], dtype=np.float32)
+
+def assert_bitwise_equal(expected: np.ndarray, actual: np.ndarray, records: list):
+    mismatch = expected.view(np.uint32) != actual.view(np.uint32)
+    if mismatch.any():
+        row, col = np.argwhere(mismatch)[0]
+        pytest.fail(f"{mismatch.sum()} mismatching cells, first at {records[row]} feature {FEATURES[col]}: "
+                    f"scalar={expected[row, col]!r} vectorized={actual[row, col]!r}")
+
+@pytest.mark.parametrize("record", CASES, ids=repr)
+def test_columnar_matches_scalar(record):
+    columns = {key: np.array([np.nan if record.get(key) is None else record[key]], dtype=np.float64)
+               for key in RAW_DEFAULTS}
+    assert_bitwise_equal(scalar_matrix([record]), preprocess_columnar(columns, FEATURES), [record])
+
+def test_batch_matches_scalar_on_edge_cases():
+    # Nulls become NaN in the frame, as for a /predict/batch body
+    raw = pd.DataFrame.from_records(CASES, columns=list(RAW_DEFAULTS))
+    batch = preprocess_batch(raw, FEATURES)
+    assert list(batch.columns) == FEATURES
+    assert (batch.dtypes == np.float32).all()
+    assert_bitwise_equal(scalar_matrix(CASES), batch.to_numpy(), CASES)
+
+def test_batch_without_90_days_late_column():
+    records = [{key: value for key, value in record.items() if key != "number_of_times_90_days_late"}
+               for record in CASES]
+    raw = pd.DataFrame.from_records(records, columns=[key for key in RAW_DEFAULTS if key != "number_of_times_90_days_late"])
+    assert_bitwise_equal(scalar_matrix(records), preprocess_batch(raw, FEATURES).to_numpy(), records)
+
+def test_batch_with_only_some_columns():
+    records = [{"age": 35}, {"age": 51, "monthly_income": 3000}]
+    raw = pd.DataFrame.from_records(records)
+    assert_bitwise_equal(scalar_matrix(records), preprocess_batch(raw, FEATURES).to_numpy(), records)
+
+def test_random_records_match():
+    records = to_records(make_raw_columns(5_000, seed=3))
+    raw = pd.DataFrame.from_records(records, columns=list(RAW_DEFAULTS))
+    assert_bitwise_equal(scalar_matrix(records), preprocess_batch(raw, FEATURES).to_numpy(), records)
+
+def test_negative_counts_give_zero_ratios_without_warnings():
+    record = {"monthly_income": 3000, "number_of_open_credit_lines_and_loans": -1, "number_of_dependents": -1}
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        features = preprocess(record)
+    assert features["IncomePerCreditLine"] == 0 and features["IncomePerDependent"] == 0
+    assert all(np.isfinite(value) for value in features.values())
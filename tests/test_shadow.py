@@ -0,0 +1,55 @@
+"""
+The shadow scorer never holds more than max_pending records, and shutting
+it down does not leak their slots.
+"""
+import threading
+
+from src.api.shadow import ShadowScorer
+
+class BlockingPredictor:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def predict(self, record: dict) -> dict:
+        self.release.wait(5)
+        return {"label": 0, "probability": 0.1}
+
+class Version:
+    def __init__(self, predictor):
+        self.predictor = predictor
+
+def test_records_past_max_pending_are_dropped():
+    predictor = BlockingPredictor()
+    scorer = ShadowScorer(workers=1, max_pending=3)
+    try:
+        accepted = [scorer.submit(Version(predictor), {}, {}) for _ in range(5)]
+        assert accepted == [True, True, True, False, False]
+        assert scorer.stats()["dropped"] == 2
+    finally:
+        predictor.release.set()
+        scorer.shutdown()
+
+def test_shutdown_frees_the_slots_of_cancelled_records():
+    predictor = BlockingPredictor()
+    first_done = threading.Event()
+    scorer = ShadowScorer(workers=1, max_pending=3, on_result=lambda *args: first_done.set())
+    for _ in range(3):
+        assert scorer.submit(Version(predictor), {}, {})
+    # One record is running and two are queued; the queued ones are cancelled
+    scorer.shutdown()
+    predictor.release.set()
+    assert first_done.wait(5)
+
+    results = []
+    done = threading.Event()
+
+    def on_result(version, result, served, seconds):
+        results.append(result)
+        if len(results) == 2:
+            done.set()
+
+    scorer.on_result = on_result
+    # The two cancelled records' slots are free even if the finished record's is not yet
+    assert all(scorer.submit(Version(predictor), {}, {}) for _ in range(2))
+    assert done.wait(5)
+    scorer.shutdown()
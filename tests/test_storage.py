@@ -0,0 +1,69 @@
+"""
+Tables exported from SQLite to the columnar store must read back the same,
+with the same column projection and filter pushdown on every backend.
+"""
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import storage
+from storage import export_sqlite_table, iter_table, load_table, save_table, table_fingerprint
+from tests.synthetic import make_raw_credit_frame
+
+pytest.importorskip("pyarrow")
+
+TABLE = "credit_risk_raw"
+KEY = "Unnamed: 0"
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    # Small files, so a table spans several of them
+    monkeypatch.setattr(storage, "CHUNK_SIZE", 400)
+    raw = make_raw_credit_frame(1_500, seed=9)
+    db_path = str(tmp_path / "loanvet.db")
+    with sqlite3.connect(db_path) as conn:
+        raw.to_sql(TABLE, conn, index=False)
+    # A store holds one format, so each backend gets its own root
+    for backend in ("parquet", "arrow"):
+        export_sqlite_table(TABLE, backend, db_path=db_path, root=str(tmp_path / backend))
+    return raw, db_path, str(tmp_path)
+
+def read(backend, db_path, root, **kwargs):
+    df = load_table(TABLE, backend=backend, db_path=db_path, root=os.path.join(root, backend), **kwargs)
+    # Row order is only kept within a file of the columnar store
+    return df.sort_values(KEY).reset_index(drop=True) if KEY in df.columns else df
+
+@pytest.mark.parametrize("backend", ["sqlite", "parquet", "arrow"])
+def test_round_trip(stores, backend):
+    raw, db_path, root = stores
+    pd.testing.assert_frame_equal(read(backend, db_path, root), raw, check_dtype=False)
+
+@pytest.mark.parametrize("backend", ["parquet", "arrow"])
+def test_projection_and_filters_match_sqlite(stores, backend):
+    _, db_path, root = stores
+    kwargs = {"columns": [KEY, "age", "MonthlyIncome"],
+              "filters": [("age", ">=", 60), ("NumberOfDependents", "in", [0.0, 2.0])]}
+    expected = read("sqlite", db_path, root, **kwargs)
+    assert 0 < len(expected) < 1_500
+    pd.testing.assert_frame_equal(read(backend, db_path, root, **kwargs), expected, check_dtype=False)
+
+@pytest.mark.parametrize("backend", ["sqlite", "parquet"])
+def test_chunks_cover_the_table(stores, backend):
+    raw, db_path, root = stores
+    chunks = list(iter_table(TABLE, backend=backend, chunk_size=300, db_path=db_path, root=os.path.join(root, backend)))
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    assert sorted(pd.concat(chunks)[KEY].tolist()) == raw[KEY].tolist()
+
+def test_partitioned_save_and_fingerprint(stores):
+    raw, _, root = stores
+    root = os.path.join(root, "parquet")
+    before = table_fingerprint("scores", backend="parquet", root=root)
+    save_table(raw, "scores", backend="parquet", partition_cols=["SeriousDlqin2yrs"], root=root)
+    after = table_fingerprint("scores", backend="parquet", root=root)
+    assert before != after
+    loaded = load_table("scores", filters=[("SeriousDlqin2yrs", "==", 1)], backend="parquet", root=root)
+    assert sorted(loaded[KEY].tolist()) == raw.loc[raw["SeriousDlqin2yrs"] == 1, KEY].tolist()
+    assert np.isnan(loaded["MonthlyIncome"]).any()